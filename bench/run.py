@@ -0,0 +1,269 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+from time import perf_counter, time
+from game.constants import DEFAULT_SOLVER_SETTINGS, DEFAULT_GAME_CONFIG
+from game.feedback import load_feedback_matrix
+from game.results import eval_results
+from game.solver.index import WordIndex
+from game.solver.scoring import GuessScorer
+from game.solver.solver import guess_next_word, solve_wordle
+from game.solver.tree import build_solves
+from game.solver.util import is_guessable_word, parse_clues
+from game.util import read_words_of_length
+from game.wordle import Wordle
+
+# Benchmarks for the solver's hot paths, run over a few of the bundled dictionaries and word lengths:
+#
+#   python -m bench.run --out bench_results.json
+#   python -m bench.run --baseline bench_results.json
+#
+# Every benchmark reports seconds per operation (best of --repeat runs). With --baseline the run is compared
+# against an earlier results file and exits with status 1 if anything got slower than its threshold allows.
+
+RESULTS_VERSION = 1
+
+# name -> (dict file, candidate file or None for the dict itself, N)
+CONFIGS = {
+    'official': ('data/official_wordle_all.txt', 'data/official_wordle_common.txt', 5),
+    'sgb': ('data/sgb-words.txt', None, 5),
+    'lexicon': ('data/lexicon_4958.txt', None, 5),
+    'proper_4': ('data/dictionary_proper.txt', None, 4),
+    'proper_6': ('data/dictionary_proper.txt', None, 6),
+}
+DEFAULT_CONFIGS = ['official', 'sgb', 'proper_4', 'proper_6']
+
+# Allowed slowdown (as a fraction of the baseline time) before a benchmark counts as a regression
+DEFAULT_THRESHOLD = 0.25
+# Benchmarks that are noisier than the rest get more room
+BENCH_THRESHOLDS = {
+    'eval': 0.35,
+    'gen_tree': 0.35,
+}
+
+# Size of the reduced dictionaries gen_tree is benchmarked on
+TREE_CANDIDATES = 150
+TREE_GUESSES = 1500
+
+def build_settings(word_set: List[str], candidate_set: List[str], feedback_matrix: bool=True) -> Tuple[Dict, Dict]:
+    game_config = dict(DEFAULT_GAME_CONFIG)
+    game_config['candidate_set'] = candidate_set
+    game_config['guess_set'] = word_set
+    solver_settings = dict(DEFAULT_SOLVER_SETTINGS)
+    solver_settings['candidate_set'] = candidate_set
+    solver_settings['guess_set'] = word_set
+    solver_settings['candidate_index'] = WordIndex(candidate_set)
+    solver_settings['guess_scorer'] = GuessScorer(word_set)
+    if feedback_matrix:
+        matrix = load_feedback_matrix(word_set, candidate_set)
+        game_config['feedback_matrix'] = matrix
+        solver_settings['feedback_matrix'] = matrix
+    return game_config, solver_settings
+
+# Best seconds per op over repeat runs of fn, which returns how many ops it did. If given, setup is run
+# (untimed) before each run and its result passed to fn.
+def time_op(fn: Callable, repeat: int, setup: Optional[Callable]=None) -> Dict[str, float]:
+    best, ops = None, 0
+    for i in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = perf_counter()
+        ops = fn(*args)
+        elapsed = perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return {'seconds': best / max(ops, 1), 'ops': ops, 'total_seconds': best}
+
+def first_clues(words: List[str], game_config: Dict, solver_settings: Dict) -> List[List[Tuple[str, List[int]]]]:
+    first, _, _ = guess_next_word([], solver_settings=solver_settings, debug=0)
+    clues = []
+    for word in words:
+        w = Wordle(word, config=game_config, verbose=False)
+        clue, _ = w.guess(first)
+        clues.append([(first, clue)])
+    return clues
+
+def bench_config(name: str, k: int, repeat: int, rng: random.Random, feedback_matrix: bool=True) -> Dict[str, Dict[str, float]]:
+    dict_file, cand_file, N = CONFIGS[name]
+    word_set = read_words_of_length(N, fname=dict_file)
+    candidate_set = read_words_of_length(N, fname=cand_file) if cand_file else word_set
+    game_config, solver_settings = build_settings(word_set, candidate_set, feedback_matrix=feedback_matrix)
+    words = rng.sample(candidate_set, min(k, len(candidate_set)))
+    clue_sets = first_clues(words, game_config, solver_settings)
+    constraints = [parse_clues(clues) for clues in clue_sets]
+    index = solver_settings['candidate_index']
+    results = {}
+
+    def filter_scan():
+        for c in constraints:
+            [w for w in candidate_set if is_guessable_word(w, *c)]
+        return len(constraints)
+    results['filter_scan'] = time_op(filter_scan, repeat)
+
+    def filter_index():
+        for c in constraints:
+            index.words_of(index.filter(*c))
+        return len(constraints)
+    results['filter_index'] = time_op(filter_index, repeat)
+
+    def guess_first():
+        guess_next_word([], solver_settings=solver_settings, debug=0)
+        return 1
+    results['guess_first'] = time_op(guess_first, repeat)
+
+    def guess_second():
+        for clues in clue_sets:
+            guess_next_word(clues, solver_settings=solver_settings, debug=0)
+        return len(clue_sets)
+    results['guess_second'] = time_op(guess_second, repeat)
+
+    def new_games():
+        return [Wordle(word, config=game_config, verbose=False) for word in words]
+    def wordle_guess(games):
+        count = 0
+        for w in games:
+            for guess in words[:int(game_config['max_guesses'])]:
+                w.guess(guess)
+                count += 1
+                if w.state != Wordle.PLAYING:
+                    break
+        return count
+    results['wordle_guess'] = time_op(wordle_guess, repeat, setup=new_games)
+
+    def solve():
+        for word in words:
+            w = Wordle(word, config=game_config, verbose=False)
+            solve_wordle(w, solver_settings=solver_settings, debug=0)
+        return len(words)
+    results['solve_wordle'] = time_op(solve, repeat)
+
+    def eval_games():
+        for result in eval_results(words, game_config, solver_settings):
+            pass
+        return len(words)
+    results['eval'] = time_op(eval_games, repeat)
+    results['eval']['games_per_second'] = 1 / results['eval']['seconds']
+
+    tree_cands = candidate_set[:TREE_CANDIDATES]
+    tree_guesses = list(dict.fromkeys(tree_cands + word_set[:TREE_GUESSES]))
+    _, tree_settings = build_settings(tree_guesses, tree_cands, feedback_matrix=feedback_matrix)
+    def gen_tree():
+        build_solves(solver_settings=tree_settings)
+        return 1
+    results['gen_tree'] = time_op(gen_tree, repeat)
+    return results
+
+def run(configs: List[str], k: int, repeat: int, seed: int, feedback_matrix: bool=True) -> Dict:
+    results = {}
+    for name in configs:
+        start = time()
+        results[name] = bench_config(name, k, repeat, random.Random(seed), feedback_matrix=feedback_matrix)
+        print(f'[{name}] done in {time() - start:.02f}s')
+    return {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'k': k,
+            'repeat': repeat,
+            'seed': seed,
+            'feedback_matrix': feedback_matrix,
+            'time': int(time()),
+        },
+        'results': results,
+    }
+
+# Returns (config, benchmark, baseline seconds, current seconds, regressed) for every benchmark in both runs.
+def compare_results(
+    baseline: Dict,
+    current: Dict,
+    threshold: float=DEFAULT_THRESHOLD,
+    thresholds: Optional[Dict[str, float]]=None
+) -> List[Tuple[str, str, float, float, bool]]:
+    thresholds = BENCH_THRESHOLDS if thresholds is None else thresholds
+    rows = []
+    for name, benches in current['results'].items():
+        base_benches = baseline['results'].get(name, {})
+        for bench, result in benches.items():
+            if not bench in base_benches:
+                continue
+            base, now = base_benches[bench]['seconds'], result['seconds']
+            allowed = thresholds.get(bench, threshold)
+            rows.append((name, bench, base, now, now > base * (1 + allowed)))
+    return rows
+
+def print_results(results: Dict):
+    for name, benches in results['results'].items():
+        for bench, result in benches.items():
+            print(f'{name:<10} {bench:<14} {result["seconds"] * 1000:>10.03f}ms/op  ({result["ops"]} ops)')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Wordle solver')
+    parser.add_argument('--configs',
+                        type=str,
+                        help=f'Comma-separated dictionary configs to run, from {list(CONFIGS.keys())}',
+                        default=','.join(DEFAULT_CONFIGS),
+                        required=False)
+    parser.add_argument('-k',
+                        type=int,
+                        help='Number of words per config to play, filter and solve',
+                        default=20,
+                        required=False)
+    parser.add_argument('--repeat',
+                        type=int,
+                        help='Runs per benchmark, the fastest is kept',
+                        default=3,
+                        required=False)
+    parser.add_argument('--seed',
+                        type=int,
+                        help='Seed for picking the words',
+                        default=0,
+                        required=False)
+    parser.add_argument('--out',
+                        type=str,
+                        help='File to write the JSON results to',
+                        default=None,
+                        required=False)
+    parser.add_argument('--baseline',
+                        type=str,
+                        help='Results file from an earlier run to compare against',
+                        default=None,
+                        required=False)
+    parser.add_argument('--threshold',
+                        type=float,
+                        help='Allowed slowdown against the baseline, as a fraction',
+                        default=DEFAULT_THRESHOLD,
+                        required=False)
+    parser.add_argument('--no_feedback_matrix',
+                        action='store_true',
+                        help='Don\'t use the cached guess x candidate feedback matrix.',
+                        default=False,
+                        required=False)
+    args = parser.parse_args()
+    configs = args.configs.split(',')
+    for name in configs:
+        if not name in CONFIGS:
+            print(f'Error: Unknown config [{name}]. Pick from {list(CONFIGS.keys())}')
+            sys.exit(2)
+    results = run(configs, args.k, args.repeat, args.seed, feedback_matrix=not args.no_feedback_matrix)
+    print_results(results)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f'Wrote results to [{args.out}]')
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = 0
+        for name, bench, base, now, regressed in compare_results(baseline, results, threshold=args.threshold):
+            regressions += regressed
+            print(f'{"REGRESSED" if regressed else "ok":<10} {name:<10} {bench:<14} {base * 1000:.03f}ms -> {now * 1000:.03f}ms ({(now / base - 1) * 100:+.01f}%)')
+        print(f'{regressions} regression(s) against [{args.baseline}]')
+        sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
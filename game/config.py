@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional, Tuple
+from .constants import DEFAULT_GAME_CONFIG, DEFAULT_SOLVER_SETTINGS, DEFAULT_MAX_GUESSES, DEFAULT_STRATEGY_TOP_K, DEFAULT_GUESS_CACHE_SIZE, DEFAULT_FEEDBACK, MAX_FEEDBACK_MATRIX_BYTES
+from .feedback import check_feedback_mode, load_feedback_matrix
+from .solver.book import OpeningBook
+from .solver.deadline import Deadline
+from .solver.index import WordIndex
+from .solver.memo import GuessCache
+from .solver.profile import Profiler
+from .solver.scoring import GuessScorer
+from .solver.tree_file import load_tree
+from .util import read_words_of_length
+
+# Builds a fresh (game_config, solver_settings) pair for a set of word lists, with the indexes and caches the
+# solver uses. DEFAULT_GAME_CONFIG and DEFAULT_SOLVER_SETTINGS are only ever copied, never modified, so any
+# number of configurations (e.g. requests to the solver service with different dictionaries or hard mode)
+# can live side by side.
+def make_configs(
+    word_set: List[str],
+    candidate_set: List[str],
+    max_guesses: int=DEFAULT_MAX_GUESSES,
+    hard_mode: bool=False,
+    strategy: str=DEFAULT_SOLVER_SETTINGS['strategy'],
+    top_k: int=DEFAULT_STRATEGY_TOP_K,
+    feedback: str=DEFAULT_FEEDBACK,
+    feedback_matrix: bool=True,
+    max_matrix_bytes: int=MAX_FEEDBACK_MATRIX_BYTES,
+    tree_file: Optional[str]=None,
+    guess_cache_size: int=DEFAULT_GUESS_CACHE_SIZE,
+    profile: bool=False,
+    opening_book: bool=True,
+    evil: Optional[str]=None,
+    start_word: Optional[str]=None,
+    deadline_ms: Optional[int]=None
+) -> Tuple[Dict, Dict]:
+    check_feedback_mode(feedback)
+    if top_k < 1:
+        raise Exception(f'top_k must be at least 1, got {top_k}')
+    if start_word and not start_word in set(word_set):
+        raise Exception(f'Start word [{start_word}] is not a valid guess')
+    solution_tree = None
+    if tree_file:
+        solution_tree, tree_feedback = load_tree(tree_file)
+        # The tree's edges are the feedback it was built with, under any other they lead to the wrong guesses
+        if tree_feedback != feedback:
+            raise Exception(f'Solution tree [{tree_file}] was built with {tree_feedback} feedback, not {feedback}')
+    game_config = dict(DEFAULT_GAME_CONFIG)
+    game_config['max_guesses'] = str(max_guesses)
+    game_config['feedback'] = feedback
+    game_config['evil'] = evil
+    game_config['candidate_set'] = candidate_set
+    game_config['guess_set'] = word_set
+    solver_settings = dict(DEFAULT_SOLVER_SETTINGS)
+    solver_settings['max_guesses'] = str(max_guesses)
+    solver_settings['non_strict'] = not hard_mode
+    solver_settings['strategy'] = strategy
+    solver_settings['strategy_top_k'] = str(top_k)
+    solver_settings['feedback'] = feedback
+    solver_settings['start_word'] = start_word
+    solver_settings['candidate_set'] = candidate_set
+    solver_settings['guess_set'] = word_set
+    solver_settings['candidate_index'] = WordIndex(candidate_set)
+    solver_settings['guess_scorer'] = GuessScorer(word_set)
+    if feedback_matrix:
+        matrix = load_feedback_matrix(word_set, candidate_set, max_bytes=max_matrix_bytes, mode=feedback)
+        game_config['feedback_matrix'] = matrix
+        solver_settings['feedback_matrix'] = matrix
+    if guess_cache_size > 0:
+        solver_settings['guess_cache'] = GuessCache(guess_cache_size)
+    if opening_book and not tree_file:
+        solver_settings['opening_book'] = OpeningBook()
+    if profile:
+        solver_settings['profiler'] = Profiler()
+    if deadline_ms is not None:
+        solver_settings['deadline'] = Deadline(deadline_ms / 1000)
+        # Don't spend the first turns' budgets building the scorer's masks
+        solver_settings['guess_scorer'].prepare(len(candidate_set) * len(candidate_set[0]))
+    if solution_tree is not None:
+        solver_settings['solution_tree'] = solution_tree
+    if deadline_ms is not None and solver_settings.get('opening_book') is not None:
+        # Likewise build (or load) the book now, or the first turn spends far more than its budget doing it
+        solver_settings['opening_book'].prepare(solver_settings)
+    return game_config, solver_settings
+
+# Same as make_configs, reading the word lists of length N from dict_file and cand_file (dict_file if not given).
+def load_configs(N: int, dict_file: str, cand_file: Optional[str]=None, **kwargs) -> Tuple[Dict, Dict]:
+    word_set = read_words_of_length(N, fname=dict_file)
+    candidate_set = read_words_of_length(N, fname=cand_file) if cand_file else word_set
+    return make_configs(word_set, candidate_set, **kwargs)
@@ -1,9 +1,29 @@
 # TODO(deedy): Make enums
 DEFAULT_N = 5
 DEFAULT_MAX_GUESSES = 6
+# Number of guesses (by letter frequency) whose candidate partitions are scored exactly by the partition strategies
+DEFAULT_STRATEGY_TOP_K = 50
 DATA_DIR = 'data'
 DEFAULT_DICT = 'data/official_wordle_all.txt'
 DEFAULT_CAND_DICT = 'data/official_wordle_common.txt'
+# Generated solution trees, for --tree_file
+TREE_DIR = 'tree'
+# Precomputed tables (feedback matrices etc.) keyed by a hash of the word lists they were built from
+CACHE_DIR = 'cache'
+# Compiled word lists live in this directory next to the dictionary they were read from
+WORD_CACHE_DIR = '.wordcache'
+# Max number of game states whose guesses are remembered by a GuessCache
+DEFAULT_GUESS_CACHE_SIZE = 200000
+# Don't build feedback matrices bigger than this (bytes), e.g. for all N=8 unix words
+MAX_FEEDBACK_MATRIX_BYTES = 512 * 1024 * 1024
+
+# How feedback is scored, see game/feedback.py
+# Like the real game: a letter is 🟨 at most as many times as it is in the word (less the 🟩 ones)
+FEEDBACK_WORDLE = 'wordle'
+# Like this solver always did before: every copy of a letter in the word but in the wrong spot is 🟨
+FEEDBACK_LEGACY = 'legacy'
+FEEDBACK_MODES = [FEEDBACK_WORDLE, FEEDBACK_LEGACY]
+DEFAULT_FEEDBACK = FEEDBACK_WORDLE
 
 # Game settings
 DEFAULT_GAME_CONFIG = {
@@ -11,7 +31,14 @@ DEFAULT_GAME_CONFIG = {
 	# The set of words that can potentially be solutions
 	'candidate_set': [],
 	# The set of words that can be guessed validly
-	'guess_set': []
+	'guess_set': [],
+	# If present, a FeedbackMatrix over (guess_set, candidate_set) used instead of scoring each guess
+	'feedback_matrix': None,
+	# How guesses are scored: 'wordle' or 'legacy'. See FEEDBACK_MODES
+	'feedback': DEFAULT_FEEDBACK,
+	# If set, games are played against an adversarial host with this policy ('most' or 'hardest') instead of
+	# a hidden word. See game/evil.py
+	'evil': None
 }
 
 # Solver settings
@@ -26,13 +53,36 @@ DEFAULT_SOLVER_SETTINGS = {
 	'use_pos': True,
 	'max_guesses': str(DEFAULT_MAX_GUESSES),
 	'non_pos_weight': str(0.5),
+	# How to pick the next guess: 'frequency' (the letter frequency heuristic), or by the partition it makes
+	# of the remaining candidates: 'entropy', 'expected_size' or 'minimax'. See game/solver/strategy.py
+	'strategy': 'frequency',
+	# The partition strategies only score the top k guesses by letter frequency
+	'strategy_top_k': str(DEFAULT_STRATEGY_TOP_K),
+	# If set, the first guess of every game instead of the one the strategy picks
+	'start_word': None,
+	# How the game scores guesses, which the clues are interpreted by: 'wordle' or 'legacy'. See FEEDBACK_MODES
+	'feedback': DEFAULT_FEEDBACK,
 	# The set of words that can potentially be solutions
 	'candidate_set': [],
 	# The set of words that can be guessed validly
 	'guess_set': [],
 	# If present, a tree that solves the entire wordle. If the wrong tree is provided for the wrong dict settings, it will be 
 	# erroneous
-	'solution_tree': {}
+	'solution_tree': {},
+	# If present, a FeedbackMatrix over (guess_set, candidate_set) used to filter candidates
+	'feedback_matrix': None,
+	# If present, a WordIndex over candidate_set (in the same order) used to filter candidates with bitsets
+	'candidate_index': None,
+	# If present, a GuessScorer over guess_set used to score every explorable guess in one vectorized pass
+	'guess_scorer': None,
+	# If present, a Profiler that records the time spent in each phase of every turn and game. See game/solver/profile.py
+	'profiler': None,
+	# If present, a GuessCache that remembers the guess picked for each game state. See game/solver/memo.py
+	'guess_cache': None,
+	# If present, an OpeningBook with the first two guesses of each configuration. See game/solver/book.py
+	'opening_book': None,
+	# If present, a Deadline: the time budget for picking each guess. See game/solver/deadline.py
+	'deadline': None
 }
 
 # tile
@@ -0,0 +1,101 @@
+from typing import Dict, List, Optional, Tuple, Union
+from collections import Counter
+import random
+from .constants import DEFAULT_GAME_CONFIG
+from .feedback import AnswerLanes, Clue, solved_code
+from .wordle import Wordle
+
+# How the host picks the feedback for a guess
+MOST = 'most'
+HARDEST = 'hardest'
+EVIL_POLICIES = [MOST, HARDEST]
+
+# HARDEST looks one guess ahead in this many of the largest buckets, trying this many of each bucket's words as the
+# next guess, to keep each turn in the milliseconds
+HARDEST_BUCKETS = 4
+HARDEST_GUESSES = 50
+
+# AnswerLanes over a full candidate list are the slowest part of a game, so the last one is shared between games
+_initial_lanes = {}
+
+def _lanes_for(candidates: List[str], mode: str) -> AnswerLanes:
+    key = (id(candidates), mode)
+    if not key in _initial_lanes:
+        _initial_lanes.clear()
+        # Holding on to the list keeps its id from being reused
+        _initial_lanes[key] = (candidates, AnswerLanes(candidates, mode=mode))
+    return _initial_lanes[key][1]
+
+# An adversarial host ("Evil Wordle", https://swag.github.io/evil-wordle/): there is no hidden word, every guess
+# gets the feedback that keeps the most candidates alive (MOST) or the one whose candidates are hardest to split
+# with the next guess (HARDEST), so any answer consistent with the clues so far could still be the word. Plays
+# like a Wordle, so it can be passed to solve_wordle.
+#
+# Each turn partitions the candidates still alive by their feedback code for the guess in one pass of AnswerLanes
+# (see game/feedback.py). Ties go to the bucket that isn't solved, then to the lowest code (the fewest 🟩 and 🟨),
+# or to a random one with seed.
+class EvilWordle(Wordle):
+    def __init__(self, config: Dict[str, str] = DEFAULT_GAME_CONFIG, policy: str=MOST, seed: Optional[Union[int, str]]=None, verbose=True):
+        if not 'candidate_set' in config or not len(config['candidate_set']):
+            raise Exception('candidate_set not specified in config')
+        if not policy in EVIL_POLICIES:
+            raise Exception(f'Unknown evil policy [{policy}], expected one of {EVIL_POLICIES}')
+        super().__init__(config['candidate_set'][0], config=config, verbose=verbose)
+        self.policy = policy
+        self.random = random.Random(seed) if seed is not None else None
+        self.alive = list(config['candidate_set'])
+        self._lanes = _lanes_for(config['candidate_set'], self.feedback)
+
+    # The word the host ended up committing to, or the first candidate still alive
+    def answer(self) -> str:
+        return self.alive[0]
+
+    def _buckets(self, guess: str) -> Tuple[List[int], Counter]:
+        codes = self._lanes.row_codes(guess)
+        return codes, Counter(codes)
+
+    # Largest bucket the best of (up to HARDEST_GUESSES of) the words leaves when guessed against words
+    def _hardness(self, words: List[str]) -> int:
+        if len(words) <= 2:
+            return len(words) - 1
+        lanes = AnswerLanes(words, mode=self.feedback)
+        return min(max(Counter(lanes.row_codes(g)).values()) for g in words[:HARDEST_GUESSES])
+
+    def _choose(self, codes: List[int], sizes: Counter) -> int:
+        solved = solved_code(self.N)
+        ranked = sorted(sizes, key=lambda code: (-sizes[code], code == solved, code))
+        if self.policy == HARDEST and len(ranked) > 1:
+            scores = {}
+            for code in ranked[:HARDEST_BUCKETS]:
+                words = [w for w, c in zip(self.alive, codes) if c == code]
+                scores[code] = (self._hardness(words), sizes[code])
+            ranked = sorted(scores, key=lambda code: (-scores[code][0], -scores[code][1], code == solved, code))
+            key = lambda code: (scores[code], code == solved)
+        else:
+            key = lambda code: (sizes[code], code == solved)
+        ties = [code for code in ranked if key(code) == key(ranked[0])]
+        return self.random.choice(ties) if self.random is not None else ties[0]
+
+    def guess(self, guess: str) -> Tuple[Clue, int]:
+        if self.state != Wordle.PLAYING:
+            return super().guess(guess)
+        guess = guess.lower()
+        Wordle.check_word(self.N, guess, self.guess_set)
+        codes, sizes = self._buckets(guess)
+        code = self._choose(codes, sizes)
+        self.alive = [w for w, c in zip(self.alive, codes) if c == code]
+        if len(self.alive) < len(codes):
+            self._lanes = AnswerLanes(self.alive, mode=self.feedback)
+        # Wordle.guess scores the guess against the committed word, which now is any of the candidates left
+        self._word = guess if code == solved_code(self.N) else self.alive[0]
+        clue, state = super().guess(guess)
+        if clue != code:
+            raise Exception(f'Evil host picked [{self._word}] that doesn\'t match its feedback for [{guess}]. This should never happen.')
+        return clue, state
+
+# A game for word: an EvilWordle if config asks for one, with its ties broken by word so a list of words plays as
+# many different evil games, otherwise a Wordle with word hidden.
+def make_game(word: str, config: Dict[str, str] = DEFAULT_GAME_CONFIG, verbose=True) -> Wordle:
+    if config.get('evil') is not None:
+        return EvilWordle(config=config, policy=config['evil'], seed=word, verbose=verbose)
+    return Wordle(word, config=config, verbose=verbose)
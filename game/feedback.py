@@ -0,0 +1,380 @@
+from array import array
+from typing import List, Optional, Sequence
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from .constants import NOTHING, GUESS_WRONG_SPOT, GUESS_RIGHT_SPOT, CACHE_DIR, MAX_FEEDBACK_MATRIX_BYTES, FEEDBACK_WORDLE, FEEDBACK_LEGACY, FEEDBACK_MODES, DEFAULT_FEEDBACK
+
+# Feedback for a (guess, answer) pair is stored as a base-3 integer where the first letter of the
+# guess is the most significant digit, i.e. the clue [0, 1, 2, 0, 2] is int('01202', 3).
+
+# Lane width in bytes -> array typecode used to view the packed feedback rows
+LANE_TYPECODES = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+MATRIX_MAGIC = b'WFMX'
+MATRIX_VERSION = 2
+# magic, version, lane width, N, feedback mode, rows, cols
+MATRIX_HEADER = struct.Struct('<4sBBBBII')
+
+TILE_EMOJI = {
+    NOTHING: '⬛',
+    GUESS_WRONG_SPOT: '🟨',
+    GUESS_RIGHT_SPOT: '🟩',
+}
+EMOJI_TILE = {e: t for t, e in TILE_EMOJI.items()}
+
+def encode_clue(clue: Sequence[int]) -> int:
+    # A Clue already is its code
+    if isinstance(clue, int):
+        return int(clue)
+    code = 0
+    for c in clue:
+        code = code * 3 + c
+    return code
+
+def decode_clue(code: int, n: int) -> List[int]:
+    clue = [NOTHING] * n
+    for i in range(n - 1, -1, -1):
+        code, clue[i] = divmod(code, 3)
+    return clue
+
+def solved_code(n: int) -> int:
+    return 3 ** n - 1
+
+# The clue type used throughout: a feedback code that knows its length. It is the int, so clues compare, hash and
+# look up matrix cells and tree edges as integers; it also reads as its tiles ([0, 1, 2, 0, 2]) for code that
+# walks them, and prints as '01202'.
+class Clue(int):
+    def __new__(cls, code: int, n: int) -> 'Clue':
+        clue = int.__new__(cls, code)
+        clue.n = n
+        return clue
+
+    def __reduce__(self):
+        return (Clue, (int(self), self.n))
+
+    @classmethod
+    def from_tiles(cls, tiles: Sequence[int]) -> 'Clue':
+        if isinstance(tiles, Clue):
+            return tiles
+        return cls(encode_clue(tiles), len(tiles))
+
+    # Reads '01202' or '⬛🟨🟩⬛🟩'
+    @classmethod
+    def parse(cls, text: str) -> 'Clue':
+        text = text.strip()
+        if len(text) and all(c in '012' for c in text):
+            return cls(int(text, 3), len(text))
+        if len(text) and all(c in EMOJI_TILE for c in text):
+            return cls.from_tiles([EMOJI_TILE[c] for c in text])
+        raise Exception(f'[{text}] is not a clue, expected e.g. 01202 or ⬛🟨🟩⬛🟩')
+
+    def tiles(self) -> List[int]:
+        return decode_clue(self, self.n)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __iter__(self):
+        return iter(self.tiles())
+
+    def __getitem__(self, i):
+        return self.tiles()[i]
+
+    # Equal to the same code, or to the same tiles as a list
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple)):
+            return self.tiles() == list(other)
+        return int.__eq__(self, other)
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    __hash__ = int.__hash__
+
+    def __str__(self) -> str:
+        return ''.join(map(str, self.tiles()))
+
+    def __repr__(self) -> str:
+        return f"Clue('{self}')"
+
+    def emoji(self) -> str:
+        return ''.join(TILE_EMOJI[t] for t in self.tiles())
+
+    def is_solved(self) -> bool:
+        return int(self) == solved_code(self.n)
+
+# Clue for a clue given as tiles or as a Clue, for n letters
+def as_clue(clue: Sequence[int], n: Optional[int]=None) -> Clue:
+    if isinstance(clue, Clue):
+        return clue
+    if isinstance(clue, int):
+        return Clue(clue, n)
+    return Clue.from_tiles(clue)
+
+def lane_width(n: int) -> int:
+    for width in LANE_TYPECODES:
+        if solved_code(n) < 256 ** width:
+            return width
+    raise Exception(f'Word length [{n}] is too long to encode feedback')
+
+def check_feedback_mode(mode: str):
+    if not mode in FEEDBACK_MODES:
+        raise Exception(f'Unknown feedback mode [{mode}]. Pick from {FEEDBACK_MODES}')
+
+# The feedback guess gets against answer. With FEEDBACK_WORDLE, like the real game, letters in the right spot
+# are 🟩 and then the other copies of a letter are 🟨 left to right, only as many times as the answer has copies
+# of it that aren't 🟩. With FEEDBACK_LEGACY a letter that is in the word but not in the right spot is always 🟨,
+# regardless of how many times it appears.
+def feedback_code(guess: str, answer: str, mode: str=DEFAULT_FEEDBACK) -> int:
+    code = 0
+    if mode == FEEDBACK_LEGACY:
+        for g, a in zip(guess, answer):
+            if g == a:
+                code = code * 3 + GUESS_RIGHT_SPOT
+            elif g in answer:
+                code = code * 3 + GUESS_WRONG_SPOT
+            else:
+                code = code * 3 + NOTHING
+        return code
+    unmatched = {}
+    for g, a in zip(guess, answer):
+        if g != a:
+            unmatched[a] = unmatched.get(a, 0) + 1
+    for g, a in zip(guess, answer):
+        if g == a:
+            code = code * 3 + GUESS_RIGHT_SPOT
+        elif unmatched.get(g, 0):
+            unmatched[g] -= 1
+            code = code * 3 + GUESS_WRONG_SPOT
+        else:
+            code = code * 3 + NOTHING
+    return code
+
+def has_repeated_letters(word: str) -> bool:
+    return len(set(word)) < len(word)
+
+# Precomputed per-answer masks that let a whole row of feedback (one guess against every answer)
+# be computed with a handful of big integer operations. Each answer owns a fixed-width little
+# endian lane of the integer, and since no lane can exceed solved_code(n) the additions never
+# carry across lanes. Every mask holds 0 or 1 per lane, so & of two masks is a per answer AND.
+class AnswerLanes:
+    def __init__(self, answers: Sequence[str], mode: str=DEFAULT_FEEDBACK):
+        check_feedback_mode(mode)
+        self.answers = list(answers)
+        self.mode = mode
+        self.n = len(self.answers[0]) if len(self.answers) else 0
+        self.width = lane_width(self.n)
+        self.weights = [3 ** (self.n - 1 - i) for i in range(self.n)]
+        size = len(self.answers) * self.width
+        right_place = [{} for i in range(self.n)]
+        at_least = {}
+        for j, answer in enumerate(self.answers):
+            offset = j * self.width
+            counts = {}
+            for i, l in enumerate(answer):
+                if not l in right_place[i]:
+                    right_place[i][l] = bytearray(size)
+                right_place[i][l][offset] = 1
+                counts[l] = counts.get(l, 0) + 1
+                thresholds = at_least.setdefault(l, [None])
+                if len(thresholds) <= counts[l]:
+                    thresholds.append(bytearray(size))
+                thresholds[counts[l]][offset] = 1
+        self.ones = int.from_bytes(b''.join([b'\1' + b'\0' * (self.width - 1)] * len(self.answers)), 'little')
+        self.right_place = [{l: int.from_bytes(m, 'little') for l, m in pos.items()} for pos in right_place]
+        # at_least[l][k] has the answers with at least k copies of l
+        self.at_least = {l: [self.ones] + [int.from_bytes(m, 'little') for m in thresholds[1:]] for l, thresholds in at_least.items()}
+        self.contains = {l: thresholds[1] for l, thresholds in self.at_least.items()}
+
+    def with_at_least(self, letter: str, count: int) -> int:
+        thresholds = self.at_least.get(letter, [self.ones])
+        return thresholds[count] if count < len(thresholds) else 0
+
+    def row_int(self, guess: str) -> int:
+        row = 0
+        places = {}
+        for i, l in enumerate(guess):
+            places.setdefault(l, []).append(i)
+        for l, ixes in places.items():
+            if len(ixes) == 1 or self.mode == FEEDBACK_LEGACY:
+                # 🟩 lanes get 1 + 1, 🟨 lanes get 0 + 1 and ⬛ lanes stay 0
+                for i in ixes:
+                    row += self.weights[i] * (self.right_place[i].get(l, 0) + self.contains.get(l, 0))
+                continue
+            # A repeated letter: split the answers by which of its copies are 🟩, then the k-th other copy is 🟨
+            # in the answers that have at least (number of 🟩 copies + k) of the letter
+            greens = [self.right_place[i].get(l, 0) for i in ixes]
+            for i, green in zip(ixes, greens):
+                row += self.weights[i] * 2 * green
+            for subset in range(1 << len(ixes)):
+                mask = self.ones
+                green_count = 0
+                for bit, green in enumerate(greens):
+                    if subset >> bit & 1:
+                        mask &= green
+                        green_count += 1
+                    else:
+                        mask &= self.ones ^ green
+                if not mask:
+                    continue
+                rank = 0
+                for bit, i in enumerate(ixes):
+                    if subset >> bit & 1:
+                        continue
+                    rank += 1
+                    row += self.weights[i] * (mask & self.with_at_least(l, green_count + rank))
+        return row
+
+    def row_bytes(self, guess: str) -> bytes:
+        return self.row_int(guess).to_bytes(len(self.answers) * self.width, 'little')
+
+    # Feedback codes of guess against every answer, in answer order
+    def row_codes(self, guess: str) -> List[int]:
+        codes = array(LANE_TYPECODES[self.width], self.row_bytes(guess))
+        if sys.byteorder != 'little' and self.width > 1:
+            codes.byteswap()
+        return codes.tolist()
+
+# Feedback codes of each of guesses against every answer: one row per guess, in answer order.
+def feedback_rows(guesses: Sequence[str], answers: Sequence[str], mode: str=DEFAULT_FEEDBACK) -> List[List[int]]:
+    lanes = AnswerLanes(answers, mode=mode)
+    return [lanes.row_codes(g) for g in guesses]
+
+# A dense guess x answer table of feedback codes, optionally memory-mapped from CACHE_DIR. Rows and
+# columns are in sorted word order so the same dictionaries always map to the same cache file.
+class FeedbackMatrix:
+    def __init__(self, guess_set: Sequence[str], candidate_set: Sequence[str], data, n: int, mode: str=DEFAULT_FEEDBACK):
+        self.guess_set = list(guess_set)
+        self.candidate_set = list(candidate_set)
+        self.N = n
+        self.mode = mode
+        self.width = lane_width(n)
+        self.guess_ids = {w: i for i, w in enumerate(self.guess_set)}
+        self.candidate_ids = {w: i for i, w in enumerate(self.candidate_set)}
+        self.cols = len(self.candidate_set)
+        # Set when the matrix is memory-mapped from a cache file
+        self.path = None
+        if sys.byteorder != 'little' and self.width > 1:
+            # Files are always little endian, so big endian hosts pay for a copy instead of a mmap
+            swapped = array(LANE_TYPECODES[self.width], bytes(data))
+            swapped.byteswap()
+            data = swapped
+        self._data = memoryview(data).cast('B').cast(LANE_TYPECODES[self.width])
+
+    # Memory-mapped matrices pickle as their path so worker processes map the same file instead of copying it
+    def __reduce__(self):
+        if self.path:
+            return (FeedbackMatrix.open, (self.path, self.guess_set, self.candidate_set, self.mode))
+        return (FeedbackMatrix, (self.guess_set, self.candidate_set, self._little_endian_bytes(), self.N, self.mode))
+
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def code(self, guess: str, answer: str) -> int:
+        return self._data[self.guess_ids[guess] * self.cols + self.candidate_ids[answer]]
+
+    def row(self, guess: str) -> memoryview:
+        start = self.guess_ids[guess] * self.cols
+        return self._data[start:start + self.cols]
+
+    def covers(self, guess: str, answer: Optional[str]=None) -> bool:
+        return guess in self.guess_ids and (answer is None or answer in self.candidate_ids)
+
+    def _little_endian_bytes(self) -> bytes:
+        if sys.byteorder == 'little' or self.width == 1:
+            return self._data.tobytes()
+        swapped = array(LANE_TYPECODES[self.width], self._data)
+        swapped.byteswap()
+        return swapped.tobytes()
+
+    @staticmethod
+    def cache_key(guess_set: Sequence[str], candidate_set: Sequence[str], mode: str=DEFAULT_FEEDBACK) -> str:
+        h = hashlib.sha1()
+        h.update(f'v{MATRIX_VERSION}\n{mode}\n'.encode())
+        h.update('\n'.join(sorted(set(guess_set))).encode())
+        h.update(b'\0')
+        h.update('\n'.join(sorted(set(candidate_set))).encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def cache_path(guess_set: Sequence[str], candidate_set: Sequence[str], cache_dir: str=CACHE_DIR, mode: str=DEFAULT_FEEDBACK) -> str:
+        return os.path.join(cache_dir, f'feedback_{FeedbackMatrix.cache_key(guess_set, candidate_set, mode=mode)}.bin')
+
+    @staticmethod
+    def expected_bytes(guess_set: Sequence[str], candidate_set: Sequence[str]) -> int:
+        n = len(candidate_set[0]) if len(candidate_set) else 0
+        return len(guess_set) * len(candidate_set) * lane_width(n)
+
+    @classmethod
+    def build(cls, guess_set: Sequence[str], candidate_set: Sequence[str], mode: str=DEFAULT_FEEDBACK) -> 'FeedbackMatrix':
+        guess_set, candidate_set = sorted(set(guess_set)), sorted(set(candidate_set))
+        lanes = AnswerLanes(candidate_set, mode=mode)
+        data = b''.join(lanes.row_bytes(g) for g in guess_set)
+        return cls(guess_set, candidate_set, data, lanes.n, mode=mode)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(MATRIX_HEADER.pack(MATRIX_MAGIC, MATRIX_VERSION, self.width, self.N, FEEDBACK_MODES.index(self.mode), len(self.guess_set), self.cols))
+            f.write(self._little_endian_bytes())
+        os.replace(tmp, path)
+
+    # Same file as build(...).save(path), written a row at a time so building it never holds more than one row
+    # (plus the AnswerLanes) in memory, however big the matrix.
+    @staticmethod
+    def write(path: str, guess_set: Sequence[str], candidate_set: Sequence[str], mode: str=DEFAULT_FEEDBACK):
+        guess_set, candidate_set = sorted(set(guess_set)), sorted(set(candidate_set))
+        lanes = AnswerLanes(candidate_set, mode=mode)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(MATRIX_HEADER.pack(MATRIX_MAGIC, MATRIX_VERSION, lanes.width, lanes.n, FEEDBACK_MODES.index(mode), len(guess_set), len(candidate_set)))
+            for g in guess_set:
+                f.write(lanes.row_bytes(g))
+        os.replace(tmp, path)
+
+    @classmethod
+    def open(cls, path: str, guess_set: Sequence[str], candidate_set: Sequence[str], mode: str=DEFAULT_FEEDBACK) -> 'FeedbackMatrix':
+        guess_set, candidate_set = sorted(set(guess_set)), sorted(set(candidate_set))
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, width, n, mode_id, rows, cols = MATRIX_HEADER.unpack_from(mm)
+        if magic != MATRIX_MAGIC or version != MATRIX_VERSION or rows != len(guess_set) or cols != len(candidate_set):
+            raise Exception(f'Feedback matrix [{path}] does not match the word lists')
+        if mode_id >= len(FEEDBACK_MODES) or FEEDBACK_MODES[mode_id] != mode:
+            raise Exception(f'Feedback matrix [{path}] is not scored with [{mode}] feedback')
+        if len(mm) != MATRIX_HEADER.size + rows * cols * width:
+            raise Exception(f'Feedback matrix [{path}] is truncated')
+        matrix = cls(guess_set, candidate_set, memoryview(mm)[MATRIX_HEADER.size:], n, mode=mode)
+        matrix.path = path
+        return matrix
+
+    # Loads the matrix for these word lists from the cache, building and persisting it first if needed.
+    @classmethod
+    def load(cls, guess_set: Sequence[str], candidate_set: Sequence[str], cache_dir: str=CACHE_DIR, mode: str=DEFAULT_FEEDBACK) -> 'FeedbackMatrix':
+        path = FeedbackMatrix.cache_path(guess_set, candidate_set, cache_dir=cache_dir, mode=mode)
+        if os.path.exists(path):
+            try:
+                return cls.open(path, guess_set, candidate_set, mode=mode)
+            except Exception:
+                pass
+        FeedbackMatrix.write(path, guess_set, candidate_set, mode=mode)
+        return cls.open(path, guess_set, candidate_set, mode=mode)
+
+# Returns None rather than a matrix when it would be too large to hold for these word lists.
+def load_feedback_matrix(
+    guess_set: Sequence[str],
+    candidate_set: Sequence[str],
+    cache_dir: str=CACHE_DIR,
+    max_bytes: int=MAX_FEEDBACK_MATRIX_BYTES,
+    mode: str=DEFAULT_FEEDBACK
+) -> Optional[FeedbackMatrix]:
+    if not len(guess_set) or not len(candidate_set):
+        return None
+    if FeedbackMatrix.expected_bytes(guess_set, candidate_set) > max_bytes:
+        return None
+    return FeedbackMatrix.load(guess_set, candidate_set, cache_dir=cache_dir, mode=mode)
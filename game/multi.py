@@ -0,0 +1,57 @@
+from typing import Dict, List, Optional, Tuple
+from .constants import DEFAULT_GAME_CONFIG
+from .feedback import Clue
+from .wordle import Wordle
+
+# Separates the words of a multi-board game in eval labels and result files, e.g. 'tesla+brain+unlit+swims'
+BOARD_SEPARATOR = '+'
+
+def split_boards(label: str) -> List[str]:
+    return label.split(BOARD_SEPARATOR)
+
+def join_boards(words: List[str]) -> str:
+    return BOARD_SEPARATOR.join(words)
+
+# Several Wordles played with the same guesses (Quordle has 4 boards and 9 guesses, Octordle 8 and 13). Every
+# guess is scored on each board not solved yet; the game is won when every board is solved within max_guesses.
+class MultiWordle:
+    def __init__(self, words: List[str], config: Dict[str, str] = DEFAULT_GAME_CONFIG, verbose=True):
+        if not len(words):
+            raise Exception('No words to play on')
+        if config.get('evil') is not None:
+            raise Exception('Evil hosts only play a single board')
+        self.MAX_GUESSES = int(config['max_guesses'])
+        self.boards = [Wordle(word, config=config, verbose=False) for word in words]
+        self.N = self.boards[0].N
+        self.guesses = []
+        self.state = Wordle.PLAYING
+        self.verbose = verbose
+
+    def words(self) -> List[str]:
+        return [board._word for board in self.boards]
+
+    def solved(self) -> List[bool]:
+        return [board.state == Wordle.SOLVED for board in self.boards]
+
+    # The clue the guess got on each board, None for the boards solved before it
+    def guess(self, guess: str) -> Tuple[List[Optional[Clue]], int]:
+        if self.state != Wordle.PLAYING:
+            if self.verbose:
+                print('Already solved!' if self.state == Wordle.SOLVED else 'Already lost!')
+            return [None] * len(self.boards), self.state
+        guess = guess.lower()
+        Wordle.check_word(self.N, guess, self.boards[0].guess_set)
+        self.guesses.append(guess)
+        clues = [board.guess(guess)[0] if board.state == Wordle.PLAYING else None for board in self.boards]
+        if self.verbose:
+            print(guess.upper())
+            print(' '.join(Wordle.emojify(clue) if clue is not None else '  ' * self.N for clue in clues))
+        if all(self.solved()):
+            if self.verbose:
+                print(f'Solved all {len(self.boards)} boards!')
+            self.state = Wordle.SOLVED
+        elif len(self.guesses) >= self.MAX_GUESSES:
+            if self.verbose:
+                print(f'Lost! Words were {self.words()} - {self.guesses}')
+            self.state = Wordle.UNSOLVED
+        return clues, self.state
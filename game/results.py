@@ -0,0 +1,167 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from collections import Counter
+import json
+import multiprocessing
+import os
+from time import perf_counter
+from .evil import make_game
+from .feedback import Clue
+from .multi import BOARD_SEPARATOR, MultiWordle, split_boards
+from .solver.multi import solve_multi
+from .solver.profile import Profiler
+from .solver.solver import solve_wordle
+from .wordle import Wordle
+
+# Eval results, one row per word, streamed to --eval_out_file as each word is solved so that a long eval can be
+# stopped at any point and resumed. Files ending in .jsonl get one JSON object per line, anything else is CSV.
+# Each guess's clue is kept as its feedback code (see Clue in game/feedback.py); files written before clues were
+# recorded have no clues column and still read.
+
+RESULT_HEADERS = ['word', 'solved', 'guesses', 'attempts', 'clues']
+CSV = 'csv'
+JSONL = 'jsonl'
+
+def result_format(path: str) -> str:
+    return JSONL if path.endswith('.jsonl') else CSV
+
+def format_result(word: str, solved: bool, guesses: List[str], fmt: str=CSV, clues: Sequence[int]=()) -> str:
+    codes = [int(c) for c in clues]
+    if fmt == JSONL:
+        return json.dumps({'word': word, 'solved': solved, 'guesses': guesses, 'attempts': len(guesses), 'clues': codes})
+    return ','.join([word, '1' if solved else '0', '-'.join(guesses), str(len(guesses)), '-'.join(map(str, codes))])
+
+def parse_result(line: str, fmt: str=CSV) -> Optional[Tuple[str, bool, List[str]]]:
+    try:
+        if fmt == JSONL:
+            row = json.loads(line)
+            return row['word'], bool(row['solved']), list(row['guesses'])
+        word, solved, guesses = line.split(',')[:3]
+        if word == RESULT_HEADERS[0]:
+            return None
+        return word, solved == '1', guesses.split('-') if guesses else []
+    except (ValueError, KeyError, TypeError):
+        return None
+
+# The rows of a results file. A last line without a newline was cut off mid write and is skipped.
+def read_results(path: str) -> Iterator[Tuple[str, bool, List[str]]]:
+    fmt = result_format(path)
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            row = parse_result(line.rstrip('\n'), fmt)
+            if row is not None:
+                yield row
+
+class ResultWriter:
+    def __init__(self, path: str, append: bool=False):
+        self.path = path
+        self.fmt = result_format(path)
+        if append and os.path.exists(path):
+            self._drop_partial_line()
+            self.f = open(path, 'a')
+        else:
+            self.f = open(path, 'w')
+        if self.fmt == CSV and self.f.tell() == 0:
+            self.f.write(','.join(RESULT_HEADERS) + '\n')
+
+    def _drop_partial_line(self):
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if len(data) and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def write(self, word: str, solved: bool, guesses: List[str], clues: Sequence[int]=()):
+        self.f.write(format_result(word, solved, guesses, self.fmt, clues=clues) + '\n')
+        # Every finished word is on disk, so an interrupted eval only loses the words in flight
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+# Running totals of an eval, updated one word at a time so nothing grows with the number of words but the
+# list of failed words.
+class EvalStats:
+    def __init__(self):
+        self.count = 0
+        self.solved_attempts = 0
+        self.failed = []
+        # number of guesses -> words, for the failed and the solved words
+        self.failed_lengths = Counter()
+        self.attempts = Counter()
+
+    def add(self, word: str, solved: bool, guesses: List[str]):
+        self.count += 1
+        if solved:
+            self.solved_attempts += len(guesses)
+            self.attempts[len(guesses)] += 1
+        else:
+            self.failed.append(word)
+            self.failed_lengths[len(guesses)] += 1
+
+    def accuracy(self) -> float:
+        return 1 - len(self.failed) / self.count if self.count else 0.0
+
+    def avg_attempts(self) -> float:
+        return self.solved_attempts / self.count if self.count else 0.0
+
+# Plays and solves the game for word: a MultiWordle if word has several boards (e.g. 'tesla+brain'), otherwise a
+# Wordle (or evil host, see make_game). Returns whether it was solved and the game.
+def solve_game(word: str, game_config: Dict[str, str], solver_settings: Dict[str, str], debug: int=0, verbose=True):
+    if BOARD_SEPARATOR in word:
+        w = MultiWordle(split_boards(word), config=game_config, verbose=verbose)
+        got_ans, _, _ = solve_multi(w, solver_settings=solver_settings, debug=debug)
+    else:
+        w = make_game(word, config=game_config, verbose=verbose)
+        got_ans, _, _ = solve_wordle(w, solver_settings=solver_settings, debug=debug)
+    return got_ans, w
+
+# Per-process state for eval workers, set up once by _init_eval_worker so every word doesn't pay
+# for shipping the dictionaries and indexes again.
+_eval_worker_state = {}
+
+def _init_eval_worker(game_config: Dict[str, str], solver_settings: Dict[str, str], debug: int=0):
+    if solver_settings.get('profiler') is not None:
+        # Each worker profiles into its own Profiler and hands back what it recorded with every word
+        solver_settings = dict(solver_settings)
+        solver_settings['profiler'] = Profiler()
+    _eval_worker_state['game_config'] = game_config
+    _eval_worker_state['solver_settings'] = solver_settings
+    _eval_worker_state['debug'] = debug
+
+def _eval_word(word: str) -> Tuple[str, bool, List[str], List[Clue], float, Optional[Tuple[List, List]]]:
+    debug = _eval_worker_state['debug']
+    start = perf_counter()
+    got_ans, w = solve_game(word, _eval_worker_state['game_config'], _eval_worker_state['solver_settings'], debug=debug, verbose=debug >= 2)
+    seconds = perf_counter() - start
+    profiler = _eval_worker_state['solver_settings'].get('profiler')
+    profile = None
+    if profiler is not None:
+        profile = (profiler.turns, profiler.games)
+        profiler.turns, profiler.games = [], []
+    # A multi-board game has a clue per board for every guess, which results files don't keep
+    clues = w.clues if isinstance(w, Wordle) else []
+    return word, got_ans, w.guesses, clues, seconds, profile
+
+# Yields (word, solved, guesses, clues, seconds, profile) in the same order as words, solving them across a process pool if
+# workers > 1. profile is the (turns, games) the word's game recorded if solver_settings has a profiler.
+def eval_results(words: List[str], game_config: Dict[str, str], solver_settings: Dict[str, str], debug: int=0, workers: int=1):
+    if workers <= 1:
+        _init_eval_worker(game_config, solver_settings, debug=debug)
+        for word in words:
+            yield _eval_word(word)
+        return
+    opening_book = solver_settings.get('opening_book')
+    if opening_book is not None:
+        # Build the book once here rather than in every worker
+        opening_book.prepare(solver_settings)
+    chunksize = max(1, len(words) // (workers * 8))
+    with multiprocessing.Pool(workers, initializer=_init_eval_worker, initargs=(game_config, solver_settings, debug)) as pool:
+        # imap keeps the input order so the results, and anything written from them, match a serial run
+        yield from pool.imap(_eval_word, words, chunksize=chunksize)
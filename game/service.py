@@ -0,0 +1,365 @@
+from typing import Dict, List, Optional, Set, Tuple
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import json
+import os
+import uuid
+from time import perf_counter, time
+from .config import load_configs
+from .constants import DATA_DIR, TREE_DIR, DEFAULT_N, DEFAULT_MAX_GUESSES, DEFAULT_DICT, DEFAULT_CAND_DICT, DEFAULT_SOLVER_SETTINGS, DEFAULT_STRATEGY_TOP_K, DEFAULT_GUESS_CACHE_SIZE, DEFAULT_FEEDBACK, FEEDBACK_MODES
+from .feedback import Clue
+from .solver.profile import PERCENTILES, percentile
+from .solver.session import SolverSession
+from .solver.solver import guess_next_word, is_finished
+from .solver.strategy import STRATEGIES
+
+# A long running HTTP/JSON solver (python main.py -m serve). Word lists, indexes, feedback matrices and solution
+# trees are loaded once per configuration in each worker and kept warm, and guesses are computed in a worker pool
+# so the event loop only parses requests and tracks sessions.
+#
+# Endpoints (request and response bodies are JSON):
+#  POST   /guess                 {"clues": [["soare", "01121"], ...], "config": {...}} -> next guess
+#  POST   /candidates            {"clues": [...], "config": {...}} -> every candidate left
+#  POST   /sessions              {"config": {...}} -> {"session_id": ...} and the first guess
+#  GET    /sessions/<id>         -> the session's clues and next guess
+#  POST   /sessions/<id>/clues   {"word": "soare", "clue": "01121"} -> next guess
+#  DELETE /sessions/<id>
+#  GET    /metrics               request counts and latency percentiles per endpoint
+#  GET    /health
+#
+# Clues are a string of 0 (⬛), 1 (🟨) and 2 (🟩) or a list of those numbers. "config" is optional and may set any
+# of CONFIG_DEFAULTS; every distinct config gets its own word lists and settings, so requests with different
+# dictionaries or hard mode never share state. Each worker keeps the MAX_WORKER_CONFIGS most recently used ones, and
+# the files a config names must be in DATA_DIR or TREE_DIR, or be one of the server's own (see allowed_files).
+# Sessions are dropped SESSION_TTL seconds after they were last used, or oldest first past MAX_SESSIONS.
+
+CONFIG_DEFAULTS = {
+    'N': DEFAULT_N,
+    'dict_file': DEFAULT_DICT,
+    'cand_file': DEFAULT_CAND_DICT,
+    'guesses': DEFAULT_MAX_GUESSES,
+    'hard_mode': False,
+    'strategy': DEFAULT_SOLVER_SETTINGS['strategy'],
+    'top_k': DEFAULT_STRATEGY_TOP_K,
+    'tree_file': None,
+    'feedback': DEFAULT_FEEDBACK,
+    # Time budget for each guess, see game/solver/deadline.py
+    'deadline_ms': None,
+}
+# Config keys that name a file on the server
+FILE_KEYS = ['dict_file', 'cand_file', 'tree_file']
+CONFIG_TYPES = {'N': int, 'dict_file': str, 'cand_file': str, 'guesses': int, 'hard_mode': bool, 'strategy': str, 'top_k': int, 'tree_file': str, 'feedback': str, 'deadline_ms': int}
+
+# Latencies kept per endpoint for the percentiles in /metrics
+LATENCY_WINDOW = 10000
+MAX_BODY_BYTES = 1 << 20
+# Configs (word lists, indexes, feedback matrices, ...) each worker keeps loaded
+MAX_WORKER_CONFIGS = 8
+MAX_SESSIONS = 10000
+SESSION_TTL = 24 * 60 * 60
+
+class RequestError(Exception):
+    def __init__(self, message: str, status: int=400):
+        super().__init__(message)
+        self.status = status
+
+    # Keep the status when raised in a worker process
+    def __reduce__(self):
+        return (RequestError, (str(self), self.status))
+
+# A hashable, validated config: the defaults overridden by a request's "config"
+ConfigKey = Tuple[Tuple[str, object], ...]
+
+# The word lists and trees a request's config may name: the files in DATA_DIR and TREE_DIR, and the ones in defaults
+def allowed_files(defaults: Dict=CONFIG_DEFAULTS) -> Set[str]:
+    allowed = set()
+    for directory in [DATA_DIR, TREE_DIR]:
+        if os.path.isdir(directory):
+            paths = [os.path.join(directory, fname) for fname in os.listdir(directory)]
+            allowed.update(os.path.normpath(path) for path in paths if os.path.isfile(path))
+    allowed.update(os.path.normpath(defaults[k]) for k in FILE_KEYS if defaults.get(k))
+    return allowed
+
+def config_key(overrides: Optional[Dict], defaults: Dict=CONFIG_DEFAULTS, allowed: Optional[Set[str]]=None) -> ConfigKey:
+    overrides = overrides or {}
+    if not isinstance(overrides, dict):
+        raise RequestError('config must be an object')
+    unknown = set(overrides) - set(defaults)
+    if len(unknown):
+        raise RequestError(f'Unknown config keys {sorted(unknown)}. Pick from {sorted(defaults)}')
+    config = dict(defaults)
+    for k, v in overrides.items():
+        if v is not None and not isinstance(v, CONFIG_TYPES[k]):
+            raise RequestError(f'config [{k}] must be a {CONFIG_TYPES[k].__name__}')
+        config[k] = v
+    if allowed is None:
+        allowed = allowed_files(defaults)
+    for k in FILE_KEYS:
+        if overrides.get(k) is not None and not os.path.normpath(overrides[k]) in allowed:
+            raise RequestError(f'config [{k}] must be a file in ./{DATA_DIR}/ or ./{TREE_DIR}/', status=403)
+    if not config['strategy'] in STRATEGIES:
+        raise RequestError(f'Unknown strategy [{config["strategy"]}]. Pick from {STRATEGIES}')
+    if not config['feedback'] in FEEDBACK_MODES:
+        raise RequestError(f'Unknown feedback [{config["feedback"]}]. Pick from {FEEDBACK_MODES}')
+    if not isinstance(config['top_k'], int) or config['top_k'] < 1:
+        raise RequestError(f'config [top_k] must be at least 1')
+    return tuple(sorted(config.items()))
+
+def parse_clue(word: str, clue, N: int) -> Tuple[str, Clue]:
+    if not isinstance(word, str) or len(word) != N:
+        raise RequestError(f'[{word}] needs to be {N} letters')
+    if isinstance(clue, str) and len(clue) == N and all(c in '012' for c in clue):
+        return word.lower(), Clue.parse(clue)
+    if not isinstance(clue, list) or len(clue) != N or not all(c in (0, 1, 2) for c in clue):
+        raise RequestError(f'Clue for [{word}] must be {N} of 0, 1 or 2')
+    return word.lower(), Clue.from_tiles(clue)
+
+# Clues as they go out in responses, with the tiles as a list like they can come in
+def clue_lists(clues: List[Tuple[str, Clue]]) -> List[Tuple[str, List[int]]]:
+    return [(word, clue.tiles()) for word, clue in clues]
+
+def parse_clues(clues, N: int) -> List[Tuple[str, Clue]]:
+    if not isinstance(clues, list):
+        raise RequestError('clues must be a list of [word, clue] pairs')
+    parsed = []
+    for pair in clues:
+        if not isinstance(pair, list) or len(pair) != 2:
+            raise RequestError('clues must be a list of [word, clue] pairs')
+        parsed.append(parse_clue(pair[0], pair[1], N))
+    return parsed
+
+# Per-process (game_config, solver_settings, guess set), loaded the first time a worker sees a config, least
+# recently used first
+_worker_configs = OrderedDict()
+
+def _configs(key: ConfigKey) -> Tuple[Dict, Dict, Set[str]]:
+    if key in _worker_configs:
+        _worker_configs.move_to_end(key)
+    else:
+        config = dict(key)
+        game_config, solver_settings = load_configs(
+            config['N'],
+            config['dict_file'],
+            config['cand_file'],
+            max_guesses=config['guesses'],
+            hard_mode=config['hard_mode'],
+            strategy=config['strategy'],
+            top_k=config['top_k'],
+            tree_file=config['tree_file'],
+            feedback=config['feedback'],
+            guess_cache_size=DEFAULT_GUESS_CACHE_SIZE,
+            deadline_ms=config['deadline_ms'])
+        _worker_configs[key] = (game_config, solver_settings, set(solver_settings['guess_set']))
+        while len(_worker_configs) > MAX_WORKER_CONFIGS:
+            _worker_configs.popitem(last=False)
+    return _worker_configs[key]
+
+def _warm(keys: List[ConfigKey]):
+    for key in keys:
+        _configs(key)
+
+# Runs in the worker pool. Returns the response body, or raises RequestError.
+def _solve(key: ConfigKey, clues: List[Tuple[str, Clue]], all_candidates: bool=False) -> Dict:
+    try:
+        _, solver_settings, guess_set = _configs(key)
+    except Exception as e:
+        raise RequestError(f'Could not load config: {str(e)}')
+    for word, _ in clues:
+        if not word in guess_set:
+            raise RequestError(f'[{word}] is not a valid word!')
+    if all_candidates:
+        session = SolverSession(solver_settings=solver_settings, debug=0)
+        for word, clue in clues:
+            session.add_clue(word, clue)
+        cands = session.candidates()
+        return {'candidates': cands, 'num_candidates': len(cands), 'solved': session.is_solved()}
+    try:
+        chosen, cands, lencands = guess_next_word(clues, solver_settings=solver_settings, debug=0)
+    except Exception as e:
+        raise RequestError(str(e), status=422)
+    # finished is false if the guess is the best found within deadline_ms
+    return {'guess': chosen, 'candidates': cands, 'num_candidates': lencands, 'solved': chosen is None, 'finished': is_finished(solver_settings)}
+
+def path_parts(path: str) -> List[str]:
+    return [p for p in path.split('?')[0].split('/') if p]
+
+# Name a request is counted under in /metrics, with session ids left out
+def endpoint_name(method: str, path: str) -> str:
+    parts = path_parts(path)
+    if len(parts) >= 2 and parts[0] == 'sessions':
+        parts[1] = '<id>'
+    return f'{method} /{"/".join(parts)}'
+
+class Metrics:
+    def __init__(self):
+        self.start = time()
+        self.requests = {}
+        self.errors = {}
+        self.latencies = {}
+        self.in_flight = 0
+
+    def record(self, endpoint: str, seconds: float, error: bool):
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        if error:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+        self.latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def to_dict(self) -> Dict:
+        endpoints = {}
+        for endpoint, count in self.requests.items():
+            latencies = list(self.latencies[endpoint])
+            stats = {'requests': count, 'errors': self.errors.get(endpoint, 0), 'mean_ms': sum(latencies) / len(latencies) * 1000}
+            for pct in PERCENTILES:
+                stats[f'p{pct}_ms'] = percentile(latencies, pct) * 1000
+            endpoints[endpoint] = stats
+        return {'uptime': time() - self.start, 'in_flight': self.in_flight, 'endpoints': endpoints}
+
+class SolverService:
+    def __init__(self, executor: Executor, defaults: Dict=CONFIG_DEFAULTS, max_sessions: int=MAX_SESSIONS, session_ttl: float=SESSION_TTL):
+        self.executor = executor
+        self.defaults = dict(defaults)
+        self.allowed = allowed_files(self.defaults)
+        # session id -> {'config': ConfigKey, 'clues': [...], 'lock': asyncio.Lock, 'used': time()}, least recently
+        # used first
+        self.sessions = OrderedDict()
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.metrics = Metrics()
+
+    async def _solve(self, key: ConfigKey, clues: List[Tuple[str, Clue]], all_candidates: bool=False) -> Dict:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, _solve, key, clues, all_candidates)
+
+    # Drops the sessions that expired, and the least recently used ones past max_sessions - room
+    def _expire_sessions(self, room: int=0):
+        expired = time() - self.session_ttl
+        while len(self.sessions) and (len(self.sessions) > self.max_sessions - room or next(iter(self.sessions.values()))['used'] < expired):
+            self.sessions.popitem(last=False)
+
+    def _session(self, session_id: str) -> Dict:
+        self._expire_sessions()
+        if not session_id in self.sessions:
+            raise RequestError(f'No session [{session_id}]', status=404)
+        self.sessions.move_to_end(session_id)
+        session = self.sessions[session_id]
+        session['used'] = time()
+        return session
+
+    # Returns (status, body)
+    async def handle(self, method: str, path: str, body: Dict) -> Tuple[int, Dict]:
+        parts = path_parts(path)
+        if method == 'GET' and parts == ['health']:
+            return 200, {'ok': True}
+        if method == 'GET' and parts == ['metrics']:
+            self._expire_sessions()
+            return 200, dict(self.metrics.to_dict(), sessions=len(self.sessions))
+        if method == 'POST' and parts in (['guess'], ['candidates']):
+            key = config_key(body.get('config'), self.defaults, self.allowed)
+            clues = parse_clues(body.get('clues', []), dict(key)['N'])
+            return 200, await self._solve(key, clues, all_candidates=parts == ['candidates'])
+        if method == 'POST' and parts == ['sessions']:
+            key = config_key(body.get('config'), self.defaults, self.allowed)
+            result = await self._solve(key, [])
+            session_id = uuid.uuid4().hex
+            self._expire_sessions(room=1)
+            self.sessions[session_id] = {'config': key, 'clues': [], 'lock': asyncio.Lock(), 'used': time()}
+            return 201, dict(result, session_id=session_id, clues=[])
+        if len(parts) == 2 and parts[0] == 'sessions':
+            session = self._session(parts[1])
+            if method == 'GET':
+                result = await self._solve(session['config'], session['clues'])
+                return 200, dict(result, session_id=parts[1], clues=clue_lists(session['clues']))
+            if method == 'DELETE':
+                del self.sessions[parts[1]]
+                return 200, {'session_id': parts[1], 'deleted': True}
+        if method == 'POST' and len(parts) == 3 and parts[0] == 'sessions' and parts[2] == 'clues':
+            session = self._session(parts[1])
+            clue = parse_clue(body.get('word'), body.get('clue'), dict(session['config'])['N'])
+            # Clues to one session are applied one at a time, and a clue the solver rejects isn't kept
+            async with session['lock']:
+                clues = session['clues'] + [clue]
+                result = await self._solve(session['config'], clues)
+                session['clues'] = clues
+            return 200, dict(result, session_id=parts[1], clues=clue_lists(clues))
+        raise RequestError(f'No endpoint {method} {path}', status=404)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+                start = perf_counter()
+                self.metrics.in_flight += 1
+                endpoint = endpoint_name(method.upper(), path)
+                try:
+                    try:
+                        length = int(headers.get('content-length', 0) or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        # Where the body ends isn't known, so nothing more can be read from the connection
+                        keep_alive = False
+                        raise RequestError('Content-Length must be a non-negative integer')
+                    if length > MAX_BODY_BYTES:
+                        # The body isn't read, so the next request on the connection would start inside it
+                        keep_alive = False
+                        raise RequestError('Request body too large', status=413)
+                    raw = await reader.readexactly(length) if length else b''
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError:
+                        raise RequestError('Body must be JSON')
+                    if not isinstance(body, dict):
+                        raise RequestError('Body must be a JSON object')
+                    status, response = await self.handle(method.upper(), path, body)
+                except RequestError as e:
+                    status, response = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, response = 500, {'error': str(e)}
+                finally:
+                    self.metrics.in_flight -= 1
+                self.metrics.record(endpoint, perf_counter() - start, status >= 400)
+                data = json.dumps(response).encode()
+                writer.write(
+                    f'HTTP/1.1 {status} {"OK" if status < 400 else "Error"}\r\n'
+                    f'Content-Type: application/json\r\n'
+                    f'Content-Length: {len(data)}\r\n'
+                    f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+def make_executor(workers: int, warm: List[ConfigKey]) -> Executor:
+    if workers <= 0:
+        # Solve in a single thread of this process (the solver settings aren't thread safe), e.g. when memory is tight
+        _warm(warm)
+        return ThreadPoolExecutor(1)
+    return ProcessPoolExecutor(workers, initializer=_warm, initargs=(warm,))
+
+async def serve(host: str, port: int, workers: int=1, defaults: Dict=CONFIG_DEFAULTS):
+    key = config_key(None, defaults)
+    service = SolverService(make_executor(workers, [key]), defaults=defaults)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f'Serving on http://{host}:{port} with {workers} worker(s)')
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.executor.shutdown()
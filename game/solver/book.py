@@ -0,0 +1,102 @@
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+from ..constants import CACHE_DIR
+from ..feedback import AnswerLanes, Clue, encode_clue
+from .memo import SETTINGS_KEYS
+from .solver import guess_next_word
+
+BOOK_VERSION = 1
+
+# The first guess, and the second guess for every feedback the first one can get, for one solver configuration
+# (settings and word lists), persisted in CACHE_DIR as JSON under a hash of the configuration. The first two
+# turns score the most candidates, so with a book every game after the first skips them. Put one in
+# solver_settings['opening_book'] and guess_next_word and SolverSession use it. It is built the first time a
+# configuration asks for it, or loaded if it was built before; a solution tree, when there is one, still wins.
+class OpeningBook:
+    def __init__(self, cache_dir: str=CACHE_DIR):
+        self.cache_dir = cache_dir
+        # cache key -> {entry key: (chosen, cands, lencands)}
+        self._books = {}
+
+    # Each process loads (or builds) its own books from the cache
+    def __reduce__(self):
+        return (OpeningBook, (self.cache_dir,))
+
+    @staticmethod
+    def cache_key(solver_settings: Dict[str, bool]) -> str:
+        candidates = solver_settings['candidate_set']
+        guesses = solver_settings.get('guess_set') or candidates
+        h = hashlib.sha1()
+        h.update(f'v{BOOK_VERSION}\n'.encode())
+        h.update('\n'.join(f'{k}={solver_settings.get(k)}' for k in SETTINGS_KEYS).encode())
+        # Word order decides ties between guesses, so the lists are hashed as they are
+        h.update(b'\0')
+        h.update('\n'.join(guesses).encode())
+        h.update(b'\0')
+        h.update('\n'.join(candidates).encode())
+        return h.hexdigest()
+
+    def cache_path(self, solver_settings: Dict[str, bool]) -> str:
+        return os.path.join(self.cache_dir, f'book_{OpeningBook.cache_key(solver_settings)}.json')
+
+    @staticmethod
+    def _entry_key(clues: List[Tuple[str, List[int]]]) -> str:
+        return ';'.join(f'{w}:{encode_clue(clue)}' for w, clue in clues)
+
+    # Computes every entry with the solver itself, leaving the book (and profiler and deadline) out of it
+    @staticmethod
+    def build(solver_settings: Dict[str, bool]) -> Dict[str, Tuple[str, List[str], int]]:
+        settings = dict(solver_settings)
+        settings['opening_book'] = None
+        settings['profiler'] = None
+        settings['deadline'] = None
+        entries = {}
+        first = guess_next_word([], solver_settings=settings, debug=0)
+        entries[OpeningBook._entry_key([])] = first
+        N = len(first[0])
+        codes = set(AnswerLanes(solver_settings['candidate_set'], mode=settings.get('feedback')).row_codes(first[0]))
+        for code in sorted(codes):
+            clues = [(first[0], Clue(code, N))]
+            entries[OpeningBook._entry_key(clues)] = guess_next_word(clues, solver_settings=settings, debug=0)
+        return entries
+
+    def save(self, path: str, entries: Dict[str, Tuple[str, List[str], int]]):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': BOOK_VERSION, 'entries': entries}, f)
+        os.replace(tmp, path)
+
+    def _load(self, path: str) -> Optional[Dict[str, Tuple[str, List[str], int]]]:
+        try:
+            with open(path, 'r') as f:
+                book = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if book.get('version') != BOOK_VERSION:
+            return None
+        return {key: (chosen, cands, lencands) for key, (chosen, cands, lencands) in book['entries'].items()}
+
+    # Loads the book for this configuration from the cache, building and persisting it first if needed.
+    def prepare(self, solver_settings: Dict[str, bool]) -> Dict[str, Tuple[str, List[str], int]]:
+        key = OpeningBook.cache_key(solver_settings)
+        if not key in self._books:
+            path = self.cache_path(solver_settings)
+            entries = self._load(path)
+            if entries is None:
+                entries = OpeningBook.build(solver_settings)
+                self.save(path, entries)
+            self._books[key] = entries
+        return self._books[key]
+
+    # Same contract as guess_next_word, or None if the clues are past the book (or off it)
+    def get(self, clues: List[Tuple[str, List[int]]], solver_settings: Dict[str, bool]) -> Optional[Tuple[str, List[str], int]]:
+        if len(clues) > 1:
+            return None
+        entry = self.prepare(solver_settings).get(OpeningBook._entry_key(clues))
+        if entry is None:
+            return None
+        chosen, cands, lencands = entry
+        return chosen, list(cands), lencands
@@ -0,0 +1,29 @@
+from typing import Optional
+from time import perf_counter
+
+# A time budget for picking each guess. Put one in solver_settings['deadline'] and every turn (guess_next_word,
+# SolverSession.next_guess or MultiSolver.next_guess) starts its clock. The solver always gets the cheap letter
+# frequency ordering of the guesses first, so it has a guess right away, and the partition strategies then refine
+# it by scoring their shortlist exactly in that order until the deadline. finished tells whether the last turn got
+# through everything, i.e. picked the same guess it would have with no deadline.
+#
+# Like the Profiler it keeps the state of the turn in progress, so each process (or thread) needs its own.
+class Deadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.finished = True
+        self._end = None
+
+    def start(self):
+        self._end = perf_counter() + self.seconds
+        self.finished = True
+
+    def expired(self) -> bool:
+        return self._end is not None and perf_counter() >= self._end
+
+    # Called by the solver when it gives up on the rest of the turn's work
+    def cut(self):
+        self.finished = False
+
+    def remaining(self) -> Optional[float]:
+        return max(0.0, self._end - perf_counter()) if self._end is not None else None
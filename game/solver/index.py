@@ -0,0 +1,79 @@
+from typing import Dict, Iterable, List, Optional, Set
+from collections import Counter
+
+# Turns a bitset of word ids back into the ids, lowest first.
+def bitset_ids(bits: int) -> List[int]:
+    ids = []
+    if not bits:
+        return ids
+    flags = bin(bits)[:1:-1]
+    ix = flags.find('1')
+    while ix >= 0:
+        ids.append(ix)
+        ix = flags.find('1', ix + 1)
+    return ids
+
+def ids_bitset(ids: Iterable[int]) -> int:
+    bits = 0
+    for ix in ids:
+        bits |= 1 << ix
+    return bits
+
+# Bitsets of word ids (bit i is words[i]) for every (position, letter), every letter the word contains and
+# every "letter appears at least k times" threshold. Built once per word list so that the constraints from
+# parse_clues compile into a handful of AND/ANDNOT operations instead of a scan over every word.
+class WordIndex:
+    def __init__(self, words: List[str]):
+        self.words = list(words)
+        self.ids = {w: i for i, w in enumerate(self.words)}
+        self.N = len(self.words[0]) if len(self.words) else 0
+        self.all = (1 << len(self.words)) - 1
+        at = [{} for i in range(self.N)]
+        count_at_least = {}
+        for ix, w in enumerate(self.words):
+            bit = 1 << ix
+            for i, l in enumerate(w):
+                at[i][l] = at[i].get(l, 0) | bit
+            for l, count in Counter(w).items():
+                thresholds = count_at_least.setdefault(l, [self.all])
+                while len(thresholds) <= count:
+                    thresholds.append(0)
+                for k in range(1, count + 1):
+                    thresholds[k] |= bit
+        self.at = at
+        # count_at_least[l][k] has every word with at least k copies of l; count_at_least[l][0] is every word
+        self.count_at_least = count_at_least
+        self.contains = {l: thresholds[1] for l, thresholds in count_at_least.items()}
+
+    def matches(self, words: List[str]) -> bool:
+        return self.words is words or self.words == words
+
+    def bitset(self, words: Iterable[str]) -> int:
+        return ids_bitset(self.ids[w] for w in words if w in self.ids)
+
+    def words_of(self, bits: int) -> List[str]:
+        return [self.words[ix] for ix in bitset_ids(bits)]
+
+    def with_at_least(self, letter: str, count: int) -> int:
+        thresholds = self.count_at_least.get(letter, [self.all])
+        return thresholds[count] if count < len(thresholds) else 0
+
+    def filter(
+        self,
+        word_right_place: Dict[str, Set[int]],
+        in_word_wrong_place: Dict[str, Set[int]],
+        not_in_word: Set[str],
+        bits: Optional[int]=None
+    ) -> int:
+        bits = self.all if bits is None else bits
+        for let, ixes in word_right_place.items():
+            for ix in ixes:
+                bits &= self.at[ix].get(let, 0) if ix < self.N else 0
+        for let, ixes in in_word_wrong_place.items():
+            bits &= self.contains.get(let, 0)
+            for ix in ixes:
+                if ix < self.N:
+                    bits &= ~self.at[ix].get(let, 0)
+        for let in not_in_word:
+            bits &= ~self.contains.get(let, 0)
+        return bits
@@ -0,0 +1,67 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from ..constants import DEFAULT_GUESS_CACHE_SIZE
+from ..feedback import encode_clue
+
+# The solver settings a guess depends on, besides the word lists
+SETTINGS_KEYS = ['non_strict', 'use_pos', 'max_guesses', 'non_pos_weight', 'strategy', 'strategy_top_k', 'feedback', 'start_word']
+
+# A bounded LRU cache of the solver's guesses by game state, so games that share clues (every game's first
+# guess, and e.g. most of the soare-... openings in an eval) only pick each guess once.
+#
+# A state is the set of (guess, feedback code) pairs played so far: the constraints, the surviving candidates,
+# the previous guesses and the guesses left are all the same whatever order the clues came in. It is keyed
+# together with the settings and word lists it was solved with, so one cache can be shared between settings.
+class GuessCache:
+    def __init__(self, max_size: int=DEFAULT_GUESS_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        # Word lists are keyed by id, so hold on to them to keep their ids from being reused
+        self._word_lists = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Word list ids don't survive pickling, so a cache shipped to another process (e.g. an eval worker) starts empty
+    def __reduce__(self):
+        return (GuessCache, (self.max_size,))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _list_id(self, words: Sequence[str]) -> int:
+        if not id(words) in self._word_lists:
+            self._word_lists[id(words)] = words
+        return id(words)
+
+    def key(self, clues: List[Tuple[str, List[int]]], solver_settings: Dict[str, bool]) -> Tuple:
+        settings = tuple(str(solver_settings.get(k)) for k in SETTINGS_KEYS)
+        word_lists = (self._list_id(solver_settings['candidate_set']), self._list_id(solver_settings.get('guess_set') or solver_settings['candidate_set']))
+        return settings, word_lists, tuple(sorted((w, encode_clue(clue)) for w, clue in clues))
+
+    def get(self, key: Tuple) -> Optional[Tuple[str, List[str], int]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        chosen, cands, lencands = entry
+        return chosen, list(cands), lencands
+
+    def put(self, key: Tuple, result: Tuple[str, List[str], int]):
+        if self.max_size <= 0:
+            return
+        chosen, cands, lencands = result
+        self._entries[key] = (chosen, tuple(cands), lencands)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._word_lists.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,221 @@
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+import heapq
+from ..constants import DEFAULT_SOLVER_SETTINGS, DEFAULT_STRATEGY_TOP_K, DEFAULT_FEEDBACK
+from ..feedback import AnswerLanes, Clue, as_clue
+from ..multi import MultiWordle
+from ..util import get_n_from_word_set
+from ..wordle import Wordle
+from .profile import FILTER, NEW_MUSTS, FREQUENCY_TABLES, SCORING, TIE_BREAK
+from .scoring import GuessScorer
+from .session import SolverSession
+from .solver import candidate_frequencies, infer_known_places
+from .strategy import FREQUENCY, partition_cost, partition_sizes
+
+# Solves the boards of a MultiWordle together: a SolverSession (candidate set) per board, and one guess per turn
+# picked for all the boards still being played.
+#
+# The letter frequency scores are linear in the frequency tables, so instead of scoring every guess on each board
+# and adding up, the boards' tables are summed and every guess is scored against the sum in one GuessScorer pass.
+# The partition strategies add up the partition cost of their shortlist over the boards. Solved boards drop out
+# of both, and boards that got the same clues (e.g. every board on the first turn) share their tables.
+class MultiSolver:
+    def __init__(self, boards: int, solver_settings: Dict[str, bool]=DEFAULT_SOLVER_SETTINGS, debug: int=0):
+        if not 'candidate_set' in solver_settings or not len(solver_settings['candidate_set']):
+            raise Exception('candidate_set not specified in config')
+        self.solver_settings = solver_settings
+        self.debug = debug
+        if not 'guess_set' in solver_settings or not len(solver_settings['guess_set']):
+            self.word_set = solver_settings['candidate_set']
+        else:
+            self.word_set = solver_settings['guess_set']
+        self.N = get_n_from_word_set(self.word_set)
+        guess_scorer = solver_settings.get('guess_scorer')
+        self.guess_scorer = guess_scorer if guess_scorer is not None else GuessScorer(self.word_set)
+        self.sessions = [SolverSession(solver_settings=solver_settings, debug=debug) for i in range(boards)]
+        # Boards not solved yet
+        self.active = list(range(boards))
+        self.guesses = []
+
+    # clues has the clue (a Clue, its code or its tiles) guess got on each board, None for the boards that were
+    # already solved
+    def add_clues(self, guess: str, clues: List[Optional[Clue]]):
+        self.guesses.append(guess)
+        for b, clue in enumerate(clues):
+            if clue is None or not b in self.active:
+                continue
+            clue = as_clue(clue, len(guess))
+            self.sessions[b].add_clue(guess, clue)
+            if clue.is_solved():
+                self.active.remove(b)
+
+    # The next guess, and the candidates left on each board still being played
+    def next_guess(self) -> Tuple[str, List[List[str]]]:
+        deadline = self.solver_settings.get('deadline')
+        if deadline is not None:
+            deadline.start()
+        profiler = self.solver_settings.get('profiler')
+        if profiler is None:
+            return self._next_guess()
+        profiler.begin_turn()
+        try:
+            return self._next_guess()
+        finally:
+            profiler.end_turn()
+
+    def _next_guess(self) -> Tuple[str, List[List[str]]]:
+        if not len(self.active):
+            return None, []
+        profiler = self.solver_settings.get('profiler')
+        cands = [self.sessions[b].candidates() for b in self.active]
+        if profiler is not None:
+            profiler.lap(FILTER, sum(len(c) for c in cands))
+        if not all(len(c) for c in cands):
+            raise Exception('No candidates left! Its possible you\'re not using an accurate dictionary!')
+        if not len(self.guesses) and self.solver_settings.get('start_word'):
+            return self.solver_settings['start_word'], cands
+        guess_left = int(self.solver_settings['max_guesses']) - len(self.guesses)
+        smallest = min(cands, key=len)
+        # A board down to one word is solved for one guess. With no more guesses than boards left every guess
+        # has to solve one, so go for the surest, and with enough guesses left to try every candidate just do
+        if len(smallest) == 1 or guess_left <= len(cands) or sum(len(c) for c in cands) <= guess_left:
+            return smallest[0], cands
+        if self.solver_settings['non_strict']:
+            explorable = None
+        else:
+            union = set(c for board in cands for c in board)
+            explorable = [w for w in self.word_set if w in union]
+        chosen = self._choose(cands, explorable)
+        return chosen, cands
+
+    # Summed over the boards: per position and overall frequencies of the candidates' letters at unknown places
+    def _frequencies(self, cands: List[List[str]]) -> Tuple[List[Dict[str, int]], Dict[str, int], int]:
+        profiler = self.solver_settings.get('profiler')
+        tables = {}
+        for b, board_cands in zip(self.active, cands):
+            # Boards that got the same clues have the same candidates and constraints
+            key = tuple((w, int(clue)) for w, clue in self.sessions[b].clues)
+            if key in tables:
+                tables[key][1] += 1
+                continue
+            word_right_place, _, not_in_word = self.sessions[b].constraints()
+            _, unknown_places = infer_known_places(board_cands, word_right_place, self.N)
+            tables[key] = [candidate_frequencies(board_cands, unknown_places, not_in_word, self.N), 1]
+        if profiler is not None:
+            profiler.lap(NEW_MUSTS, sum(len(c) for c in cands))
+        pos_freq = [defaultdict(int) for i in range(self.N)]
+        unknown_freq = defaultdict(int)
+        total = 0
+        for (board_pos_freq, board_unknown_freq, board_total), count in tables.values():
+            for i, freqs in enumerate(board_pos_freq):
+                for c, f in freqs.items():
+                    pos_freq[i][c] += count * f
+            for c, f in board_unknown_freq.items():
+                unknown_freq[c] += count * f
+            total += count * board_total
+        if profiler is not None:
+            profiler.lap(FREQUENCY_TABLES, len(tables))
+        return pos_freq, unknown_freq, total
+
+    # explorable is None to explore the whole guess set
+    def _choose(self, cands: List[List[str]], explorable: Optional[List[str]]) -> str:
+        settings = self.solver_settings
+        profiler = settings.get('profiler')
+        non_pos_weight = float(settings['non_pos_weight'])
+        use_pos = settings['use_pos']
+        strategy = settings.get('strategy', FREQUENCY)
+        prev_guesses = set(self.guesses)
+        pos_freq, unknown_freq, total = self._frequencies(cands)
+        if total == 0:
+            # Every board is down to words with the same letters at the unknown places, so any candidate is as good
+            return min(min(board) for board in cands)
+        if strategy == FREQUENCY and explorable is None and self.guess_scorer.source is self.word_set:
+            best, scored = self.guess_scorer.best_words(pos_freq, unknown_freq, non_pos_weight, use_pos=use_pos, exclude=prev_guesses)
+            keys = None
+        else:
+            if explorable is None:
+                explorable = self.word_set
+            best = [w for w in explorable if not w in prev_guesses]
+            keys = self.guess_scorer.sort_keys(best, pos_freq, unknown_freq, non_pos_weight, use_pos=use_pos)
+            scored = len(keys)
+        if profiler is not None:
+            profiler.lap(SCORING, scored)
+        if not len(best):
+            raise Exception(f'No more explorable candidates. This should never happen.')
+        cand_sets = [set(board) for board in cands]
+        # Words that can be the answer on more boards can also solve more of them
+        boards_of = lambda word: sum(1 for board in cand_sets if word in board)
+        if strategy == FREQUENCY:
+            if keys is not None:
+                best_key = min(keys)
+                best = [w for w, key in zip(best, keys) if key == best_key]
+            chosen = min(best, key=lambda word: (-boards_of(word), word))
+        elif settings.get('deadline') is not None and settings['deadline'].expired():
+            # Out of time before scoring any partition: go with the letter frequency ordering
+            settings['deadline'].cut()
+            best_key = min(keys)
+            chosen = min([w for w, key in zip(best, keys) if key == best_key], key=lambda word: (-boards_of(word), word))
+        else:
+            chosen = self._best_by_partition(best, keys, cands, cand_sets, strategy)
+        if profiler is not None:
+            profiler.lap(TIE_BREAK, len(best))
+        return chosen
+
+    # Like best_by_partition (see strategy.py), with the cost of a guess summed over the boards
+    def _best_by_partition(self, explorable: List[str], keys: List[float], cands: List[List[str]], cand_sets, strategy: str) -> str:
+        settings = self.solver_settings
+        top_k = int(settings.get('strategy_top_k', DEFAULT_STRATEGY_TOP_K))
+        mode = settings.get('feedback', DEFAULT_FEEDBACK)
+        feedback_matrix = settings.get('feedback_matrix')
+        if feedback_matrix is not None and feedback_matrix.mode != mode:
+            feedback_matrix = None
+        shortlist = [explorable[ix] for ix in heapq.nsmallest(top_k, range(len(explorable)), key=lambda ix: (keys[ix], explorable[ix]))]
+        if sum(len(board) for board in cands) <= top_k:
+            explorable_set = set(explorable)
+            shortlisted = set(shortlist)
+            shortlist += sorted(set(c for board in cands for c in board if c in explorable_set and not c in shortlisted))
+        lanes = [None if feedback_matrix is not None else AnswerLanes(board, mode=mode) for board in cands]
+        deadline = settings.get('deadline')
+        costs = {}
+        for guess in shortlist:
+            if deadline is not None and len(costs) and deadline.expired():
+                deadline.cut()
+                shortlist = [guess for guess in shortlist if guess in costs]
+                break
+            cost = sum(partition_cost(partition_sizes(guess, board, feedback_matrix=feedback_matrix, lanes=board_lanes, mode=mode), strategy)
+                       for board, board_lanes in zip(cands, lanes))
+            costs[guess] = (cost, -sum(1 for board in cand_sets if guess in board), guess)
+        return min(shortlist, key=lambda guess: costs[guess])
+
+# Returns whether every board was solved, in how many guesses (-1 if not), and the candidates left on the boards
+# still being played before the last guess.
+def solve_multi(
+    game: MultiWordle,
+    solver_settings: Dict[str, bool]=DEFAULT_SOLVER_SETTINGS,
+    debug: int=1
+) -> Tuple[bool, int, List[List[str]]]:
+    profiler = solver_settings.get('profiler')
+    if profiler is not None:
+        profiler.begin_game()
+        try:
+            return _solve_multi(game, MultiSolver(len(game.boards), solver_settings=solver_settings, debug=debug), debug=debug)
+        finally:
+            profiler.end_game()
+    return _solve_multi(game, MultiSolver(len(game.boards), solver_settings=solver_settings, debug=debug), debug=debug)
+
+def _solve_multi(game: MultiWordle, solver: MultiSolver, debug: int=1) -> Tuple[bool, int, List[List[str]]]:
+    MAX_GUESSES = int(solver.solver_settings['max_guesses'])
+    for i in range(MAX_GUESSES):
+        chosen, cands = solver.next_guess()
+        if debug >= 1:
+            print(f'Choosing [{chosen}]. Candidates left on {len(cands)} boards: {[len(c) for c in cands]}')
+        clues, state = game.guess(chosen)
+        solver.add_clues(chosen, clues)
+        if state == Wordle.SOLVED:
+            if debug >= 1:
+                print(f'Woohoo! Solver solved all {len(game.boards)} boards in {i+1} guesses!')
+            return True, i+1, cands
+        elif state == Wordle.UNSOLVED:
+            if debug >= 1:
+                print('Oh no, it beat the solver :(')
+            return False, -1, cands
@@ -0,0 +1,446 @@
+from array import array
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from collections import defaultdict
+from operator import itemgetter
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+from ..constants import CACHE_DIR, DEFAULT_FEEDBACK
+from ..feedback import LANE_TYPECODES, FeedbackMatrix, solved_code
+from ..util import get_n_from_word_set
+
+# Exact optimal strategies (python main.py -m optimal): the decision tree that solves every candidate in the fewest
+# guesses in total (so the best average attempts) within max_guesses, or in the fewest guesses in the worst case
+# and then the fewest in total, for a guess set and candidate set. It is written in the solution tree format that
+# --tree_file reads, so it can be eval'd like any other tree.
+#
+# The search is a depth first branch and bound over (candidate subset, guesses left). The cost of a subset of n
+# candidates is n (everyone sees the next guess) plus the cost of every feedback class but the 🟩🟩🟩🟩🟩 one, and
+# is at least 2n - 1 (one candidate can be guessed right away, every other needs at least one more guess). Every
+# guess is ranked by that bound over the classes it makes (which is 3n - classes - 1 if it can be the answer, 3n -
+# classes otherwise), and the guesses are tried best bound first. Trying a guess first tightens the bound of each
+# of its classes by looking one guess further (the best ranked guess on the class), which on its own rules out
+# most guesses, first guesses included. Then the classes are searched biggest first, each under what is left of
+# the best cost found so far after the others' bounds, and the guess is dropped as soon as their costs reach it.
+# Guesses that make the exact same feedback on a subset are only tried once, and a subset that one of its own
+# candidates splits into single candidates (2n - 1) or all but one pair (2n, the least anything else can do) is
+# solved without ranking any guesses. With two guesses left a subset needs a guess that splits it into single
+# candidates, which is looked for a pair of candidates at a time over all guesses at once (see perfect_split).
+#
+# Exact costs (and the lower bounds proven by searches that were cut off) are kept in a transposition table keyed
+# by the subset, as the sorted tuple of candidate ids, and the guesses left, so the many ways of reaching the same
+# subset are only searched once. Subsets of up to two candidates never get there: one costs 1 and two cost 3.
+#
+# The first guesses are split across a process pool. The best total found so far is shared between the workers,
+# so every worker prunes against it, and each first guess's result is appended to a checkpoint file in CACHE_DIR
+# as it finishes. A search that is interrupted and run again with the same word lists and feedback mode picks up
+# where it left off.
+
+# Objectives, picked with --objective
+# Fewest guesses in total, i.e. the best average attempts, without going over max_guesses
+AVERAGE = 'average'
+# Fewest guesses in the worst case, then the fewest in total
+WORST_CASE = 'worst_case'
+OBJECTIVES = [AVERAGE, WORST_CASE]
+
+OPTIMAL_VERSION = 1
+# Cost of a subset that can't be solved in the guesses left
+INFEASIBLE = 1 << 40
+
+class OptimalSearch:
+    def __init__(self, guess_set: Sequence[str], candidate_set: Sequence[str], feedback_matrix: Optional[FeedbackMatrix]=None, mode: str=DEFAULT_FEEDBACK):
+        # Guesses and candidates are numbered in sorted order, like the matrix, which also decides ties
+        self.guesses = sorted(set(guess_set))
+        self.candidates = sorted(set(candidate_set))
+        if feedback_matrix is None or feedback_matrix.mode != mode or feedback_matrix.candidate_set != self.candidates \
+                or any(not feedback_matrix.covers(g) for g in self.guesses):
+            feedback_matrix = FeedbackMatrix.build(self.guesses, self.candidates, mode=mode)
+        guess_ids = {g: i for i, g in enumerate(self.guesses)}
+        for c in self.candidates:
+            if not c in guess_ids:
+                raise Exception(f'Candidate [{c}] is not a valid guess. Every candidate must be in the guess set')
+        # The feedback of every guess against every candidate, as bytes (or an array for longer words)
+        if feedback_matrix.width == 1:
+            self.rows = [feedback_matrix.row(g).tobytes() for g in self.guesses]
+        else:
+            self.rows = [array(LANE_TYPECODES[feedback_matrix.width], feedback_matrix.row(g)) for g in self.guesses]
+        self.candidate_guess = [guess_ids[c] for c in self.candidates]
+        # The feedback of every guess against each candidate, as one big integer with a lane per guess, so whether
+        # two candidates get different feedback is a handful of big integer ops for all guesses at once (see
+        # perfect_split). low has every bit but the top one of each lane set, high just the top one.
+        width = feedback_matrix.width
+        if width == 1:
+            flat = b''.join(self.rows)
+        else:
+            flat = array(LANE_TYPECODES[width])
+            for row in self.rows:
+                flat += row
+            if sys.byteorder != 'little':
+                flat.byteswap()
+        num_candidates = len(self.candidates)
+        self.columns = [int.from_bytes(bytes(flat[i::num_candidates]), 'little') for i in range(num_candidates)]
+        self.width = width
+        self.low = int.from_bytes((b'\xff' * (width - 1) + b'\x7f') * len(self.guesses), 'little')
+        self.high = int.from_bytes((b'\x00' * (width - 1) + b'\x80') * len(self.guesses), 'little')
+        self.N = get_n_from_word_set(self.candidates)
+        self.solved = solved_code(self.N)
+        # (candidate ids, guesses left) -> (cost, guess id) if the cost is exact, (lower bound, None) if not
+        self.table = {}
+        # Guesses ranked for a bound, until the subset is searched
+        self.ranked = {}
+        self.nodes = 0
+
+    def root(self) -> Tuple[int, ...]:
+        return tuple(range(len(self.candidates)))
+
+    def feedback(self, guess: int, ids: Tuple[int, ...]) -> Tuple[int, ...]:
+        if len(ids) == 1:
+            return (self.rows[guess][ids[0]],)
+        return itemgetter(*ids)(self.rows[guess])
+
+    # Every guess that splits ids, as (lower bound on its cost, guess id, feedback on ids), best bound first. The
+    # first guess to make a given feedback stands for all the ones that make the same.
+    def rank(self, ids: Tuple[int, ...]) -> List[Tuple[int, int, Tuple[int, ...]]]:
+        n = len(ids)
+        feedback = list(map(itemgetter(*ids), self.rows))
+        # Later guesses are overwritten by earlier ones that make the same feedback
+        first = dict(zip(reversed(feedback), range(len(feedback) - 1, -1, -1)))
+        members = set(self.candidate_guess[i] for i in ids)
+        ranked = [(3 * n - k - (g in members), g, codes) for k, g, codes in zip(map(len, map(set, first)), first.values(), first)
+                  if k > 1 or g in members]
+        ranked.sort()
+        return ranked
+
+    # The exact cost of ids when a candidate splits them into single candidates (2n - 1) or all but one pair (2n,
+    # the least anything else can do), with the candidate, or None. Only the n candidates are tried, so this is
+    # much cheaper than ranking every guess.
+    def split_by_candidate(self, ids: Tuple[int, ...], depth: int) -> Optional[Tuple[int, int]]:
+        n = len(ids)
+        getter = itemgetter(*ids)
+        pair = None
+        for i in ids:
+            g = self.candidate_guess[i]
+            k = len(set(getter(self.rows[g])))
+            if k == n:
+                return 2 * n - 1, g
+            if k == n - 1 and pair is None and depth > 2:
+                pair = (2 * n, g)
+        return pair
+
+    # The first guess that splits ids into single candidates, or None. A guess has to tell every pair of them apart,
+    # so the guesses that tell neighbouring pairs (which tend to be the most alike) apart are narrowed down with the
+    # columns first, which usually leaves none at all, and only the ones left are checked on every candidate.
+    def perfect_split(self, ids: Tuple[int, ...]) -> Optional[int]:
+        low, high = self.low, self.high
+        mask = high
+        for a, b in zip(ids, ids[1:]):
+            x = self.columns[a] ^ self.columns[b]
+            # The top bit of a lane ends up set if and only if the lane is not zero
+            mask &= ((x & low) + low) | x
+            if not mask:
+                return None
+        n = len(ids)
+        getter = itemgetter(*ids)
+        lanes = mask.to_bytes(len(self.guesses) * self.width, 'little')
+        i = lanes.find(b'\x80')
+        while i >= 0:
+            g = i // self.width
+            if len(set(getter(self.rows[g]))) == n:
+                return g
+            i = lanes.find(b'\x80', i + 1)
+        return None
+
+    # A lower bound on the cost of ids with depth guesses left, one guess deep: the best bound of any guess (see
+    # rank). Exact when a candidate splits them well enough (see split_by_candidate) or with two guesses left, when
+    # every class has to be a single candidate. Either way it goes in the table, and the guesses ranked on the way
+    # are kept for the search of ids that usually follows.
+    def bound(self, ids: Tuple[int, ...], depth: int) -> int:
+        n = len(ids)
+        if depth < 1 or n > 1 and depth < 2:
+            return INFEASIBLE
+        if n <= 2:
+            return 2 * n - 1
+        key = (ids, depth)
+        entry = self.table.get(key)
+        if entry is not None:
+            return entry[0]
+        entry = self.split_by_candidate(ids, depth)
+        if entry is None and depth == 2:
+            # Every class has to be a single candidate, and none of the candidates makes them (see
+            # split_by_candidate), so it takes any other guess that does: 2n
+            guess = self.perfect_split(ids)
+            entry = (2 * n, guess) if guess is not None else (INFEASIBLE, None)
+        elif entry is None:
+            ranked = self.rank(ids)
+            entry = (ranked[0][0] if len(ranked) else INFEASIBLE, None)
+            self.ranked[key] = ranked
+        self.table[key] = entry
+        return entry[0]
+
+    # The cost of guess (with feedback codes on ids) and then playing each class optimally with depth - 1 guesses
+    # left. If it is beta or more, the search stops as soon as that is proven and returns a lower bound instead,
+    # which is at least beta. bound, if given, is checked for a lower beta between classes.
+    def evaluate(self, ids: Tuple[int, ...], depth: int, codes: Tuple[int, ...], beta: int, bound: Optional[Callable[[], int]]=None) -> int:
+        classes = defaultdict(list)
+        for i, code in zip(ids, codes):
+            classes[code].append(i)
+        classes.pop(self.solved, None)
+        total = len(ids) + sum(2 * len(c) - 1 for c in classes.values())
+        # First tighten the bounds of the classes, biggest first, then search them, each time with what is left of
+        # beta after the others' bounds
+        searched = []
+        try:
+            for c in sorted(classes.values(), key=len, reverse=True):
+                m = len(c)
+                # One candidate costs 1 and two cost 3 with enough guesses left, which is their bound
+                if m == 1 and depth > 1 or m == 2 and depth > 2:
+                    break
+                if bound is not None:
+                    beta = min(beta, bound())
+                if total >= beta:
+                    return total
+                c = tuple(c)
+                lower = self.bound(c, depth - 1)
+                total += lower - (2 * m - 1)
+                searched.append((c, lower))
+            for c, lower in searched:
+                if bound is not None:
+                    beta = min(beta, bound())
+                if total >= beta:
+                    return total
+                total += self.search(c, depth - 1, beta - total + lower) - lower
+            return total
+        finally:
+            for c, lower in searched:
+                self.ranked.pop((c, depth - 1), None)
+
+    # The least cost of solving the candidates ids with depth guesses left, if it is less than beta. Otherwise a
+    # lower bound that is at least beta.
+    def search(self, ids: Tuple[int, ...], depth: int, beta: int=INFEASIBLE) -> int:
+        lower = self.bound(ids, depth)
+        if len(ids) <= 2 or lower >= beta:
+            return lower
+        key = (ids, depth)
+        lower, guess = self.table[key]
+        if guess is not None:
+            return lower
+        self.nodes += 1
+        ranked = self.ranked.pop(key, None)
+        if ranked is None:
+            ranked = self.rank(ids)
+        best, best_guess = beta, None
+        floor = INFEASIBLE
+        for bound, g, codes in ranked:
+            if bound >= best or best <= lower:
+                floor = min(floor, bound)
+                break
+            cost = self.evaluate(ids, depth, codes, best)
+            if cost < best:
+                best, best_guess = cost, g
+            else:
+                floor = min(floor, cost)
+        if best_guess is not None:
+            self.table[key] = (best, best_guess)
+            return best
+        self.table[key] = (floor, None)
+        return floor
+
+    # The guess the search settled on for ids with depth guesses left, which it must have solved exactly
+    def best_guess(self, ids: Tuple[int, ...], depth: int) -> int:
+        if len(ids) <= 2:
+            return self.candidate_guess[ids[0]]
+        value, guess = self.table[(ids, depth)]
+        if guess is None:
+            raise Exception(f'{len(ids)} candidates with {depth} guesses left were not solved exactly')
+        return guess
+
+    # The solution tree ({guess: {feedback code: {next guess: {...}}}}) playing guess at ids and then every class
+    # the way the search solved it
+    def tree(self, ids: Tuple[int, ...], depth: int, guess: Optional[int]=None) -> Dict:
+        if guess is None:
+            guess = self.best_guess(ids, depth)
+        classes = defaultdict(list)
+        for i, code in zip(ids, self.feedback(guess, ids)):
+            classes[code].append(i)
+        classes.pop(self.solved, None)
+        return {self.guesses[guess]: {code: self.tree(tuple(c), depth - 1) for code, c in sorted(classes.items())}}
+
+    # The number of guesses solution_tree takes to solve each candidate, in candidate order
+    def attempts(self, solution_tree: Dict) -> List[int]:
+        guess_ids = {g: i for i, g in enumerate(self.guesses)}
+        attempts = []
+        for c in range(len(self.candidates)):
+            node = solution_tree
+            for depth in range(1, len(self.candidates) + 1):
+                (word, children), = node.items()
+                code = self.rows[guess_ids[word]][c]
+                if code == self.solved:
+                    break
+                if not code in children:
+                    raise Exception(f'The tree doesn\'t solve [{self.candidates[c]}]')
+                node = children[code]
+            attempts.append(depth)
+        return attempts
+
+# Checkpoints: one JSON line per first guess searched, with the guesses left it was searched with, its cost (exact,
+# or the lower bound it was pruned at) and the tree when it was the best so far. The results only depend on the word
+# lists and feedback mode (first guesses are always ranked the same way), so any search over the same ones, with
+# any max_guesses, objective, start word or number of workers, can pick them up. A later line for the same depth
+# and guess replaces an earlier one.
+
+def checkpoint_key(guesses: Sequence[str], candidates: Sequence[str], mode: str=DEFAULT_FEEDBACK) -> str:
+    h = hashlib.sha1()
+    h.update(f'v{OPTIMAL_VERSION}\n{mode}\n'.encode())
+    h.update('\n'.join(sorted(set(guesses))).encode())
+    h.update(b'\0')
+    h.update('\n'.join(sorted(set(candidates))).encode())
+    return h.hexdigest()
+
+def checkpoint_path(guesses: Sequence[str], candidates: Sequence[str], mode: str=DEFAULT_FEEDBACK, cache_dir: str=CACHE_DIR) -> str:
+    return os.path.join(cache_dir, f'optimal_{checkpoint_key(guesses, candidates, mode=mode)}.jsonl')
+
+def _tree_from_json(solution_tree: Dict) -> Dict:
+    return {word: {int(code): _tree_from_json(child) for code, child in children.items()} for word, children in solution_tree.items()}
+
+# Results by depth, then first guess: (cost, exact, tree or None). A line cut short by an interrupted write is ignored.
+def read_checkpoint(path: str) -> Dict[int, Dict[str, Tuple[int, bool, Optional[Dict]]]]:
+    results = defaultdict(dict)
+    if not os.path.exists(path):
+        return results
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            tree = _tree_from_json(row['tree']) if row.get('tree') else None
+            results[row['depth']][row['guess']] = (row['cost'], row['exact'], tree)
+    return results
+
+# Per-process state for optimal search workers, set up once by _init_optimal_worker
+_optimal_worker_state = {}
+
+def _init_optimal_worker(search: OptimalSearch, best, num_guesses: int):
+    _optimal_worker_state['search'] = search
+    _optimal_worker_state['best'] = best
+    _optimal_worker_state['num_guesses'] = num_guesses
+
+# The shared best is cost * number of first guesses + the rank of its first guess, so ties go to the first guess
+# ranked first however the work is split up: a guess ranked before the best only needs to match its cost.
+def _beta(best: int, rank: int, num_guesses: int) -> int:
+    cost, best_rank = divmod(best, num_guesses)
+    return cost + 1 if rank < best_rank else cost
+
+def _search_first_guess(task: Tuple[int, int, int, Tuple[int, ...]]) -> Tuple[int, int, bool, Optional[Dict]]:
+    rank, depth, guess, codes = task
+    search = _optimal_worker_state['search']
+    best = _optimal_worker_state['best']
+    num_guesses = _optimal_worker_state['num_guesses']
+    bound = lambda: _beta(best.value, rank, num_guesses)
+    ids = search.root()
+    cost = search.evaluate(ids, depth, codes, bound(), bound=bound)
+    with best.get_lock():
+        if cost >= _beta(best.value, rank, num_guesses):
+            return rank, cost, False, None
+        best.value = cost * num_guesses + rank
+    return rank, cost, True, search.tree(ids, depth, guess=guess)
+
+# Searches every first guess (or just start_word) with depth guesses left. Yields (rank, first guess, cost, exact,
+# tree) for each as it finishes, including the ones already in done (the checkpointed results for this depth).
+# exact is whether the cost beat every first guess before it, in which case it comes with its tree, rather than a
+# lower bound it was pruned at. The best is the exact one with the least (cost, rank).
+def search_first_guesses(
+    search: OptimalSearch,
+    depth: int,
+    done: Dict[str, Tuple[int, bool, Optional[Dict]]],
+    start_word: Optional[str]=None,
+    workers: int=1
+) -> Iterator[Tuple[int, str, int, bool, Optional[Dict]]]:
+    ids = search.root()
+    if start_word:
+        g = search.guesses.index(start_word)
+        ranked = [(None, g, search.feedback(g, ids))]
+    else:
+        ranked = search.rank(ids)
+    num_guesses = len(ranked) + 1
+    best = multiprocessing.Value('q', INFEASIBLE * num_guesses)
+    for rank, (bound, g, codes) in enumerate(ranked):
+        cost, exact, tree = done.get(search.guesses[g], (None, False, None))
+        if exact and cost * num_guesses + rank < best.value:
+            best.value = cost * num_guesses + rank
+    tasks = []
+    for rank, (bound, g, codes) in enumerate(ranked):
+        word = search.guesses[g]
+        # An exact cost holds in any search, but a pruned one is only a lower bound that ruled the guess out against
+        # the best of the search that wrote it, so it is searched again unless the best here rules it out too
+        if word in done and (done[word][1] or done[word][0] >= _beta(best.value, rank, num_guesses)):
+            cost, exact, tree = done[word]
+            yield rank, word, cost, exact, tree
+        else:
+            tasks.append((rank, depth, g, codes))
+    if workers <= 1:
+        _init_optimal_worker(search, best, num_guesses)
+        for rank, cost, exact, tree in map(_search_first_guess, tasks):
+            yield rank, search.guesses[ranked[rank][1]], cost, exact, tree
+        return
+    # Forked workers share the search's rows (and what is in its table so far) instead of building their own
+    with multiprocessing.Pool(workers, initializer=_init_optimal_worker, initargs=(search, best, num_guesses)) as pool:
+        for rank, cost, exact, tree in pool.imap_unordered(_search_first_guess, tasks, chunksize=1):
+            yield rank, search.guesses[ranked[rank][1]], cost, exact, tree
+
+# The optimal solution tree for objective, with its total and worst case guesses over every candidate. Every first
+# guess searched is checkpointed to checkpoint (a JSON lines file, see checkpoint_path), and the ones already in it
+# are not searched again.
+def optimal_tree(
+    search: OptimalSearch,
+    max_guesses: int,
+    objective: str=AVERAGE,
+    start_word: Optional[str]=None,
+    workers: int=1,
+    checkpoint: Optional[str]=None,
+    debug: int=0
+) -> Tuple[Dict, int, int]:
+    if not objective in OBJECTIVES:
+        raise Exception(f'Unknown objective [{objective}]. Pick from {OBJECTIVES}')
+    if start_word and not start_word in search.guesses:
+        raise Exception(f'Start word [{start_word}] is not a valid guess')
+    done = read_checkpoint(checkpoint) if checkpoint else defaultdict(dict)
+    if checkpoint:
+        os.makedirs(os.path.dirname(checkpoint) or '.', exist_ok=True)
+        # Start on a new line after a line an interrupted search left half written
+        with open(checkpoint, 'ab+') as f:
+            size = f.tell()
+            f.seek(max(size - 1, 0))
+            if size and f.read(1) != b'\n':
+                f.write(b'\n')
+    result = None
+    depth = max_guesses
+    # For the worst case, search again with one guess less than the best tree so far needs, until that's impossible
+    while depth >= 1:
+        best = None
+        searched = 0
+        for rank, word, cost, exact, tree in search_first_guesses(search, depth, done[depth], start_word=start_word, workers=workers):
+            searched += 1
+            if checkpoint and done[depth].get(word) != (cost, exact, tree):
+                with open(checkpoint, 'a') as f:
+                    f.write(json.dumps({'depth': depth, 'guess': word, 'cost': cost, 'exact': exact, 'tree': tree}) + '\n')
+            if exact and cost < INFEASIBLE and (best is None or (cost, rank) < best[:2]):
+                best = (cost, rank, tree)
+                if debug:
+                    print(f'[{word}] solves every candidate in {cost} guesses ({cost / len(search.candidates):.4f} on average) within {depth}')
+            elif debug >= 2:
+                print(f'[{word}] needs at least {cost} guesses' if cost < INFEASIBLE else f'[{word}] can\'t solve every candidate within {depth}')
+            if debug and searched % 100 == 0:
+                print(f'Searched {searched} first guesses within {depth} guesses')
+        if best is None:
+            break
+        worst = max(search.attempts(best[2]))
+        result = (best[2], best[0], worst)
+        if objective == AVERAGE:
+            break
+        depth = worst - 1
+    if result is None:
+        raise Exception(f'No strategy solves every candidate within {max_guesses} guesses')
+    return result
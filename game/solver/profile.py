@@ -0,0 +1,114 @@
+from typing import Dict, List
+from time import perf_counter
+
+# Phases of picking a guess, in the order the solver runs them
+# Opening book and guess cache lookups
+LOOKUP = 'lookup'
+PARSE_CLUES = 'parse_clues'
+FILTER = 'filter'
+NEW_MUSTS = 'new_musts'
+FREQUENCY_TABLES = 'frequency'
+SCORING = 'scoring'
+TIE_BREAK = 'tie_break'
+PHASES = [LOOKUP, PARSE_CLUES, FILTER, NEW_MUSTS, FREQUENCY_TABLES, SCORING, TIE_BREAK]
+
+PERCENTILES = [50, 90, 99]
+
+# Records wall time, calls and words handled per phase of the solver, for every turn (one guess_next_word or
+# SolverSession.next_guess) and every game (one solve_wordle). Put one in solver_settings['profiler'] to turn
+# it on; the solver only checks for it, so leaving it out costs nothing.
+#
+# Phases are timed as laps: lap(phase) charges the time since the previous lap (or mark()) to phase. Laps
+# outside a turn, e.g. from SolverSession.add_clue between guesses, are charged to the next turn.
+class Profiler:
+    def __init__(self):
+        # Each turn and game is {phase: [seconds, calls, words]}
+        self.turns = []
+        self.games = []
+        self._turn = None
+        self._pending = {}
+        self._game_start = None
+        self._last = perf_counter()
+
+    def mark(self):
+        self._last = perf_counter()
+
+    def lap(self, phase: str, words: int=0):
+        now = perf_counter()
+        stats = (self._turn if self._turn is not None else self._pending).setdefault(phase, [0.0, 0, 0])
+        stats[0] += now - self._last
+        stats[1] += 1
+        stats[2] += words
+        self._last = now
+
+    def begin_turn(self):
+        self._turn = self._pending
+        self._pending = {}
+        self.mark()
+
+    def end_turn(self):
+        if self._turn is not None:
+            self.turns.append(self._turn)
+        self._turn = None
+
+    def begin_game(self):
+        self._game_start = len(self.turns)
+
+    def end_game(self):
+        if self._game_start is None:
+            return
+        # The game's last clue was added after its last turn
+        if len(self._pending) and len(self.turns) > self._game_start:
+            self.turns[-1] = merge_phases([self.turns[-1], self._pending])
+            self._pending = {}
+        self.games.append(merge_phases(self.turns[self._game_start:]))
+        self._game_start = None
+
+    # Adds the turns and games another profiler recorded, e.g. in an eval worker process
+    def extend(self, turns: List[Dict[str, List[float]]], games: List[Dict[str, List[float]]]):
+        self.turns += turns
+        self.games += games
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return {'turn': summarize(self.turns), 'game': summarize(self.games)}
+
+def merge_phases(records: List[Dict[str, List[float]]]) -> Dict[str, List[float]]:
+    merged = {}
+    for record in records:
+        for phase, (seconds, calls, words) in record.items():
+            stats = merged.setdefault(phase, [0.0, 0, 0])
+            stats[0] += seconds
+            stats[1] += calls
+            stats[2] += words
+    return merged
+
+def percentile(values: List[float], pct: float) -> float:
+    if not len(values):
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))]
+
+# Per phase totals and percentiles of the seconds spent in it, over records (turns or games) that ran the phase.
+def summarize(records: List[Dict[str, List[float]]]) -> Dict[str, Dict[str, float]]:
+    phases = [p for p in PHASES if any(p in r for r in records)] + sorted(set(p for r in records for p in r) - set(PHASES))
+    summary = {}
+    for phase in phases:
+        seconds = [r[phase][0] for r in records if phase in r]
+        stats = {
+            'count': len(seconds),
+            'total': sum(seconds),
+            'mean': sum(seconds) / len(seconds),
+            'calls': sum(r[phase][1] for r in records if phase in r),
+            'words': sum(r[phase][2] for r in records if phase in r),
+        }
+        for pct in PERCENTILES:
+            stats[f'p{pct}'] = percentile(seconds, pct)
+        summary[phase] = stats
+    return summary
+
+def print_summary(profiler: Profiler):
+    for level, summary in profiler.summary().items():
+        print(f'Per {level} ({len(profiler.turns) if level == "turn" else len(profiler.games)}):')
+        for phase, stats in summary.items():
+            pcts = '\t'.join(f'p{pct}: {stats[f"p{pct}"] * 1000:.03f}ms' for pct in PERCENTILES)
+            print(f'  {phase:<12}\t{pcts}\tTotal: {stats["total"]:.03f}s\tCalls: {stats["calls"]}\tWords: {stats["words"]}')
@@ -0,0 +1,207 @@
+from array import array
+from typing import Collection, Dict, Iterable, List, Sequence, Tuple
+import sys
+from ..feedback import LANE_TYPECODES
+
+# Scores every word of a guess set against the remaining candidates' letter frequencies at once.
+#
+# Each word (really each class of words scored alike, see below) owns a fixed-width lane of a big integer, and for
+# every (position, letter) we keep a mask with 1 in the lanes of words whose first occurrence of that letter is at
+# that position (the one-hot word x position x letter matrix), plus a letter presence mask per letter. Multiplying
+# each mask by its frequency and summing computes the positional and letter scores for every word in one pass of
+# big integer arithmetic; the lanes are wide enough that nothing carries between words.
+class GuessScorer:
+    def __init__(self, words: Sequence[str]):
+        # The list it was built from, so the solver can tell when it is scoring exactly this guess set
+        self.source = words
+        self.words = list(words)
+        self.ids = {w: i for i, w in enumerate(self.words)}
+        self.N = len(self.words[0]) if len(self.words) else 0
+        # (position, letter) of the first occurrence of each distinct letter, per word
+        self.first_places = []
+        for w in self.words:
+            seen = set()
+            places = []
+            for i, c in enumerate(w):
+                if c in seen:
+                    continue
+                seen.add(c)
+                places.append((i, c))
+            self.first_places.append(places)
+        # Scores only depend on a word's letters (its signature, e.g. tesla, steal and teals are all aelst) and,
+        # for the positional score, on where each letter first occurs. Words are grouped into these equivalence
+        # classes and every class is scored once, in one lane, then expanded back to its words.
+        self.letter_classes, self.letter_class = self._group(''.join(sorted(c for _, c in places)) for places in self.first_places)
+        self.place_classes, self.place_class = self._group(tuple(places) for places in self.first_places)
+        # The letter class of each place class
+        self.place_letter_class = [self.letter_class[members[0]] for members in self.place_classes]
+        self._masks = {}
+
+    # Word ids grouped by key, in order of first appearance, and the group of each word
+    @staticmethod
+    def _group(keys: Iterable) -> Tuple[List[List[int]], List[int]]:
+        groups = {}
+        classes = []
+        class_of = []
+        for j, key in enumerate(keys):
+            if not key in groups:
+                groups[key] = len(classes)
+                classes.append([])
+            classes[groups[key]].append(j)
+            class_of.append(groups[key])
+        return classes, class_of
+
+    # Builds the masks ahead of time for every lane width scoring frequencies that add up to at most max_total
+    # needs (e.g. the number of candidates times N), so no turn pays for them
+    def prepare(self, max_total: int):
+        for width in LANE_TYPECODES:
+            self._lane_masks(width)
+            if max_total < 256 ** width:
+                break
+
+    # Masks with a lane per place class for the first occurrences, and a lane per letter class for the letters
+    def _lane_masks(self, width: int):
+        if not width in self._masks:
+            first_at = [{} for i in range(self.N)]
+            size = len(self.place_classes) * width
+            for k, members in enumerate(self.place_classes):
+                offset = k * width
+                for i, c in self.first_places[members[0]]:
+                    if not c in first_at[i]:
+                        first_at[i][c] = bytearray(size)
+                    first_at[i][c][offset] = 1
+            contains = {}
+            size = len(self.letter_classes) * width
+            for k, members in enumerate(self.letter_classes):
+                offset = k * width
+                for _, c in self.first_places[members[0]]:
+                    if not c in contains:
+                        contains[c] = bytearray(size)
+                    contains[c][offset] = 1
+            self._masks[width] = (
+                [{c: int.from_bytes(m, 'little') for c, m in pos.items()} for pos in first_at],
+                {c: int.from_bytes(m, 'little') for c, m in contains.items()},
+            )
+        return self._masks[width]
+
+    def _unpack(self, lanes: int, width: int, count: int) -> List[int]:
+        values = array(LANE_TYPECODES[width], lanes.to_bytes(count * width, 'little'))
+        if sys.byteorder != 'little' and width > 1:
+            values.byteswap()
+        return values.tolist()
+
+    # Per place class sums of pos_freq over its first letter occurrences, and per letter class sums of unknown_freq
+    # over its distinct letters.
+    def class_scores(
+        self,
+        pos_freq: List[Dict[str, int]],
+        unknown_freq: Dict[str, int],
+        use_pos: bool=True
+    ) -> Tuple[List[int], List[int]]:
+        total = sum(unknown_freq.values())
+        width = next(w for w in LANE_TYPECODES if total < 256 ** w)
+        first_at, contains = self._lane_masks(width)
+        pos_scores = None
+        if use_pos:
+            pos_lanes = 0
+            for i, freqs in enumerate(pos_freq):
+                masks = first_at[i]
+                for c, f in freqs.items():
+                    if f and c in masks:
+                        pos_lanes += f * masks[c]
+            pos_scores = self._unpack(pos_lanes, width, len(self.place_classes))
+        letter_lanes = 0
+        for c, f in unknown_freq.items():
+            if f and c in contains:
+                letter_lanes += f * contains[c]
+        return pos_scores, self._unpack(letter_lanes, width, len(self.letter_classes))
+
+    # Per word sums of pos_freq over its first letter occurrences, and of unknown_freq over its distinct letters.
+    def position_and_letter_scores(
+        self,
+        pos_freq: List[Dict[str, int]],
+        unknown_freq: Dict[str, int],
+        use_pos: bool=True
+    ) -> Tuple[List[int], List[int]]:
+        pos_scores, letter_scores = self.class_scores(pos_freq, unknown_freq, use_pos=use_pos)
+        letter_scores = [letter_scores[k] for k in self.letter_class]
+        pos_scores = [pos_scores[k] for k in self.place_class] if use_pos else [0] * len(self.words)
+        return pos_scores, letter_scores
+
+    def position_and_letter_score(
+        self,
+        word: str,
+        pos_freq: List[Dict[str, int]],
+        unknown_freq: Dict[str, int],
+        use_pos: bool=True
+    ) -> Tuple[int, int]:
+        if word in self.ids:
+            places = self.first_places[self.ids[word]]
+        else:
+            seen = set()
+            places = [(i, c) for i, c in enumerate(word) if not (c in seen or seen.add(c))]
+        pos_score = sum(pos_freq[i].get(c, 0) for i, c in places) if use_pos else 0
+        return pos_score, sum(unknown_freq.get(c, 0) for _, c in places)
+
+    # The sort keys guess_next_word uses for each of words, lower is better: -(pos + non_pos_weight * (letter - pos))
+    # with use_pos, otherwise -letter.
+    def sort_keys(
+        self,
+        words: Sequence[str],
+        pos_freq: List[Dict[str, int]],
+        unknown_freq: Dict[str, int],
+        non_pos_weight: float,
+        use_pos: bool=True
+    ) -> List[float]:
+        # A handful of words is cheaper to score one by one than a pass over every lane
+        if len(words) * 8 < len(self.words):
+            scores = [self.position_and_letter_score(w, pos_freq, unknown_freq, use_pos=use_pos) for w in words]
+            return [self._key(pos, letter, non_pos_weight, use_pos) for pos, letter in scores]
+        # Keys per class, looked up for each word
+        pos_scores, letter_scores = self.class_scores(pos_freq, unknown_freq, use_pos=use_pos)
+        if use_pos:
+            class_keys = [self._key(pos, letter_scores[k], non_pos_weight, use_pos) for pos, k in zip(pos_scores, self.place_letter_class)]
+            word_class = self.place_class
+        else:
+            class_keys = [-letter for letter in letter_scores]
+            word_class = self.letter_class
+        ids = self.ids
+        keys = [class_keys[word_class[ids[w]]] if w in ids else None for w in words]
+        for i, w in enumerate(words):
+            if keys[i] is None:
+                keys[i] = self._key(*self.position_and_letter_score(w, pos_freq, unknown_freq, use_pos=use_pos), non_pos_weight, use_pos)
+        return keys
+
+    @staticmethod
+    def _key(pos: int, letter: int, non_pos_weight: float, use_pos: bool) -> float:
+        if not use_pos:
+            return -letter
+        return -(pos + non_pos_weight * (letter - pos))
+
+    # The words of the guess set with the lowest sort key, leaving out exclude (e.g. the previous guesses), and the
+    # number of classes scored. Only the classes are scored; just the best ones are expanded to their words, for
+    # the solver to break the tie between.
+    def best_words(
+        self,
+        pos_freq: List[Dict[str, int]],
+        unknown_freq: Dict[str, int],
+        non_pos_weight: float,
+        use_pos: bool=True,
+        exclude: Collection[str]=()
+    ) -> Tuple[List[str], int]:
+        pos_scores, letter_scores = self.class_scores(pos_freq, unknown_freq, use_pos=use_pos)
+        if use_pos:
+            classes = self.place_classes
+            keys = [-(pos + non_pos_weight * (letter_scores[k] - pos)) for pos, k in zip(pos_scores, self.place_letter_class)]
+        else:
+            classes = self.letter_classes
+            keys = [-letter for letter in letter_scores]
+        best = min(keys) if len(keys) else None
+        words = [self.words[j] for k, key in enumerate(keys) if key == best for j in classes[k] if not self.words[j] in exclude]
+        if not len(words) and len(exclude):
+            # Every best word was excluded, take the next best classes
+            for key in sorted(set(keys)):
+                words = [self.words[j] for k in range(len(keys)) if keys[k] == key for j in classes[k] if not self.words[j] in exclude]
+                if len(words):
+                    break
+        return words, len(keys)
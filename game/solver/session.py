@@ -0,0 +1,119 @@
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from collections import defaultdict
+from ..constants import DEFAULT_SOLVER_SETTINGS, DEFAULT_FEEDBACK, FEEDBACK_LEGACY
+from ..feedback import Clue, as_clue, has_repeated_letters
+from .index import WordIndex
+from .profile import FILTER, LOOKUP, PARSE_CLUES
+from .solver import choose_next_word, guess_next_word, is_finished
+from .util import copy_constraints, filter_repeated_letter_clues, is_guessable_word, merge_constraints, parse_clues, print_constraints
+
+# A game in progress from the solver's point of view. Keeps the surviving candidates (as a bitset over
+# a WordIndex of the candidate set) and the constraints inferred so far, so each new clue only narrows
+# what already survived instead of re-parsing and re-filtering the whole history. Clues can be undone,
+# and fork() branches the game cheaply, e.g. to explore every clue a guess can get.
+class SolverSession:
+    def __init__(self, solver_settings: Dict[str, bool]=DEFAULT_SOLVER_SETTINGS, debug: int=0):
+        if not 'candidate_set' in solver_settings or not len(solver_settings['candidate_set']):
+            raise Exception('candidate_set not specified in config')
+        self.solver_settings = solver_settings
+        self.debug = debug
+        candidates = solver_settings['candidate_set']
+        index = solver_settings.get('candidate_index')
+        self.index = index if index is not None and index.matches(candidates) else WordIndex(candidates)
+        self.clues = []
+        self._constraints = (defaultdict(set), defaultdict(set), set())
+        self._bits = self.index.all
+        # (bits, constraints) before each clue in self.clues, for undo()
+        self._history = []
+
+    def fork(self) -> 'SolverSession':
+        session = SolverSession.__new__(SolverSession)
+        session.solver_settings = self.solver_settings
+        session.debug = self.debug
+        session.index = self.index
+        session.clues = list(self.clues)
+        # Constraints are never mutated in place, only replaced, so they can be shared
+        session._constraints = self._constraints
+        session._bits = self._bits
+        session._history = list(self._history)
+        return session
+
+    # clue is a Clue, or its tiles
+    def add_clue(self, word: str, clue: Sequence[int]):
+        profiler = self.solver_settings.get('profiler')
+        if profiler is not None:
+            profiler.mark()
+        clue = as_clue(clue, len(word))
+        self._history.append((self._bits, self._constraints))
+        self.clues.append((word, clue))
+        new_constraints = parse_clues([(word, clue)])
+        self._constraints = merge_constraints(self._constraints, new_constraints)
+        if profiler is not None:
+            profiler.lap(PARSE_CLUES, 1)
+        self._bits = self.index.filter(*new_constraints, bits=self._bits)
+        feedback = self.solver_settings.get('feedback', DEFAULT_FEEDBACK)
+        if feedback != FEEDBACK_LEGACY and has_repeated_letters(word):
+            self._bits = self.index.bitset(filter_repeated_letter_clues(self.index.words_of(self._bits), [(word, clue)], mode=feedback))
+        if profiler is not None:
+            profiler.lap(FILTER, len(self.index.words))
+        if self.debug:
+            print_constraints(len(word), *self._constraints)
+
+    def undo(self) -> Optional[Tuple[str, Clue]]:
+        if not len(self.clues):
+            return None
+        self._bits, self._constraints = self._history.pop()
+        return self.clues.pop()
+
+    def constraints(self) -> Tuple[Dict[str, Set[int]], Dict[str, Set[int]], Set[str]]:
+        return copy_constraints(self._constraints)
+
+    def candidates(self) -> List[str]:
+        prev_guesses = set([w for w, _ in self.clues])
+        return self.index.words_of(self._bits & ~self.index.bitset(prev_guesses))
+
+    def is_solved(self) -> bool:
+        if not len(self.clues) or not len(self.clues[-1][1]):
+            return False
+        word, clue = self.clues[-1]
+        return clue.is_solved() and is_guessable_word(word, *self._constraints)
+
+    # Same contract as guess_next_word(session.clues, ...)
+    def next_guess(self) -> Tuple[str, List[str], int]:
+        if 'solution_tree' in self.solver_settings and len(self.solver_settings['solution_tree']):
+            return guess_next_word(self.clues, solver_settings=self.solver_settings, debug=self.debug)
+        deadline = self.solver_settings.get('deadline')
+        if deadline is not None:
+            deadline.start()
+        profiler = self.solver_settings.get('profiler')
+        if profiler is None:
+            return self._next_guess()
+        profiler.begin_turn()
+        try:
+            return self._next_guess()
+        finally:
+            profiler.end_turn()
+
+    def _next_guess(self) -> Tuple[str, List[str], int]:
+        if self.is_solved():
+            return None, [], 0
+        profiler = self.solver_settings.get('profiler')
+        known = None
+        opening_book = self.solver_settings.get('opening_book')
+        if opening_book is not None:
+            known = opening_book.get(self.clues, self.solver_settings)
+        guess_cache = self.solver_settings.get('guess_cache')
+        if known is None and guess_cache is not None:
+            key = guess_cache.key(self.clues, self.solver_settings)
+            known = guess_cache.get(key)
+        if profiler is not None:
+            profiler.lap(LOOKUP, len(self.clues))
+        if known is not None:
+            return known
+        cands = self.candidates()
+        if profiler is not None:
+            profiler.lap(FILTER, len(cands))
+        result = choose_next_word(self.clues, cands, *self.constraints(), solver_settings=self.solver_settings, debug=self.debug)
+        if guess_cache is not None and is_finished(self.solver_settings):
+            guess_cache.put(key, result)
+        return result
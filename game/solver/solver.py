@@ -1,8 +1,12 @@
 from typing import List, Dict, Set, Tuple, Type
 from collections import defaultdict, Counter
-from ..constants import GUESS_RIGHT_SPOT, DEFAULT_SOLVER_SETTINGS
+from ..constants import DEFAULT_SOLVER_SETTINGS, DEFAULT_STRATEGY_TOP_K, DEFAULT_FEEDBACK
+from ..feedback import as_clue
 from ..wordle import Wordle
-from .util import is_guessable_word, parse_clues
+from .profile import LOOKUP, PARSE_CLUES, FILTER, NEW_MUSTS, FREQUENCY_TABLES, SCORING, TIE_BREAK
+from .strategy import FREQUENCY, best_by_partition
+from .tree_file import BinaryTree
+from .util import is_guessable_word, parse_clues, filter_repeated_letter_clues, filter_with_feedback_matrix
 from ..util import get_n_from_word_set
 
 def solve_wordle(
@@ -10,15 +14,25 @@ def solve_wordle(
     solver_settings: Dict[str, bool]=DEFAULT_SOLVER_SETTINGS,
     debug: int=1
 ) -> Tuple[bool, int, List[str]]:
-    clues = []
-    MAX_GUESSES = int(solver_settings['max_guesses'])
+    from .session import SolverSession
+    profiler = solver_settings.get('profiler')
+    if profiler is not None:
+        profiler.begin_game()
+        try:
+            return _solve_wordle(wordle, SolverSession(solver_settings=solver_settings, debug=debug), debug=debug)
+        finally:
+            profiler.end_game()
+    return _solve_wordle(wordle, SolverSession(solver_settings=solver_settings, debug=debug), debug=debug)
+
+def _solve_wordle(wordle: Type[Wordle], session, debug: int=1) -> Tuple[bool, int, List[str]]:
+    MAX_GUESSES = int(session.solver_settings['max_guesses'])
     for i in range(MAX_GUESSES):
-        chosen, cands, numcands = guess_next_word(clues, solver_settings=solver_settings, debug=debug)
+        chosen, cands, numcands = session.next_guess()
         if debug >= 1:
             print(f'Choosing [{chosen}]. Total {numcands} candidates: {cands}...')
         clue, state = wordle.guess(chosen)
-        if clue:
-            clues.append((chosen, clue))
+        if clue is not None:
+            session.add_clue(chosen, clue)
         if state == Wordle.SOLVED:
             if debug >= 1:
                 print(f'Woohoo! Solver solved it in {i+1} guesses!')
@@ -36,6 +50,23 @@ def guess_next_word(
     clues: List[Tuple[str, List[int]]],
     solver_settings: Dict[str, bool]=DEFAULT_SOLVER_SETTINGS,
     debug: int=1,
+) -> Tuple[str, List[str], int]:
+    deadline = solver_settings.get('deadline')
+    if deadline is not None:
+        deadline.start()
+    profiler = solver_settings.get('profiler')
+    if profiler is None:
+        return _guess_next_word(clues, solver_settings, debug=debug)
+    profiler.begin_turn()
+    try:
+        return _guess_next_word(clues, solver_settings, debug=debug)
+    finally:
+        profiler.end_turn()
+
+def _guess_next_word(
+    clues: List[Tuple[str, List[int]]],
+    solver_settings: Dict[str, bool],
+    debug: int=1,
 ) -> Tuple[str, List[str], int]:
     if not 'candidate_set' in solver_settings or not len(solver_settings['candidate_set']): 
         raise Exception('candidate_set not specified in config')
@@ -45,48 +76,85 @@ def guess_next_word(
     else:
         word_set = solver_settings['guess_set']
 
+    clues = [(w, as_clue(clue, len(w))) for w, clue in clues]
+    solved = len(clues) and clues[-1][1].is_solved()
     if 'solution_tree' in solver_settings and len(solver_settings['solution_tree']):
         base = solver_settings['solution_tree']
+        if isinstance(base, BinaryTree):
+            # Binary trees don't store the 🟩🟩🟩🟩🟩 edges, so a solved game ends at the node that guessed the answer
+            node = base.find(clues[:-1] if solved else clues)
+            if node is None or (solved and base.word(node) != clues[-1][0]):
+                raise Exception('No candidates left! Its possible you\'re not using an accurate solution tree for this configuration!')
+            if solved:
+                return None, [], 0
+            chosen = base.word(node)
+            return chosen, [chosen], 1
         for word, clue in clues:
             if not word in base:
                 raise Exception('No candidates left! Its possible you\'re not using an accurate solution tree for this configuration!')
-            strclue = ''.join(map(str, clue))
-            if not strclue in base[word]:
+            # Dict trees are keyed by feedback code, see load_tree
+            if not clue in base[word]:
                 raise Exception('No candidates left! Its possible you\'re not using an accurate solution tree for this configuration!')
-            base = base[word][strclue]
+            base = base[word][clue]
         keys = list(base.keys())
-        if len(clues) and len(clues[-1][1])and len(set(clues[-1][1])) == 1 and clues[-1][1][0] == GUESS_RIGHT_SPOT:
+        if solved:
             return None, [], 0
         if not len(keys):
             raise Exception('No candidates left! Its possible you\'re not using an accurate solution tree for this configuration!')
         return keys[0], [keys[0]], 1
 
 
-
-    N = get_n_from_word_set(word_set)
-    MAX_GUESSES = int(solver_settings['max_guesses'])
-    NON_POS_WEIGHT = float(solver_settings['non_pos_weight'])
+    profiler = solver_settings.get('profiler')
+    known = None
+    opening_book = solver_settings.get('opening_book')
+    if opening_book is not None:
+        known = opening_book.get(clues, solver_settings)
+    guess_cache = solver_settings.get('guess_cache')
+    if known is None and guess_cache is not None:
+        key = guess_cache.key(clues, solver_settings)
+        known = guess_cache.get(key)
+    if profiler is not None:
+        profiler.lap(LOOKUP, len(clues))
+    if known is not None:
+        return known
     word_right_place, in_word_wrong_place, not_in_word = parse_clues(clues, debug=debug)
     prev_guesses = set([w for w, _ in clues])
+    if profiler is not None:
+        profiler.lap(PARSE_CLUES, len(clues))
     # Check if the last clue was fully correct
-    if len(clues) and len(clues[-1][1]) and is_guessable_word(clues[-1][0], word_right_place, in_word_wrong_place, not_in_word) and len(set(clues[-1][1])) == 1 and clues[-1][1][0] == GUESS_RIGHT_SPOT:
+    if solved and is_guessable_word(clues[-1][0], word_right_place, in_word_wrong_place, not_in_word):
         return None, [], 0
 
-    cands = [w for w in candidates \
-            if not w in prev_guesses and is_guessable_word(w, word_right_place, in_word_wrong_place, not_in_word)]
-    
-    if not len(cands):
-        raise Exception('No candidates left! Its possible you\'re not using an accurate dictionary!')
-    guess_left = MAX_GUESSES - len(clues)
-    # len(cands) <= guess_left (this condition guarantees brute force solving, but takes more attempts)
-    if len(cands) == 1 or guess_left == 1 or (len(cands) == 2 and guess_left >= 2): 
-        # We can just guess them all individually or don't have enough guesses left
-        return cands[0], cands, len(cands)
+    feedback = solver_settings.get('feedback', DEFAULT_FEEDBACK)
+    candidate_index = solver_settings.get('candidate_index')
+    if candidate_index is not None and candidate_index.matches(candidates):
+        bits = candidate_index.filter(word_right_place, in_word_wrong_place, not_in_word)
+        cands = candidate_index.words_of(bits & ~candidate_index.bitset(prev_guesses))
+        cands = filter_repeated_letter_clues(cands, clues, mode=feedback)
+    else:
+        cands = filter_with_feedback_matrix(candidates, clues, solver_settings.get('feedback_matrix'), mode=feedback)
+        if cands is not None:
+            cands = [w for w in cands if not w in prev_guesses]
+        else:
+            cands = [w for w in candidates \
+                    if not w in prev_guesses and is_guessable_word(w, word_right_place, in_word_wrong_place, not_in_word)]
+            cands = filter_repeated_letter_clues(cands, clues, mode=feedback)
+    if profiler is not None:
+        profiler.lap(FILTER, len(candidates))
+    result = choose_next_word(clues, cands, word_right_place, in_word_wrong_place, not_in_word, solver_settings=solver_settings, debug=debug)
+    # A guess picked short of the deadline isn't the one the settings would pick
+    if guess_cache is not None and is_finished(solver_settings):
+        guess_cache.put(key, result)
+    return result
 
-    # Explore (non-strict candidates) if
-    # - we have 3 of the letters right 
-    # - more cands than guesses, we go non-strict to reduce the set. 
-    # - not last guess
+# Whether the last guess was picked without running out of time, see Deadline
+def is_finished(solver_settings: Dict[str, bool]) -> bool:
+    deadline = solver_settings.get('deadline')
+    return deadline is None or deadline.finished
+
+# A position where every candidate has the same letter is known: adds it to word_right_place (in place). Returns
+# the letters the candidates have at each position, and the positions still unknown.
+def infer_known_places(cands: List[str], word_right_place: Dict[str, Set[int]], N: int) -> Tuple[List[Set[str]], Set[int]]:
     new_musts = [set() for x in range(N)]
     for ix in range(N):
         for c in cands:
@@ -97,8 +165,15 @@ def guess_next_word(
             word_right_place[letter].add(ix)
     places_known = set([x for setx in word_right_place.values() for x in setx])
     unknown_places = set([ix for ix in range(N) if not ix in places_known])
-    
-    # Assemble character frequencies of remaining candidates
+    return new_musts, unknown_places
+
+# Character frequencies of the candidates at the unknown places, per position and overall, and their total
+def candidate_frequencies(
+    cands: List[str],
+    unknown_places: Set[int],
+    not_in_word: Set[str],
+    N: int
+) -> Tuple[List[Dict[str, int]], Dict[str, int], int]:
     conditional_unknown_freq = defaultdict(int)
     conditional_pos_freq = [defaultdict(int) for i in range(N)]
     total_unknown_freq = 0
@@ -111,6 +186,48 @@ def guess_next_word(
             conditional_unknown_freq[l] += 1
             conditional_pos_freq[i][l] += 1
             total_unknown_freq += 1
+    return conditional_pos_freq, conditional_unknown_freq, total_unknown_freq
+
+# Picks the next guess given the candidates that survived the clues and the constraints parsed from them.
+# Note: word_right_place is extended in place with the positions inferred from the candidates.
+def choose_next_word(
+    clues: List[Tuple[str, List[int]]],
+    cands: List[str],
+    word_right_place: Dict[str, Set[int]],
+    in_word_wrong_place: Dict[str, Set[int]],
+    not_in_word: Set[str],
+    solver_settings: Dict[str, bool]=DEFAULT_SOLVER_SETTINGS,
+    debug: int=1,
+) -> Tuple[str, List[str], int]:
+    if not 'guess_set' in solver_settings or not len(solver_settings['guess_set']): 
+        word_set = solver_settings['candidate_set']
+    else:
+        word_set = solver_settings['guess_set']
+    N = get_n_from_word_set(word_set)
+    MAX_GUESSES = int(solver_settings['max_guesses'])
+    NON_POS_WEIGHT = float(solver_settings['non_pos_weight'])
+    profiler = solver_settings.get('profiler')
+    prev_guesses = set([w for w, _ in clues])
+
+    if not len(cands):
+        raise Exception('No candidates left! Its possible you\'re not using an accurate dictionary!')
+    if not len(clues) and solver_settings.get('start_word'):
+        return solver_settings['start_word'], cands[:5], len(cands)
+    guess_left = MAX_GUESSES - len(clues)
+    # len(cands) <= guess_left (this condition guarantees brute force solving, but takes more attempts)
+    if len(cands) == 1 or guess_left == 1 or (len(cands) == 2 and guess_left >= 2): 
+        # We can just guess them all individually or don't have enough guesses left
+        return cands[0], cands, len(cands)
+
+    # Explore (non-strict candidates) if
+    # - we have 3 of the letters right 
+    # - more cands than guesses, we go non-strict to reduce the set. 
+    # - not last guess
+    new_musts, unknown_places = infer_known_places(cands, word_right_place, N)
+    if profiler is not None:
+        profiler.lap(NEW_MUSTS, len(cands))
+    
+    conditional_pos_freq, conditional_unknown_freq, total_unknown_freq = candidate_frequencies(cands, unknown_places, not_in_word, N)
 
     if total_unknown_freq == 0:
         raise Exception(f'No frequency distribution could be attained from remaining {len(cands)} candidates. This should never happen.')
@@ -145,13 +262,47 @@ def guess_next_word(
             return ([(chr(i + ord('a')), v) for i, v in enumerate(score) if v],
                     [(chr(i + ord('a')), v) for i, v in enumerate(nonpos_score) if v], sortscore)
         sortfn = sort_maximal_position_with_nonpos
-
+    if profiler is not None:
+        profiler.lap(FREQUENCY_TABLES, len(cands))
     
-    explorable = word_set if solver_settings['non_strict'] else cands
-    explorable = [cand for cand in explorable if cand not in prev_guesses]
-    explorable.sort(key=sortfn)
-    max_val = sortfn(explorable[0])
-    explorable = [x for x in explorable if sortfn(x) == max_val]
+    strategy = solver_settings.get('strategy', FREQUENCY)
+    guess_scorer = solver_settings.get('guess_scorer')
+    if strategy == FREQUENCY and solver_settings['non_strict'] and guess_scorer is not None and guess_scorer.source is word_set:
+        # Exploring the whole guess set: score each class of equivalent words once and only expand the best ones
+        explorable, scored = guess_scorer.best_words(conditional_pos_freq, conditional_unknown_freq, NON_POS_WEIGHT,
+                                                     use_pos=solver_settings['use_pos'], exclude=prev_guesses)
+    else:
+        explorable = word_set if solver_settings['non_strict'] else cands
+        explorable = [cand for cand in explorable if cand not in prev_guesses]
+        if guess_scorer is not None and len(explorable):
+            # Same keys as sortfn, computed for every word in a few passes over the whole guess set
+            keys = guess_scorer.sort_keys(explorable, conditional_pos_freq, conditional_unknown_freq, NON_POS_WEIGHT, use_pos=solver_settings['use_pos'])
+        else:
+            keys = [sortfn(x) for x in explorable]
+        deadline = solver_settings.get('deadline')
+        if strategy != FREQUENCY and len(explorable) and deadline is not None and deadline.expired():
+            # Out of time before scoring any partition: go with the letter frequency ordering
+            deadline.cut()
+            max_val = min(keys)
+            explorable = [x for x, key in zip(explorable, keys) if key == max_val]
+        elif strategy != FREQUENCY and len(explorable):
+            explorable = best_by_partition(explorable, keys, cands, strategy, int(solver_settings.get('strategy_top_k', DEFAULT_STRATEGY_TOP_K)),
+                                           feedback_matrix=solver_settings.get('feedback_matrix'), mode=solver_settings.get('feedback', DEFAULT_FEEDBACK),
+                                           deadline=deadline)
+        elif len(explorable):
+            max_val = min(keys)
+            explorable = [x for x, key in zip(explorable, keys) if key == max_val]
+        scored = len(keys)
+    if profiler is not None:
+        profiler.lap(SCORING, scored)
+
+    def boost_letters_in_right_place(word):
+        score = 0
+        for i, c in enumerate(word):
+            if c in new_musts[i] and len(new_musts[i]) > 1:
+                if c in word_right_place:
+                    score += 1
+        return -score
 
     if len(explorable) > 0:
         # Break ties by boosting words with known letter guesses because
@@ -159,13 +310,6 @@ def guess_next_word(
         # because simply guessing them in the wrong place will always return 🟨 
         # because it exists in the word twice
         # Don't think this is needed for use_pos = true
-        def boost_letters_in_right_place(word):
-            score = 0
-            for i, c in enumerate(word):
-                if c in new_musts[i] and len(new_musts[i]) > 1:
-                    if c in word_right_place:
-                        score += 1
-            return -score
         explorable.sort(key=boost_letters_in_right_place)
         max_val2 = boost_letters_in_right_place(explorable[0])
         explorable = [x for x in explorable if boost_letters_in_right_place(x) == max_val2]
@@ -179,5 +323,7 @@ def guess_next_word(
     if not len(explorable):
         raise Exception(f'No more explorable candidates. This should never happen.')
     chosen = min(explorable)
+    if profiler is not None:
+        profiler.lap(TIE_BREAK, len(explorable))
     return chosen, cands[:5], len(cands)
      
\ No newline at end of file
@@ -0,0 +1,80 @@
+from typing import List, Optional, Sequence
+from collections import Counter
+import heapq
+import math
+from ..constants import DEFAULT_FEEDBACK
+from ..feedback import AnswerLanes, FeedbackMatrix
+from .deadline import Deadline
+
+# Guess selection strategies, picked with solver_settings['strategy']
+# The letter frequency heuristic in choose_next_word
+FREQUENCY = 'frequency'
+# Maximize the entropy of the feedback partition of the candidates
+ENTROPY = 'entropy'
+# Minimize the expected number of candidates left after the guess
+EXPECTED_SIZE = 'expected_size'
+# Minimize the largest number of candidates that can be left after the guess
+MINIMAX = 'minimax'
+STRATEGIES = [FREQUENCY, ENTROPY, EXPECTED_SIZE, MINIMAX]
+
+# Sizes of the buckets the candidates fall into by the feedback guess would get against each of them.
+def partition_sizes(
+    guess: str,
+    cands: Sequence[str],
+    feedback_matrix: Optional[FeedbackMatrix]=None,
+    lanes: Optional[AnswerLanes]=None,
+    mode: str=DEFAULT_FEEDBACK
+) -> List[int]:
+    if feedback_matrix is not None and feedback_matrix.mode == mode and feedback_matrix.covers(guess):
+        row = feedback_matrix.row(guess)
+        ids = feedback_matrix.candidate_ids
+        codes = [row[ids[c]] for c in cands]
+    else:
+        if lanes is None:
+            lanes = AnswerLanes(cands, mode=mode)
+        codes = lanes.row_codes(guess)
+    return list(Counter(codes).values())
+
+# Lower is better for every strategy.
+def partition_cost(sizes: Sequence[int], strategy: str) -> float:
+    total = sum(sizes)
+    if strategy == ENTROPY:
+        return sum(n * math.log2(n) for n in sizes) / total - math.log2(total)
+    if strategy == EXPECTED_SIZE:
+        return sum(n * n for n in sizes) / total
+    if strategy == MINIMAX:
+        return max(sizes)
+    raise Exception(f'Unknown partition strategy [{strategy}]. Pick from {STRATEGIES}')
+
+# Prefilters explorable down to the top_k guesses by their cheap (frequency) sort keys, then scores those
+# by the exact partition they make of the candidates. Returns every guess tied for the best partition,
+# preferring guesses that could be the answer themselves. The shortlist is scored best key first, so with a
+# deadline that expires midway the best of the guesses scored so far is returned (and the deadline is cut).
+def best_by_partition(
+    explorable: Sequence[str],
+    keys: Sequence[float],
+    cands: Sequence[str],
+    strategy: str,
+    top_k: int,
+    feedback_matrix: Optional[FeedbackMatrix]=None,
+    mode: str=DEFAULT_FEEDBACK,
+    deadline: Optional[Deadline]=None
+) -> List[str]:
+    shortlist = [guess for _, guess in heapq.nsmallest(top_k, zip(keys, explorable))]
+    # With few candidates left one of them is often as good a split as any, and can also win outright
+    if len(cands) <= top_k:
+        explorable_set = set(explorable)
+        shortlist += [c for c in cands if c in explorable_set and not c in shortlist]
+    if feedback_matrix is not None and feedback_matrix.mode != mode:
+        feedback_matrix = None
+    lanes = None if feedback_matrix is not None else AnswerLanes(cands, mode=mode)
+    cand_set = set(cands)
+    costs = {}
+    for guess in shortlist:
+        if deadline is not None and len(costs) and deadline.expired():
+            deadline.cut()
+            shortlist = [guess for guess in shortlist if guess in costs]
+            break
+        costs[guess] = (partition_cost(partition_sizes(guess, cands, feedback_matrix=feedback_matrix, lanes=lanes, mode=mode), strategy), not guess in cand_set)
+    best = min(costs.values())
+    return [guess for guess in shortlist if costs[guess] == best]
@@ -0,0 +1,133 @@
+from typing import Dict, List, Tuple
+from collections import defaultdict
+import multiprocessing
+from ..constants import DEFAULT_SOLVER_SETTINGS, DEFAULT_FEEDBACK
+from ..feedback import Clue, encode_clue, feedback_code, solved_code
+from .session import SolverSession
+
+# Builds the solver's solution tree by expanding only the feedback patterns the chosen guess can actually get,
+# i.e. by partitioning the surviving candidates by the feedback the guess produces against each of them.
+#
+# A solve is the list of (guess, clue) pairs that ends with the answer guessed correctly. They are returned in
+# the order the old breadth first gen_tree produced them, i.e. by depth and then by the clues on the way there,
+# so that the same tree (and pickle) comes out however the work is split up.
+
+# (depth, clue codes) of the node a solve was found at
+SolveKey = Tuple[int, Tuple[int, ...]]
+
+def _partition(session: SolverSession, guess: str) -> Dict[int, List[str]]:
+    buckets = defaultdict(list)
+    matrix = session.solver_settings.get('feedback_matrix')
+    mode = session.solver_settings.get('feedback', DEFAULT_FEEDBACK)
+    if matrix is not None and matrix.mode == mode and matrix.covers(guess):
+        row = matrix.row(guess)
+        ids = matrix.candidate_ids
+        for c in session.candidates():
+            buckets[row[ids[c]]].append(c)
+    else:
+        for c in session.candidates():
+            buckets[feedback_code(guess, c, mode=mode)].append(c)
+    return buckets
+
+def _expand(
+    session: SolverSession,
+    codes: Tuple[int, ...],
+    max_guesses: int,
+    candidate_set: set,
+    solves: List[Tuple[SolveKey, List[Tuple[str, Clue]]]],
+    stats: Dict[str, int]
+):
+    clues = session.clues
+    stats['count'] += 1
+    if session.debug and stats['count'] % 10 == 0:
+        print(f'Count {stats["count"]} Solved {stats["solved"]} Unsolved: {stats["unsolved"]} Clue Num {len(clues)}')
+    if len(clues) > max_guesses:
+        stats['unsolved'] += 1
+        return
+    try:
+        chosen, cands, lencands = session.next_guess()
+    except Exception as e:
+        # There are no candidates left to guess from
+        return
+    N = session.index.N
+    if lencands == 1 and cands[0] in candidate_set:
+        solves.append(((len(clues), codes), clues + [(cands[0], Clue(solved_code(N), N))]))
+        stats['solved'] += 1
+        return
+    if not chosen:
+        if len(clues) and clues[-1][0] in candidate_set:
+            solves.append(((len(clues), codes), list(clues)))
+            stats['solved'] += 1
+        return
+    for code, bucket in sorted(_partition(session, chosen).items()):
+        child = session.fork()
+        child.add_clue(chosen, Clue(code, N))
+        _expand(child, codes + (code,), max_guesses, candidate_set, solves, stats)
+
+# Per-process state for tree workers, set up once by _init_tree_worker
+_tree_worker_state = {}
+
+def _init_tree_worker(solver_settings: Dict[str, bool], max_guesses: int):
+    _tree_worker_state['solver_settings'] = solver_settings
+    _tree_worker_state['max_guesses'] = max_guesses
+    _tree_worker_state['candidate_set'] = set(solver_settings['candidate_set'])
+
+def _expand_subtree(task: Tuple[List[Tuple[str, Clue]], Tuple[int, ...]]):
+    clues, codes = task
+    session = SolverSession(solver_settings=_tree_worker_state['solver_settings'])
+    for word, clue in clues:
+        session.add_clue(word, clue)
+    solves = []
+    stats = defaultdict(int)
+    _expand(session, codes, _tree_worker_state['max_guesses'], _tree_worker_state['candidate_set'], solves, stats)
+    return solves, dict(stats)
+
+def build_solves(
+    solver_settings: Dict[str, bool]=DEFAULT_SOLVER_SETTINGS,
+    workers: int=1,
+    debug: int=0
+) -> Tuple[List[List[Tuple[str, Clue]]], Dict[str, int]]:
+    max_guesses = int(solver_settings['max_guesses'])
+    candidate_set = set(solver_settings['candidate_set'])
+    root = SolverSession(solver_settings=solver_settings, debug=debug)
+    solves = []
+    stats = defaultdict(int)
+    if workers <= 1:
+        _expand(root, (), max_guesses, candidate_set, solves, stats)
+    else:
+        # Expand the first guess here and fan its subtrees out across the pool, biggest first
+        stats['count'] += 1
+        chosen, cands, lencands = root.next_guess()
+        N = root.index.N
+        buckets = _partition(root, chosen)
+        if lencands == 1:
+            buckets = {}
+            solves.append(((0, ()), [(cands[0], Clue(solved_code(N), N))]))
+            stats['solved'] += 1
+        tasks = [([(chosen, Clue(code, N))], (code,)) for code, bucket in sorted(buckets.items(), key=lambda kv: -len(kv[1]))]
+        with multiprocessing.Pool(workers, initializer=_init_tree_worker, initargs=(solver_settings, max_guesses)) as pool:
+            for subtree_solves, subtree_stats in pool.imap_unordered(_expand_subtree, tasks):
+                solves += subtree_solves
+                for k, v in subtree_stats.items():
+                    stats[k] += v
+                if debug:
+                    print(f'Count {stats["count"]} Solved {stats["solved"]} Unsolved: {stats["unsolved"]}')
+    solves.sort(key=lambda s: s[0])
+    return [solve for _, solve in solves], dict(stats)
+
+# Nests solves into {guess: {feedback code: {next guess: {...}}}}, the format --tree_file reads.
+def solves_to_tree(solves: List[List[Tuple[str, Clue]]], N: int) -> Dict:
+    solution_tree = {}
+    solved = solved_code(N)
+    for solution in solves:
+        currdict = solution_tree
+        for word, clue in solution:
+            if not word in currdict:
+                currdict[word] = {}
+            code = encode_clue(clue)
+            if code == solved:
+                continue
+            if not code in currdict[word]:
+                currdict[word][code] = {}
+            currdict = currdict[word][code]
+    return solution_tree
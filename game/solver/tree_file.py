@@ -0,0 +1,250 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+import argparse
+import mmap
+import pickle
+import struct
+import sys
+from ..constants import DEFAULT_FEEDBACK, FEEDBACK_LEGACY, FEEDBACK_MODES
+from ..feedback import check_feedback_mode, encode_clue
+
+# A flat, memory-mappable version of the {guess: {feedback code: {next guess: {...}}}} solution trees that
+# gen_tree writes. Opening one only maps the file; lookups index straight into the mapped arrays.
+# Older pickled trees are keyed by clue strings like '01202' instead, see tree_with_codes.
+#
+# Layout (all integers little endian uint32):
+#  - header
+#  - words: every guess in the tree, sorted, N ascii bytes each (padded to a multiple of 4 bytes)
+#  - nodes: (word id, first edge, number of edges) per node, node 0 is the root
+#  - edge codes: the feedback code (see game/feedback.py) of each edge, sorted within a node
+#  - edge children: the node each edge leads to
+
+TREE_MAGIC = b'WTRE'
+TREE_VERSION = 2
+# magic, version, N, feedback mode (index in FEEDBACK_MODES), number of words, nodes, edges
+TREE_HEADER = struct.Struct('<4sBBBxIII')
+# Version 1 trees have no feedback mode, they were all scored with legacy feedback
+TREE_VERSIONS = {1: FEEDBACK_LEGACY, TREE_VERSION: None}
+NODE_FIELDS = 3
+
+def _uint32s(data) -> memoryview:
+    view = memoryview(data).cast('B').cast('I')
+    if sys.byteorder != 'little':
+        swapped = array('I', view)
+        swapped.byteswap()
+        view = memoryview(swapped)
+    return view
+
+def _little_endian(values: List[int]) -> bytes:
+    data = array('I', values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+class BinaryTree:
+    def __init__(self, data):
+        self._data = data
+        magic, version, n, mode_id, num_words, num_nodes, num_edges = TREE_HEADER.unpack_from(data)
+        if magic != TREE_MAGIC or not version in TREE_VERSIONS:
+            raise Exception('Not a binary solution tree')
+        if TREE_VERSIONS[version] is None and mode_id >= len(FEEDBACK_MODES):
+            raise Exception(f'Binary solution tree has an unknown feedback mode {mode_id}')
+        self.N = n
+        # How the tree's feedback codes were scored, see game/feedback.py
+        self.feedback = TREE_VERSIONS[version] or FEEDBACK_MODES[mode_id]
+        self.num_words, self.num_nodes, self.num_edges = num_words, num_nodes, num_edges
+        offset = TREE_HEADER.size
+        words_size = num_words * n
+        self._words = memoryview(data)[offset:offset + words_size]
+        offset += words_size + (-words_size % 4)
+        self._nodes = _uint32s(memoryview(data)[offset:offset + num_nodes * NODE_FIELDS * 4])
+        offset += num_nodes * NODE_FIELDS * 4
+        self._codes = _uint32s(memoryview(data)[offset:offset + num_edges * 4])
+        offset += num_edges * 4
+        self._children = _uint32s(memoryview(data)[offset:offset + num_edges * 4])
+        if offset + num_edges * 4 != len(data):
+            raise Exception('Binary solution tree is truncated')
+        # Set when the tree is memory-mapped from a file
+        self.path = None
+
+    @classmethod
+    def open(cls, path: str) -> 'BinaryTree':
+        with open(path, 'rb') as f:
+            tree = cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        tree.path = path
+        return tree
+
+    # Memory-mapped trees pickle as their path so worker processes map the same file
+    def __reduce__(self):
+        if self.path:
+            return (BinaryTree.open, (self.path,))
+        return (BinaryTree, (bytes(self._data),))
+
+    # Same truthiness as the dict trees, so `len(solver_settings['solution_tree'])` checks keep working
+    def __len__(self) -> int:
+        return self.num_nodes
+
+    def word(self, node: int) -> str:
+        word_id = self._nodes[node * NODE_FIELDS]
+        return self._words[word_id * self.N:(word_id + 1) * self.N].tobytes().decode()
+
+    def edges(self, node: int) -> Tuple[int, int]:
+        start = self._nodes[node * NODE_FIELDS + 1]
+        return start, start + self._nodes[node * NODE_FIELDS + 2]
+
+    def child(self, node: int, code: int) -> Optional[int]:
+        start, end = self.edges(node)
+        ix = bisect_left(self._codes, code, start, end)
+        if ix < end and self._codes[ix] == code:
+            return self._children[ix]
+        return None
+
+    # The node reached by following clues from the root, or None if the tree doesn't cover them.
+    def find(self, clues: List[Tuple[str, List[int]]]) -> Optional[int]:
+        node = 0
+        for word, clue in clues:
+            if self.word(node) != word:
+                return None
+            node = self.child(node, encode_clue(clue))
+            if node is None:
+                return None
+        return node
+
+    def to_dict(self, node: int=0) -> Dict:
+        start, end = self.edges(node)
+        children = {}
+        for ix in range(start, end):
+            children[self._codes[ix]] = self.to_dict(self._children[ix])
+        return {self.word(node): children}
+
+# The same tree with every clue string key ('01202') replaced by its feedback code, which is what the solver looks
+# clues up by. Keys that already are codes are kept.
+def tree_with_codes(solution_tree: Dict) -> Dict:
+    return {word: {(clue if isinstance(clue, int) else int(clue, 3)): tree_with_codes(child) for clue, child in children.items()}
+            for word, children in solution_tree.items()}
+
+# Older trees also have an edge to an empty dict for the all 🟩 clue of the answer, which lookups never need.
+def prune_solved_edges(solution_tree: Dict) -> Dict:
+    return {word: {clue: prune_solved_edges(child) for clue, child in children.items() if len(child)}
+            for word, children in solution_tree.items()}
+
+def tree_to_bytes(solution_tree: Dict, mode: str=DEFAULT_FEEDBACK) -> bytes:
+    check_feedback_mode(mode)
+    solution_tree = prune_solved_edges(solution_tree)
+    if len(solution_tree) != 1:
+        raise Exception(f'A solution tree must have exactly one first guess, got {list(solution_tree.keys())}')
+    words = set()
+    pending = [solution_tree]
+    while pending:
+        node = pending.pop()
+        for word, children in node.items():
+            words.add(word)
+            pending.extend(children.values())
+    words = sorted(words)
+    n = len(words[0])
+    word_ids = {w: i for i, w in enumerate(words)}
+    # Number the nodes breadth first so each node's edges are contiguous
+    nodes, codes, children = [], [], []
+    queue = [solution_tree]
+    while len(nodes) < len(queue) * NODE_FIELDS:
+        node = queue[len(nodes) // NODE_FIELDS]
+        (word, edges), = node.items()
+        if len(word) != n:
+            raise Exception(f'Word [{word}] needs to be {n} letters')
+        edges = sorted((clue if isinstance(clue, int) else int(clue, 3), child) for clue, child in edges.items())
+        nodes += [word_ids[word], len(codes), len(edges)]
+        for code, child in edges:
+            codes.append(code)
+            children.append(len(queue))
+            queue.append(child)
+    words_data = ''.join(words).encode()
+    return b''.join([
+        TREE_HEADER.pack(TREE_MAGIC, TREE_VERSION, n, FEEDBACK_MODES.index(mode), len(words), len(nodes) // NODE_FIELDS, len(codes)),
+        words_data,
+        b'\0' * (-len(words_data) % 4),
+        _little_endian(nodes),
+        _little_endian(codes),
+        _little_endian(children),
+    ])
+
+def write_tree(solution_tree: Dict, path: str, mode: str=DEFAULT_FEEDBACK):
+    with open(path, 'wb') as f:
+        f.write(tree_to_bytes(solution_tree, mode=mode))
+
+# Pickled trees are saved as {'feedback': mode, 'solution_tree': tree}. Older pickles are the bare tree, and were all
+# scored with legacy feedback.
+def dump_tree(solution_tree: Dict, path: str, mode: str=DEFAULT_FEEDBACK):
+    check_feedback_mode(mode)
+    with open(path, 'wb') as f:
+        pickle.dump({'feedback': mode, 'solution_tree': solution_tree}, f)
+
+# The pickled tree in path as written (clue string or code keys), and its feedback mode
+def read_pickled_tree(path: str) -> Tuple[Dict, str]:
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    if 'solution_tree' in data:
+        check_feedback_mode(data['feedback'])
+        return data['solution_tree'], data['feedback']
+    return data, FEEDBACK_LEGACY
+
+def is_binary_tree_file(path: str) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(TREE_MAGIC)) == TREE_MAGIC
+
+# Loads either tree format for --tree_file. Returns the tree and the feedback mode it was built with.
+def load_tree(path: str) -> Tuple[object, str]:
+    if is_binary_tree_file(path):
+        tree = BinaryTree.open(path)
+        return tree, tree.feedback
+    solution_tree, mode = read_pickled_tree(path)
+    return tree_with_codes(solution_tree), mode
+
+# Returns a list of problems with the binary tree, checked against the dict tree it came from if given.
+def verify_tree(tree: BinaryTree, solution_tree: Optional[Dict]=None, mode: Optional[str]=None) -> List[str]:
+    errors = []
+    if mode is not None and tree.feedback != mode:
+        errors.append(f'Binary tree was built with {tree.feedback} feedback, the pickled tree with {mode}')
+    for node in range(tree.num_nodes):
+        if tree._nodes[node * NODE_FIELDS] >= tree.num_words:
+            errors.append(f'Node {node} has an invalid word id')
+        start, end = tree.edges(node)
+        if end > tree.num_edges:
+            errors.append(f'Node {node} has edges out of range')
+            continue
+        for ix in range(start, end):
+            if ix > start and tree._codes[ix - 1] >= tree._codes[ix]:
+                errors.append(f'Node {node} has unsorted edges')
+            if tree._codes[ix] >= 3 ** tree.N:
+                errors.append(f'Node {node} has an invalid feedback code')
+            if not 0 < tree._children[ix] < tree.num_nodes:
+                errors.append(f'Node {node} has an invalid child')
+    if solution_tree is not None and not len(errors) and tree.to_dict() != tree_with_codes(prune_solved_edges(solution_tree)):
+        errors.append('Binary tree does not match the pickled tree')
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert and verify binary solution trees')
+    parser.add_argument('command', choices=['convert', 'verify'])
+    parser.add_argument('tree_file', help='The binary tree to write (convert) or check (verify)')
+    parser.add_argument('--pickle', help='The pickled solution tree to convert from, or to verify against', default=None)
+    args = parser.parse_args()
+    if args.command == 'convert':
+        if not args.pickle:
+            print('Error: convert needs --pickle')
+            sys.exit(1)
+        solution_tree, mode = read_pickled_tree(args.pickle)
+        write_tree(solution_tree, args.tree_file, mode=mode)
+        print(f'Wrote [{args.tree_file}]')
+    solution_tree, mode = None, None
+    if args.pickle:
+        solution_tree, mode = read_pickled_tree(args.pickle)
+    tree = BinaryTree.open(args.tree_file)
+    errors = verify_tree(tree, solution_tree, mode=mode)
+    for error in errors:
+        print(f'Error: {error}')
+    print(f'{tree.num_nodes} nodes, {tree.num_edges} edges, {tree.num_words} words, {tree.feedback} feedback: {"OK" if not errors else "INVALID"}')
+    sys.exit(1 if errors else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from collections import defaultdict
-from ..constants import NOTHING, GUESS_WRONG_SPOT, GUESS_RIGHT_SPOT
+from ..constants import NOTHING, GUESS_WRONG_SPOT, GUESS_RIGHT_SPOT, DEFAULT_FEEDBACK, FEEDBACK_LEGACY
+from ..feedback import Clue, FeedbackMatrix, encode_clue, feedback_code, has_repeated_letters
 
 def indexall(w: str, let: str) -> Set[int]:
     ix = set()
@@ -11,14 +12,21 @@ def indexall(w: str, let: str) -> Set[int]:
 
 def parse_clues(clues: List[Tuple[str, List[int]]], debug=False) -> Tuple[Dict[str, Set[int]], Dict[str, Set[int]], Set[str]]:
     if not len(clues):
-        return {}, {}, set()
+        return defaultdict(set), defaultdict(set), set()
     N = len(clues[0][0])
     not_in_word = set()
     in_word_wrong_place = defaultdict(set)
     word_right_place = defaultdict(set)
-    for w, clue_res in clues:
+    for w, clue in clues:
+        # Walk the tiles of the clue once, whether it came as a Clue or as a list
+        clue_res = clue.tiles() if isinstance(clue, Clue) else clue
+        # With 'wordle' feedback a repeated letter can be ⬛ and also 🟨/🟩 elsewhere in the same guess: then it is
+        # in the word, just not at the ⬛ spot
+        in_guess = set(w[i] for i in range(len(clue_res)) if clue_res[i] != NOTHING)
         for i in range(len(clue_res)):
-            if clue_res[i] == NOTHING:
+            if clue_res[i] == NOTHING and w[i] in in_guess:
+                in_word_wrong_place[w[i]].add(i)
+            elif clue_res[i] == NOTHING:
                 not_in_word.add(w[i])
             elif clue_res[i] == GUESS_WRONG_SPOT:
                 in_word_wrong_place[w[i]].add(i)
@@ -27,16 +35,46 @@ def parse_clues(clues: List[Tuple[str, List[int]]], debug=False) -> Tuple[Dict[s
             else:
                 assert False
     if debug:
-        fword = ['_'] * N
-        for c, ixes in word_right_place.items():
-            for ix in ixes:
-                fword[ix] = c
-        word_format = ''.join(fword)
-        wrong_place = [(x, y) for x, y in in_word_wrong_place.items()]
-        not_word = ''.join(not_in_word)
-        print(f'Right: [{word_format}] Wrong: {wrong_place} Absent: [{not_word}]')
+        print_constraints(N, word_right_place, in_word_wrong_place, not_in_word)
     return word_right_place, in_word_wrong_place, not_in_word
 
+def print_constraints(
+        N: int,
+        word_right_place: Dict[str, Set[int]],
+        in_word_wrong_place: Dict[str, Set[int]],
+        not_in_word: Set[str]
+    ):
+    fword = ['_'] * N
+    for c, ixes in word_right_place.items():
+        for ix in ixes:
+            fword[ix] = c
+    word_format = ''.join(fword)
+    wrong_place = [(x, y) for x, y in in_word_wrong_place.items()]
+    not_word = ''.join(not_in_word)
+    print(f'Right: [{word_format}] Wrong: {wrong_place} Absent: [{not_word}]')
+
+# Adds the constraints parsed from newer clues into the accumulated ones, as if parse_clues had seen all the clues.
+def merge_constraints(
+        constraints: Tuple[Dict[str, Set[int]], Dict[str, Set[int]], Set[str]],
+        new_constraints: Tuple[Dict[str, Set[int]], Dict[str, Set[int]], Set[str]]
+    ) -> Tuple[Dict[str, Set[int]], Dict[str, Set[int]], Set[str]]:
+    word_right_place, in_word_wrong_place, not_in_word = copy_constraints(constraints)
+    new_right_place, new_wrong_place, new_not_in_word = new_constraints
+    for let, ixes in new_right_place.items():
+        word_right_place[let] |= ixes
+    for let, ixes in new_wrong_place.items():
+        in_word_wrong_place[let] |= ixes
+    not_in_word |= new_not_in_word
+    return word_right_place, in_word_wrong_place, not_in_word
+
+def copy_constraints(
+        constraints: Tuple[Dict[str, Set[int]], Dict[str, Set[int]], Set[str]]
+    ) -> Tuple[Dict[str, Set[int]], Dict[str, Set[int]], Set[str]]:
+    word_right_place, in_word_wrong_place, not_in_word = constraints
+    return (defaultdict(set, {l: set(ixes) for l, ixes in word_right_place.items()}),
+            defaultdict(set, {l: set(ixes) for l, ixes in in_word_wrong_place.items()}),
+            set(not_in_word))
+
 def is_guessable_word(
         w: str,
         word_right_place: Dict[str, Set[int]],
@@ -69,4 +107,36 @@ def is_guessable_word(
             if debug:
                 print(f'Letter [{let}] cannot be in word!')
             return False
-    return True
\ No newline at end of file
+    return True
+
+# The constraints from parse_clues pin down the candidates exactly, except for the letter counts that a guess
+# with a repeated letter reveals under 'wordle' feedback (e.g. ⬛ on the second e of speed means exactly one e).
+# Filters candidates that satisfy the constraints down to those that would have produced exactly those clues.
+def filter_repeated_letter_clues(
+        candidates: List[str],
+        clues: List[Tuple[str, List[int]]],
+        mode: str=DEFAULT_FEEDBACK
+    ) -> List[str]:
+    if mode == FEEDBACK_LEGACY:
+        return candidates
+    exact = [(w, encode_clue(clue)) for w, clue in clues if has_repeated_letters(w)]
+    if not len(exact):
+        return candidates
+    return [c for c in candidates if all(feedback_code(w, c, mode=mode) == code for w, code in exact)]
+
+# Filters candidates to those that would have produced exactly the given clues, using the precomputed
+# feedback matrix. Returns None if the matrix can't answer for these clues or this candidate set.
+def filter_with_feedback_matrix(
+        candidates: List[str],
+        clues: List[Tuple[str, List[int]]],
+        matrix: Optional[FeedbackMatrix],
+        mode: str=DEFAULT_FEEDBACK
+    ) -> Optional[List[str]]:
+    if matrix is None or matrix.mode != mode or not all(matrix.covers(w) for w, _ in clues):
+        return None
+    ids = matrix.candidate_ids
+    rows = [(matrix.row(w), encode_clue(clue)) for w, clue in clues]
+    try:
+        return [c for c in candidates if all(row[ids[c]] == code for row, code in rows)]
+    except KeyError:
+        return None
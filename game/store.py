@@ -0,0 +1,184 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import sqlite3
+from time import time
+from .constants import CACHE_DIR
+from .results import read_results
+from .solver.memo import SETTINGS_KEYS
+
+# A local store of eval results (python main.py -m eval --result_store), one row per word keyed by the solver
+# configuration and the dictionaries it was solved with, so an eval only solves the words that configuration hasn't
+# solved yet. The configuration hash covers the solver's source code (every .py file under game/), the settings that
+# change guesses, the game settings, the solution tree and the time budget for each guess (a guess cut short by
+# --deadline_ms can differ from the one picked without it), so changing any of them invalidates the rows: they are
+# simply not found and get solved again. Old rows are kept, to diff against (see diff_results).
+
+DEFAULT_RESULT_STORE = os.path.join(CACHE_DIR, 'results.sqlite')
+STORE_VERSION = 1
+# Game settings results depend on, besides the solver settings
+GAME_KEYS = ['max_guesses', 'feedback', 'evil']
+# The solver's source, hashed into every configuration
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (configuration hash, dictionaries hash) of a run
+RunKey = Tuple[str, str]
+# word, solved, guesses, clues (feedback codes), seconds
+StoredResult = Tuple[str, bool, List[str], List[int], float]
+
+_code_version = None
+
+# Hash of every .py file under game/, computed once per process
+def code_version() -> str:
+    global _code_version
+    if _code_version is None:
+        h = hashlib.sha1()
+        for root, dirs, files in os.walk(SOURCE_DIR):
+            dirs.sort()
+            for fname in sorted(files):
+                if not fname.endswith('.py'):
+                    continue
+                path = os.path.join(root, fname)
+                h.update(os.path.relpath(path, SOURCE_DIR).encode())
+                with open(path, 'rb') as f:
+                    h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+def config_hash(game_config: Dict[str, str], solver_settings: Dict[str, bool], tree: Optional[str]=None, code: Optional[str]=None) -> str:
+    h = hashlib.sha1()
+    h.update(f'v{STORE_VERSION}\n{code if code is not None else code_version()}\n'.encode())
+    h.update('\n'.join(f'{k}={solver_settings.get(k)}' for k in SETTINGS_KEYS).encode())
+    h.update('\n'.join(f'game.{k}={game_config.get(k)}' for k in GAME_KEYS).encode())
+    h.update(f'\ntree={tree}'.encode())
+    deadline = solver_settings.get('deadline')
+    if deadline is not None:
+        h.update(f'\ndeadline={deadline.seconds}'.encode())
+    return h.hexdigest()
+
+# Word order decides ties between guesses, so the lists are hashed as they are
+def dicts_hash(solver_settings: Dict[str, bool]) -> str:
+    candidates = solver_settings['candidate_set']
+    guesses = solver_settings.get('guess_set') or candidates
+    h = hashlib.sha1()
+    h.update('\n'.join(guesses).encode())
+    h.update(b'\0')
+    h.update('\n'.join(candidates).encode())
+    return h.hexdigest()
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+# How runs are named on the command line: the start of both hashes
+def run_name(run: RunKey) -> str:
+    return f'{run[0][:12]}:{run[1][:12]}'
+
+class ResultStore:
+    def __init__(self, path: str=DEFAULT_RESULT_STORE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('CREATE TABLE IF NOT EXISTS runs (config TEXT, dicts TEXT, settings TEXT, created REAL, PRIMARY KEY (config, dicts))')
+        self.db.execute('CREATE TABLE IF NOT EXISTS results (config TEXT, dicts TEXT, word TEXT, solved INTEGER, guesses TEXT, attempts INTEGER, '
+                        'clues TEXT, seconds REAL, created REAL, PRIMARY KEY (config, dicts, word))')
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # The run for a configuration, recorded with its settings so runs can be listed
+    def open_run(self, game_config: Dict[str, str], solver_settings: Dict[str, bool], tree: Optional[str]=None) -> RunKey:
+        run = (config_hash(game_config, solver_settings, tree=tree), dicts_hash(solver_settings))
+        settings = {k: solver_settings.get(k) for k in SETTINGS_KEYS}
+        settings.update({f'game.{k}': game_config.get(k) for k in GAME_KEYS})
+        deadline = solver_settings.get('deadline')
+        settings.update(tree=tree, deadline=deadline.seconds if deadline is not None else None, code=code_version()[:12], words=len(solver_settings['candidate_set']))
+        self.db.execute('INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?)', (run[0], run[1], json.dumps(settings), time()))
+        self.db.commit()
+        return run
+
+    # (name, settings, created, rows) of every run, newest first
+    def runs(self) -> List[Tuple[str, Dict, float, int]]:
+        rows = self.db.execute('SELECT r.config, r.dicts, r.settings, r.created, COUNT(s.word) FROM runs r LEFT JOIN results s '
+                               'ON r.config = s.config AND r.dicts = s.dicts GROUP BY r.config, r.dicts ORDER BY r.created DESC').fetchall()
+        return [(run_name((config, dicts)), json.loads(settings), created, count) for config, dicts, settings, created, count in rows]
+
+    # The run whose name starts with prefix (see run_name)
+    def find_run(self, prefix: str) -> Optional[RunKey]:
+        config, _, dicts = prefix.partition(':')
+        rows = self.db.execute('SELECT config, dicts FROM runs WHERE config LIKE ? AND dicts LIKE ?', (config + '%', dicts + '%')).fetchall()
+        if len(rows) > 1:
+            raise Exception(f'[{prefix}] matches {len(rows)} runs, give more of it')
+        return rows[0] if len(rows) else None
+
+    # Stored results of run for the words given, by word
+    def get(self, run: RunKey, words: Optional[Sequence[str]]=None) -> Dict[str, StoredResult]:
+        wanted = set(words) if words is not None else None
+        results = {}
+        for word, solved, guesses, clues, seconds in self.db.execute(
+                'SELECT word, solved, guesses, clues, seconds FROM results WHERE config = ? AND dicts = ?', run):
+            if wanted is not None and not word in wanted:
+                continue
+            results[word] = (word, bool(solved), guesses.split('-') if guesses else [], [int(c) for c in clues.split('-')] if clues else [], seconds)
+        return results
+
+    # Rows are committed every so often and on close, not one by one
+    def put(self, run: RunKey, word: str, solved: bool, guesses: List[str], clues: Sequence[int]=(), seconds: float=0.0):
+        self.db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (run[0], run[1], word, int(solved), '-'.join(guesses), len(guesses), '-'.join(str(int(c)) for c in clues), seconds, time()))
+
+    def commit(self):
+        self.db.commit()
+
+# Word -> (solved, guesses) of a run in a results file (CSV or JSON lines, see game/results.py) or a result store
+# run name
+def load_run(source: str, store: Optional[ResultStore]=None) -> Dict[str, Tuple[bool, List[str]]]:
+    if os.path.exists(source):
+        return {word: (solved, guesses) for word, solved, guesses in read_results(source)}
+    run = store.find_run(source) if store is not None else None
+    if run is None:
+        raise Exception(f'[{source}] is neither a results file nor a run in the result store')
+    return {word: (solved, guesses) for word, (_, solved, guesses, _, _) in store.get(run).items()}
+
+# Kinds of differences between two runs for a word
+REGRESSED = 'regressed'
+IMPROVED = 'improved'
+CHANGED = 'changed'
+ADDED = 'added'
+REMOVED = 'removed'
+DIFF_KINDS = [REGRESSED, IMPROVED, CHANGED, ADDED, REMOVED]
+
+def _diff_kind(old: Optional[Tuple[bool, List[str]]], new: Optional[Tuple[bool, List[str]]]) -> Optional[str]:
+    if old is None:
+        return ADDED
+    if new is None:
+        return REMOVED
+    if old == new:
+        return None
+    # Unsolved is worse than any number of attempts
+    old_cost = len(old[1]) if old[0] else float('inf')
+    new_cost = len(new[1]) if new[0] else float('inf')
+    if new_cost > old_cost:
+        return REGRESSED
+    if new_cost < old_cost:
+        return IMPROVED
+    return CHANGED
+
+# (word, kind, old, new) for every word whose result differs between the runs, in the order of old then new
+def diff_results(old: Dict[str, Tuple[bool, List[str]]], new: Dict[str, Tuple[bool, List[str]]]) -> Iterator[Tuple[str, str, Optional[Tuple[bool, List[str]]], Optional[Tuple[bool, List[str]]]]]:
+    for word in list(old) + [w for w in new if not w in old]:
+        kind = _diff_kind(old.get(word), new.get(word))
+        if kind is not None:
+            yield word, kind, old.get(word), new.get(word)
@@ -0,0 +1,246 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+import itertools
+import json
+import multiprocessing
+import os
+import random
+from time import perf_counter
+from .config import make_configs
+from .constants import DEFAULT_SOLVER_SETTINGS, DEFAULT_GUESS_CACHE_SIZE
+from .evil import make_game
+from .results import CSV, JSONL, EvalStats, result_format
+from .solver.book import OpeningBook
+from .solver.memo import GuessCache, SETTINGS_KEYS
+from .solver.profile import percentile
+from .solver.solver import solve_wordle
+from .util import read_words_of_length
+
+# Hyperparameter sweeps (python main.py -m sweep --sweep_space space.json): evals every configuration of a search
+# space over the same words and ranks them by accuracy, then mean attempts, then latency.
+#
+# The space is a JSON object from solver settings (any of SETTINGS_KEYS, e.g. non_pos_weight, use_pos, non_strict
+# or start_word) to the list of values to try, plus optionally DICTS, a list of [dict_file, cand_file] pairs:
+#
+#   {"non_pos_weight": [0.3, 0.5, 0.7], "use_pos": [true, false], "start_word": [null, "soare", "crane"],
+#    "dicts": [["data/official_wordle_all.txt", "data/official_wordle_common.txt"]]}
+#
+# Every combination is tried (a grid search), or with samples only that many random ones, in which case a value
+# can also be a range {"min": 0.2, "max": 0.8} to draw floats from.
+#
+# Word lists, indexes, guess scorers and feedback matrices only depend on the dictionaries (and feedback mode), so
+# they are built once per pair in the parent and shared with the worker processes, which each eval whole
+# configurations with their own guess cache and opening book.
+
+DICTS = 'dicts'
+SWEEP_KEYS = SETTINGS_KEYS + [DICTS]
+# Floats drawn from a range are rounded to this many decimals
+RANGE_DECIMALS = 3
+RESULT_KEYS = ['games', 'failed', 'accuracy', 'avg_attempts', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms']
+
+def load_space(path: str) -> Dict[str, List]:
+    with open(path, 'r') as f:
+        space = json.load(f)
+    check_space(space)
+    return space
+
+def check_space(space: Dict[str, List]):
+    if not isinstance(space, dict) or not len(space):
+        raise Exception('The sweep space must be a JSON object of settings to values')
+    for key, values in space.items():
+        if not key in SWEEP_KEYS:
+            raise Exception(f'[{key}] can\'t be swept, expected one of {SWEEP_KEYS}')
+        if isinstance(values, dict):
+            if key == DICTS or set(values) != {'min', 'max'}:
+                raise Exception(f'Range for [{key}] must be {{"min": ..., "max": ...}}')
+        elif not isinstance(values, list) or not len(values):
+            raise Exception(f'Values for [{key}] must be a non-empty list')
+    for pair in space.get(DICTS, []):
+        if not isinstance(pair, list) or not len(pair) in [1, 2]:
+            raise Exception(f'Dictionaries must be [dict_file, cand_file] pairs, got {pair}')
+
+def _key(params: Dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+# The configurations to eval: every combination of the space, or samples random ones (at most the size of the grid)
+def sweep_configs(space: Dict[str, List], samples: Optional[int]=None, seed: Optional[int]=None) -> List[Dict]:
+    check_space(space)
+    keys = list(space)
+    ranges = [k for k in keys if isinstance(space[k], dict)]
+    if samples is None:
+        if len(ranges):
+            raise Exception(f'Ranges ({ranges}) need a random sweep, pass a number of samples')
+        return [dict(zip(keys, values)) for values in itertools.product(*[space[k] for k in keys])]
+    rng = random.Random(seed)
+    grid_size = None
+    if not len(ranges):
+        grid_size = 1
+        for k in keys:
+            grid_size *= len(space[k])
+    configs = {}
+    # Draws that repeat a configuration are retried, up to a point
+    for i in range(samples * 20):
+        if len(configs) >= samples or len(configs) == grid_size:
+            break
+        params = {}
+        for k in keys:
+            if k in ranges:
+                params[k] = round(rng.uniform(space[k]['min'], space[k]['max']), RANGE_DECIMALS)
+            else:
+                params[k] = rng.choice(space[k])
+        configs.setdefault(_key(params), params)
+    return list(configs.values())
+
+# (dict_file, cand_file or None, feedback) the configuration is played with: defaults, unless it sweeps them
+def tables_key(params: Dict, defaults: Tuple[str, Optional[str], str]) -> Tuple[str, Optional[str], str]:
+    dict_file, cand_file, feedback = defaults
+    if params.get(DICTS):
+        pair = params[DICTS]
+        dict_file, cand_file = pair[0], pair[1] if len(pair) > 1 else None
+    return dict_file, cand_file, params.get('feedback', feedback)
+
+# (game_config, solver_settings) for every dictionary pair and feedback mode in configs, without any of the
+# per-configuration caches. config_kwargs are passed to make_configs (e.g. hard_mode, strategy, max_guesses).
+def load_tables(
+    configs: List[Dict],
+    N: int,
+    defaults: Tuple[str, Optional[str], str],
+    **config_kwargs
+) -> Dict[Tuple[str, Optional[str], str], Tuple[Dict, Dict]]:
+    config_kwargs.update(guess_cache_size=0, opening_book=False, profile=False)
+    word_lists = {}
+    tables = {}
+    for params in configs:
+        key = tables_key(params, defaults)
+        if key in tables:
+            continue
+        dict_file, cand_file, mode = key
+        for fname in [dict_file, cand_file]:
+            if fname and not fname in word_lists:
+                word_lists[fname] = read_words_of_length(N, fname=fname)
+        word_set = word_lists[dict_file]
+        candidate_set = word_lists[cand_file] if cand_file else word_set
+        tables[key] = make_configs(word_set, candidate_set, feedback=mode, **config_kwargs)
+    return tables
+
+# The words every configuration over the same dictionaries is evaluated on: k random candidates, or all of them
+def sweep_words(tables: Dict[Tuple[str, Optional[str], str], Tuple[Dict, Dict]], k: Optional[int]=None, seed: Optional[int]=None) -> Dict[Tuple[str, Optional[str]], List[str]]:
+    words = {}
+    for (dict_file, cand_file, _), (_, solver_settings) in tables.items():
+        if (dict_file, cand_file) in words:
+            continue
+        candidates = solver_settings['candidate_set']
+        words[(dict_file, cand_file)] = random.Random(seed).sample(candidates, k) if k and k < len(candidates) else list(candidates)
+    return words
+
+# The configuration's (game_config, solver_settings): its tables, with params applied and fresh caches
+def configure(
+    params: Dict,
+    tables: Dict[Tuple[str, Optional[str], str], Tuple[Dict, Dict]],
+    defaults: Tuple[str, Optional[str], str],
+    guess_cache_size: int=DEFAULT_GUESS_CACHE_SIZE,
+    opening_book: bool=True
+) -> Tuple[Dict, Dict]:
+    game_config, solver_settings = tables[tables_key(params, defaults)]
+    game_config, solver_settings = dict(game_config), dict(solver_settings)
+    for k, v in params.items():
+        if k == DICTS:
+            continue
+        # Numbers are kept as strings in the settings
+        solver_settings[k] = str(v) if isinstance(DEFAULT_SOLVER_SETTINGS[k], str) and v is not None else v
+    game_config['max_guesses'] = solver_settings['max_guesses']
+    start_word = solver_settings.get('start_word')
+    if start_word and not start_word in set(solver_settings['guess_set'] or solver_settings['candidate_set']):
+        raise Exception(f'Start word [{start_word}] is not a valid guess')
+    if int(solver_settings['strategy_top_k']) < 1:
+        raise Exception(f'strategy_top_k must be at least 1, got {solver_settings["strategy_top_k"]}')
+    solver_settings['guess_cache'] = GuessCache(guess_cache_size) if guess_cache_size > 0 else None
+    solver_settings['opening_book'] = OpeningBook() if opening_book else None
+    return game_config, solver_settings
+
+# Per-process state for sweep workers, see _init_sweep_worker
+_sweep_state = {}
+
+def _init_sweep_worker(tables, words, defaults, guess_cache_size: int, opening_book: bool):
+    _sweep_state['tables'] = tables
+    _sweep_state['words'] = words
+    _sweep_state['defaults'] = defaults
+    _sweep_state['guess_cache_size'] = guess_cache_size
+    _sweep_state['opening_book'] = opening_book
+
+def _run_config(task: Tuple[int, Dict]) -> Tuple[int, Dict, Dict]:
+    ix, params = task
+    tables = _sweep_state['tables']
+    defaults = _sweep_state['defaults']
+    game_config, solver_settings = configure(params, tables, defaults, guess_cache_size=_sweep_state['guess_cache_size'], opening_book=_sweep_state['opening_book'])
+    if solver_settings['opening_book'] is not None:
+        # Built (or loaded) up front so the first game's latency is a game's
+        solver_settings['opening_book'].prepare(solver_settings)
+    dict_file, cand_file, _ = tables_key(params, defaults)
+    stats = EvalStats()
+    latencies = []
+    for word in _sweep_state['words'][(dict_file, cand_file)]:
+        start = perf_counter()
+        w = make_game(word, config=game_config, verbose=False)
+        got_ans, _, _ = solve_wordle(w, solver_settings=solver_settings, debug=0)
+        latencies.append(perf_counter() - start)
+        stats.add(word, got_ans, w.guesses)
+    result = {
+        'games': stats.count,
+        'failed': len(stats.failed),
+        'accuracy': stats.accuracy(),
+        'avg_attempts': stats.avg_attempts(),
+        'mean_ms': 1000 * sum(latencies) / max(len(latencies), 1),
+    }
+    for pct in [50, 90, 99]:
+        result[f'p{pct}_ms'] = 1000 * percentile(latencies, pct)
+    return ix, params, result
+
+# Yields (index in configs, params, result) as each configuration finishes, across a process pool if workers > 1
+def run_sweep(
+    configs: List[Dict],
+    tables: Dict[Tuple[str, Optional[str], str], Tuple[Dict, Dict]],
+    words: Dict[Tuple[str, Optional[str]], List[str]],
+    defaults: Tuple[str, Optional[str], str],
+    workers: int=1,
+    guess_cache_size: int=DEFAULT_GUESS_CACHE_SIZE,
+    opening_book: bool=True
+) -> Iterator[Tuple[int, Dict, Dict]]:
+    initargs = (tables, words, defaults, guess_cache_size, opening_book)
+    tasks = list(enumerate(configs))
+    if workers <= 1:
+        _init_sweep_worker(*initargs)
+        for task in tasks:
+            yield _run_config(task)
+        return
+    # Forked workers share the parent's tables instead of building their own
+    with multiprocessing.Pool(workers, initializer=_init_sweep_worker, initargs=initargs) as pool:
+        yield from pool.imap_unordered(_run_config, tasks, chunksize=1)
+
+# Best first: most accurate, then fewest attempts, then fastest
+def rank(rows: List[Tuple[Dict, Dict]]) -> List[Tuple[Dict, Dict]]:
+    return sorted(rows, key=lambda row: (-row[1]['accuracy'], row[1]['avg_attempts'], row[1]['mean_ms']))
+
+def _format_value(value) -> str:
+    if isinstance(value, list):
+        return ':'.join(str(v) for v in value)
+    return str(value)
+
+# Writes the ranked leaderboard to path (CSV, or JSON lines if it ends in .jsonl), replacing it atomically so it can
+# be rewritten as every configuration finishes
+def write_leaderboard(path: str, rows: List[Tuple[Dict, Dict]], keys: List[str]):
+    fmt = result_format(path)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        if fmt == CSV:
+            f.write(','.join(['rank'] + keys + RESULT_KEYS) + '\n')
+        for i, (params, result) in enumerate(rank(rows)):
+            if fmt == JSONL:
+                f.write(json.dumps(dict({'rank': i + 1}, **{k: params.get(k) for k in keys}, **result)) + '\n')
+            else:
+                values = [_format_value(params.get(k)) for k in keys] + [f'{result[k]:.4f}' if isinstance(result[k], float) else str(result[k]) for k in RESULT_KEYS]
+                f.write(','.join([str(i + 1)] + values) + '\n')
+    os.replace(tmp, path)
+
+def format_row(params: Dict, result: Dict) -> str:
+    settings = ' '.join(f'{k}={_format_value(v)}' for k, v in params.items())
+    return f'{settings}\tAccuracy:{result["accuracy"]*100:.02f}%\tAvg Attempts: {result["avg_attempts"]:.03f}\tAvg Time: {result["mean_ms"]:.01f}ms (p90 {result["p90_ms"]:.01f}ms)'
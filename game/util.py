@@ -1,6 +1,7 @@
 from collections import Counter
 from typing import List
 from .constants import DEFAULT_DICT, DATA_DIR
+from .word_cache import read_word_cache, write_word_cache
 import os
 
 def get_n_from_word_set(word_set: List[str]):
@@ -20,15 +21,22 @@ def read_to_lines(fname: str) -> List[str]:
     lines = [d for d in data.split('\n') if len(d)]
     return lines
 
-def read_words_of_length(n: int, fname: str=DEFAULT_DICT) -> List[str]:
+def read_words_of_length(n: int, fname: str=DEFAULT_DICT, use_cache: bool=True) -> List[str]:
     if not os.path.exists(fname):
         available = []
         if os.path.exists(DATA_DIR):
             available = [os.path.join(DATA_DIR, fname) for fname in os.listdir(DATA_DIR)]
         msg = f' Pick from {available} instead in ./{DATA_DIR}/' if len(available) else ''
         raise Exception(f'Path [{fname}] does not seem to exist.{msg}')
+    if use_cache:
+        word_set = read_word_cache(fname, n)
+        if word_set is not None:
+            return word_set
     all_words = read_to_lines(fname)
-    word_set = list(set([w for w in all_words if len(w) == n and w.islower()]))
+    # Dedupe but keep the file's order so that results (and --seed sampling) are reproducible across runs
+    word_set = list(dict.fromkeys([w for w in all_words if len(w) == n and w.islower()]))
     # Validate wordset
     get_n_from_word_set(word_set)
+    if use_cache:
+        write_word_cache(fname, n, word_set)
     return word_set
\ No newline at end of file
@@ -0,0 +1,76 @@
+from typing import List, Optional
+import hashlib
+import os
+import struct
+from .constants import WORD_CACHE_DIR
+
+# Compiled word lists, so that reading an N letter dictionary doesn't re-parse the whole source file each run.
+# A cache file holds the words of one length from one source file, in the source's order, packed at a fixed
+# width, and lives in WORD_CACHE_DIR next to the source. It is used while the source's size and mtime are
+# unchanged, or while its content hash still matches if they did change.
+
+WORDS_MAGIC = b'WLST'
+WORDS_VERSION = 1
+# magic, version, bytes per char (1 = ascii, 4 = utf-32), N, number of words, source size, source mtime, source sha1
+WORDS_HEADER = struct.Struct('<4sBBHIQq20s')
+
+def word_cache_path(fname: str, n: int) -> str:
+    return os.path.join(os.path.dirname(fname), WORD_CACHE_DIR, f'{os.path.basename(fname)}.{n}.words')
+
+def _file_sha1(fname: str) -> bytes:
+    h = hashlib.sha1()
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.digest()
+
+def read_word_cache(fname: str, n: int) -> Optional[List[str]]:
+    path = word_cache_path(fname, n)
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        stat = os.stat(fname)
+    except OSError:
+        return None
+    if len(data) < WORDS_HEADER.size:
+        return None
+    magic, version, char_width, cached_n, count, size, mtime, sha1 = WORDS_HEADER.unpack_from(data)
+    if magic != WORDS_MAGIC or version != WORDS_VERSION or cached_n != n:
+        return None
+    if len(data) != WORDS_HEADER.size + count * n * char_width:
+        return None
+    if (size, mtime) != (stat.st_size, stat.st_mtime_ns):
+        if _file_sha1(fname) != sha1:
+            return None
+        # Same content with a new mtime (e.g. a fresh checkout), refresh the header so we don't hash again
+        write_word_cache(fname, n, None, data=data[WORDS_HEADER.size:], char_width=char_width, count=count, sha1=sha1)
+    text = data[WORDS_HEADER.size:].decode('ascii' if char_width == 1 else 'utf-32-le')
+    return [text[i:i + n] for i in range(0, len(text), n)]
+
+def write_word_cache(
+    fname: str,
+    n: int,
+    words: Optional[List[str]],
+    data: Optional[bytes]=None,
+    char_width: int=1,
+    count: int=0,
+    sha1: Optional[bytes]=None
+):
+    if words is not None:
+        text = ''.join(words)
+        char_width = 1 if text.isascii() else 4
+        data = text.encode('ascii' if char_width == 1 else 'utf-32-le')
+        count = len(words)
+    path = word_cache_path(fname, n)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        stat = os.stat(fname)
+        sha1 = sha1 or _file_sha1(fname)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            f.write(WORDS_HEADER.pack(WORDS_MAGIC, WORDS_VERSION, char_width, n, count, stat.st_size, stat.st_mtime_ns, sha1))
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        # Read only data directories just don't get a cache
+        pass
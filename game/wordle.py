@@ -1,13 +1,10 @@
 from typing import Dict, List, Tuple, Set
-from .constants import NOTHING, GUESS_WRONG_SPOT, GUESS_RIGHT_SPOT, DEFAULT_GAME_CONFIG
+from .constants import DEFAULT_GAME_CONFIG, DEFAULT_FEEDBACK
 from .util import get_n_from_word_set
+from .feedback import TILE_EMOJI, Clue, check_feedback_mode, feedback_code
 
 class Wordle:
-    EMOJI_MAP = {
-        NOTHING: '⬛',
-        GUESS_WRONG_SPOT: '🟨',
-        GUESS_RIGHT_SPOT: '🟩',
-    }
+    EMOJI_MAP = TILE_EMOJI
     # states
     PLAYING = 0
     SOLVED = 1
@@ -27,11 +24,21 @@ class Wordle:
         else:
             self.guess_set = set(config['guess_set'])
 
+        # 'wordle' or 'legacy' scoring, see game/feedback.py
+        self.feedback = config.get('feedback', DEFAULT_FEEDBACK)
+        check_feedback_mode(self.feedback)
+        # Optional precomputed FeedbackMatrix to read clues from instead of scoring each guess
+        self.feedback_matrix = config.get('feedback_matrix')
+        if self.feedback_matrix is not None and self.feedback_matrix.mode != self.feedback:
+            self.feedback_matrix = None
         self.guesses = []
+        self.clues = []
         self.state = Wordle.PLAYING
         self.verbose = verbose
     
     def emojify(clue):
+        if isinstance(clue, Clue):
+            return clue.emoji()
         pclue = []
         for c in clue:
             if not c in Wordle.EMOJI_MAP:
@@ -47,7 +54,7 @@ class Wordle:
 
     
     # Encoding: 0, nothing, 1 guess wrong spot, 2 guess right spot
-    def guess(self, guess: str) -> Tuple[List[str], int]:
+    def guess(self, guess: str) -> Tuple[Clue, int]:
         if self.state == Wordle.SOLVED:
             if self.verbose:
                 print('Already solved!')
@@ -59,17 +66,17 @@ class Wordle:
         guess = guess.lower()
         Wordle.check_word(self.N, guess, self.guess_set)
         self.guesses.append(guess)
-        clue = [NOTHING] * self.N
-        for i, g in enumerate(guess):
-            if self._word[i] == g:
-                clue[i] = GUESS_RIGHT_SPOT
-            elif g in self._word:
-                clue[i] = GUESS_WRONG_SPOT
+        if self.feedback_matrix is not None and self.feedback_matrix.covers(guess, self._word):
+            code = self.feedback_matrix.code(guess, self._word)
+        else:
+            code = feedback_code(guess, self._word, mode=self.feedback)
+        clue = Clue(code, self.N)
+        self.clues.append(clue)
         if self.verbose:
             print(guess.upper())
             print(Wordle.emojify(clue))
             
-        if len([1 for c in clue if c == GUESS_RIGHT_SPOT]) == self.N:
+        if clue.is_solved():
             if self.verbose:
                 print(f'Solved! - [{guess}]')
             self.state = Wordle.SOLVED
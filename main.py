@@ -1,13 +1,28 @@
-from collections import Counter
 from game.wordle import Wordle
-from game.constants import DEFAULT_N, DEFAULT_MAX_GUESSES, DEFAULT_GAME_CONFIG, DEFAULT_SOLVER_SETTINGS, DEFAULT_DICT, DEFAULT_CAND_DICT
-from game.solver.solver import guess_next_word, solve_wordle
+from game.feedback import Clue
+from game.evil import EVIL_POLICIES
+from game.multi import join_boards
+from game.results import EvalStats, ResultWriter, eval_results, read_results, solve_game
+from game.store import ADDED, CHANGED, DEFAULT_RESULT_STORE, DIFF_KINDS, IMPROVED, REGRESSED, REMOVED, ResultStore, diff_results, file_hash, load_run, run_name
+from game.config import make_configs
+from game.service import CONFIG_DEFAULTS, serve
+from game.sweep import format_row, rank, load_space, load_tables, run_sweep, sweep_configs, sweep_words, write_leaderboard
+from game.constants import DEFAULT_N, DEFAULT_MAX_GUESSES, DEFAULT_SOLVER_SETTINGS, DEFAULT_DICT, DEFAULT_CAND_DICT, DEFAULT_STRATEGY_TOP_K, DEFAULT_GUESS_CACHE_SIZE, MAX_FEEDBACK_MATRIX_BYTES, FEEDBACK_LEGACY, FEEDBACK_WORDLE
+from game.solver.solver import guess_next_word, is_finished
+from game.solver.optimal import AVERAGE, OBJECTIVES, OptimalSearch, checkpoint_path, optimal_tree
+from game.solver.profile import print_summary
+from game.solver.session import SolverSession
+from game.solver.strategy import STRATEGIES
+from game.solver.tree import build_solves, solves_to_tree
+from game.solver.tree_file import dump_tree, write_tree
 from game.util import get_n_from_word_set, read_words_of_length
 import argparse
+import asyncio
+import os
 import random
 import sys
 from time import time
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 
 PLAY = 'play'
@@ -16,6 +31,10 @@ SOLVE = 'solve'
 SHOW = 'show'
 EVAL = 'eval'
 GEN_TREE = 'gen_tree'
+DIFF = 'diff'
+SERVE = 'serve'
+SWEEP = 'sweep'
+OPTIMAL = 'optimal'
 
 def play(game_config: Dict[str, str]):
     hidden_word = random.choice(game_config['candidate_set'])
@@ -30,12 +49,12 @@ def play(game_config: Dict[str, str]):
 
 def save(game_config: Dict[str, str], solver_settings: Dict[str, str], debug: int=0):
     N = get_n_from_word_set(solver_settings['guess_set'])
-    clues = []
+    session = SolverSession(solver_settings=solver_settings, debug=debug)
     guesses = 0
     while guesses < int(game_config['max_guesses']):
-        chosen, cands, lencands = guess_next_word(clues, solver_settings=solver_settings, debug=debug)
+        chosen, cands, lencands = session.next_guess()
         if not chosen:
-            print(f'Solved! = {clues[-1][0]}')
+            print(f'Solved! = {session.clues[-1][0]}')
             sys.exit()
         print(f'Solver recommends the word [{chosen.upper()}]. There are {lencands} possible words: {cands[:10]}...')
         error = True 
@@ -51,28 +70,23 @@ def save(game_config: Dict[str, str], solver_settings: Dict[str, str], debug: in
                 continue
             error = False
         feedback = input('How did it do (0=⬛, 1=🟨, 2=🟩) e.g. 00000 or ⬛⬛⬛⬛⬛? ')
-        feedback = feedback.strip()
-        if len(feedback) != N:
-            print(f'Error: Result must be {N} length.')
-            continue
-        if len(set(feedback + '012')) <= 3:
-            feedback_parsed = [ord(f) - ord('0') for f in feedback]
-        elif len(set(feedback + '⬛🟨🟩')) <= 3:
-            reverse_emoji_map = {v: k for k, v in Wordle.EMOJI_MAP.items()}
-            feedback_parsed = [reverse_emoji_map[f] for f in feedback]
-        else:
+        try:
+            feedback_parsed = Clue.parse(feedback)
+        except Exception as e:
             print(f'Error: Must only be 0, 1, or 2')
             continue
+        if len(feedback_parsed) != N:
+            print(f'Error: Result must be {N} length.')
+            continue
         guesses += 1
-        clues.append((guess, feedback_parsed)) 
+        session.add_clue(guess, feedback_parsed)
     print(f'Unsolved!')
 
 def show(words: List[str], game_config: Dict[str, str], solver_settings: Dict[str, str], debug: int=0):
     for word in words:
         try:
             print(f'Word [{word.upper()}]')
-            w = Wordle(word, config=game_config)
-            solve_wordle(w, solver_settings=solver_settings, debug=debug)
+            solve_game(word, game_config, solver_settings, debug=debug)
         except Exception as e:
             print(f'Error: {str(e)}')
         print('\n\n')
@@ -81,73 +95,204 @@ def solve(game_config: Dict[str, str], solver_settings: Dict[str, str], debug: i
     if not 'guess_set' in solver_settings: 
         raise Exception('guess_set not specified in config')
     N = get_n_from_word_set(solver_settings['guess_set'])
-    clues = []
+    session = SolverSession(solver_settings=solver_settings, debug=debug)
     guesses = 0
     while guesses < int(game_config['max_guesses']):
-        chosen, cands, lencands = guess_next_word(clues, solver_settings=solver_settings, debug=debug)
+        chosen, cands, lencands = session.next_guess()
         if not chosen:
-            print(f'Solved! = {clues[-1][0]}')
+            print(f'Solved! = {session.clues[-1][0]}')
             sys.exit()
         print(f'Try the word [{chosen.upper()}]. There are {lencands} possible words: {cands[:10]}...')
+        if not is_finished(solver_settings):
+            print(f'(Best guess found within {solver_settings["deadline"].seconds * 1000:.0f}ms)')
         feedback = input('How did it do (0=⬛, 1=🟨, 2=🟩) e.g. 00000 or ⬛⬛⬛⬛⬛? ')
-        feedback = feedback.strip()
-        if len(feedback) != N:
-            print(f'Error: Result must be {N} length.')
-            continue
-        if len(set(feedback + '012')) <= 3:
-            feedback_parsed = [ord(f) - ord('0') for f in feedback]
-        elif len(set(feedback + '⬛🟨🟩')) <= 3:
-            reverse_emoji_map = {v: k for k, v in Wordle.EMOJI_MAP.items()}
-            feedback_parsed = [reverse_emoji_map[f] for f in feedback]
-        else:
+        try:
+            feedback_parsed = Clue.parse(feedback)
+        except Exception as e:
             print(f'Error: Must only be 0, 1, or 2')
             continue
+        if len(feedback_parsed) != N:
+            print(f'Error: Result must be {N} length.')
+            continue
         guesses += 1
-        clues.append((chosen, feedback_parsed)) 
+        session.add_clue(chosen, feedback_parsed)
     print(f'Unsolved!')
 
-def eval(words: List[str], out_file: str, game_config: Dict[str, str], solver_settings: Dict[str, str], debug: int=0):
+# The results of stored (word -> (word, solved, guesses, clues, seconds)) and of solving the other words, in the order of words
+def _with_stored(words: List[str], stored: Dict, results):
+    results = iter(results)
+    for word in words:
+        if word in stored:
+            yield stored[word] + (None,)
+        else:
+            yield next(results)
+
+def eval(
+    words: List[str],
+    out_file: str,
+    game_config: Dict[str, str],
+    solver_settings: Dict[str, str],
+    debug: int=0,
+    workers: int=1,
+    resume: bool=False,
+    store: Optional[ResultStore]=None,
+    run=None
+):
     if not 'candidate_set' in solver_settings: 
         raise Exception('candidate_set not specified in config')
     candidates = solver_settings['candidate_set']
-    print(f'Evaluating on {len(words)} words. Total available candidate words: {len(candidates)}')
-    fails = []
+    stats = EvalStats()
+    if resume and out_file and os.path.exists(out_file):
+        # Words already in out_file count towards the totals and aren't solved again
+        todo = set(words)
+        for word, got_ans, guesses in read_results(out_file):
+            if word in todo:
+                todo.discard(word)
+                stats.add(word, got_ans, guesses)
+        words = [w for w in words if w in todo]
+        print(f'Resuming from [{out_file}]: {stats.count} words already done')
+    stored = {}
+    if store is not None:
+        # Words this configuration already solved are read back instead of solved again
+        stored = store.get(run, words)
+        print(f'Result store run [{run_name(run)}]: {len(stored)} of {len(words)} words already solved')
+    print(f'Evaluating on {len(words)} words with {workers} worker(s). Total available candidate words: {len(candidates)}')
     start = time()
-    attempts = []
-    attempt_tot = 0
-    for x in range(len(words)):
-        count = x+1
-        if count and count % 10 == 0:
-            print(f'k={count}:\tFailed: {len(fails)}\tAccuracy:{(1 - len(fails)/count)*100:.02f}%\tAvg Attempts: {sum([len(a[1]) for a in attempts])/count:.02f}\tAvg Time: {(time() - start)/count:.03f}s')
-        word = words[x]
-        w = Wordle(word, config=game_config, verbose=debug >= 2)
-        got_ans, attempt_count, cands = solve_wordle(w, solver_settings=solver_settings, debug=debug)
-        if not got_ans:
-            fails.append((word, w.guesses))
-        else:
-            attempts.append((word, w.guesses))
-    failed_words = [f[0] for f in fails]
-    print(f'Failed on: {failed_words}')
-    print(f'Distribution of remaining candidates: {Counter([len(f[1]) for f in fails]).most_common()}')
-    print(f'Distribution of attempts needed: {Counter([len(a[1]) for a in attempts]).most_common()}')
-    print(f'K={len(words)}:\tFailed: {len(fails)}\tAccuracy:{(1 - len(fails)/len(words))*100:.02f}%\tAvg Attempts: {sum([len(a[1]) for a in attempts])/count:.02f}\tAvg Time: {(time() - start)/count:.03f}s')
+    done = 0
+    profiler = solver_settings.get('profiler')
+    writer = ResultWriter(out_file, append=resume) if out_file else None
+    results = eval_results([w for w in words if not w in stored], game_config, solver_settings, debug=debug, workers=workers)
+    try:
+        for word, got_ans, guesses, clues, seconds, profile in _with_stored(words, stored, results):
+            if profile is not None:
+                profiler.extend(*profile)
+            if done and done % 10 == 0:
+                print(f'k={stats.count}:\tFailed: {len(stats.failed)}\tAccuracy:{stats.accuracy()*100:.02f}%\tAvg Attempts: {stats.avg_attempts():.02f}\tAvg Time: {(time() - start)/done:.03f}s')
+            done += 1
+            stats.add(word, got_ans, guesses)
+            if writer is not None:
+                writer.write(word, got_ans, guesses, clues=clues)
+            if store is not None and not word in stored:
+                store.put(run, word, got_ans, guesses, clues=clues, seconds=seconds)
+                if done % 100 == 0:
+                    store.commit()
+    except KeyboardInterrupt:
+        print(f'Interrupted after {stats.count} words' + (f', rerun with --resume to continue from [{out_file}]' if out_file else ''))
+    finally:
+        if writer is not None:
+            writer.close()
+        if store is not None:
+            store.commit()
+    print(f'Failed on: {stats.failed}')
+    print(f'Distribution of remaining candidates: {stats.failed_lengths.most_common()}')
+    print(f'Distribution of attempts needed: {stats.attempts.most_common()}')
+    if profiler is not None:
+        print_summary(profiler)
+    guess_cache = solver_settings.get('guess_cache')
+    if guess_cache is not None and workers <= 1:
+        cache_stats = guess_cache.stats()
+        print(f'Guess cache: {cache_stats["hits"]} hits, {cache_stats["misses"]} misses, {cache_stats["size"]} states, {cache_stats["evictions"]} evictions')
+    print(f'K={stats.count}:\tFailed: {len(stats.failed)}\tAccuracy:{stats.accuracy()*100:.02f}%\tAvg Attempts: {stats.avg_attempts():.02f}\tAvg Time: {(time() - start)/max(done, 1):.03f}s')
+    if out_file:
+        print(f'Wrote raw results to file [{out_file}]')
+
+# Evals every configuration of the search space in space_file on the same k words (all candidates if not given) and
+# prints, and writes to out_file, the leaderboard. See game/sweep.py. config_kwargs are the make_configs settings
+# the space doesn't sweep.
+def sweep(
+    space_file: str,
+    out_file: Optional[str],
+    N: int,
+    defaults: Tuple[str, Optional[str], str],
+    k: Optional[int]=None,
+    samples: Optional[int]=None,
+    seed: Optional[int]=None,
+    workers: int=1,
+    guess_cache_size: int=DEFAULT_GUESS_CACHE_SIZE,
+    opening_book: bool=True,
+    **config_kwargs
+):
+    configs = sweep_configs(load_space(space_file), samples=samples, seed=seed)
+    start = time()
+    tables = load_tables(configs, N, defaults, **config_kwargs)
+    words = sweep_words(tables, k=k, seed=seed)
+    print(f'Sweeping {len(configs)} configurations over {len(tables)} dictionary pair(s) with {workers} worker(s), loaded in {time() - start:.02f}s')
+    keys = list(dict.fromkeys(key for params in configs for key in params))
+    rows = []
+    try:
+        for ix, params, result in run_sweep(configs, tables, words, defaults, workers=workers, guess_cache_size=guess_cache_size, opening_book=opening_book):
+            rows.append((params, result))
+            print(f'[{len(rows)}/{len(configs)}] {format_row(params, result)}')
+            if out_file:
+                write_leaderboard(out_file, rows, keys)
+    except KeyboardInterrupt:
+        print(f'Interrupted after {len(rows)} configurations')
+    print(f'Leaderboard after {time() - start:.02f}s:')
+    for i, (params, result) in enumerate(rank(rows)):
+        print(f'{i + 1}.\t{format_row(params, result)}')
     if out_file:
-        print(f'Writing raw results to file [{out_file}]')
-        # Potentially create custom out_file name if not provided
-        headers = ['word', 'solved', 'guesses', 'attempts']
-        with open(out_file, 'w') as f:
-            f.write(','.join(headers)+'\n')
-            for fail in fails:
-                f.write(','.join([fail[0], '0', '-'.join(fail[1]), str(len(fail[1]))]) + '\n')
-            for attempt in attempts:
-                f.write(','.join([attempt[0], '1', '-'.join(attempt[1]), str(len(attempt[1]))]) + '\n')
+        print(f'Wrote leaderboard to file [{out_file}]')
+
+# Prints how every word's result differs between two runs: results files (CSV or JSON lines) or result store runs
+def diff(old_source: str, new_source: str, store: Optional[ResultStore]=None, out_file: Optional[str]=None):
+    old, new = load_run(old_source, store=store), load_run(new_source, store=store)
+    print(f'Diffing [{old_source}] ({len(old)} words) against [{new_source}] ({len(new)} words)')
+    counts = {kind: 0 for kind in DIFF_KINDS}
+    show = lambda result: '-' if result is None else f'{"-".join(result[1])} ({len(result[1]) if result[0] else "unsolved"})'
+    f = open(out_file, 'w') if out_file else None
+    try:
+        if f is not None:
+            f.write('word,kind,old_solved,old_guesses,new_solved,new_guesses\n')
+        for word, kind, old_result, new_result in diff_results(old, new):
+            counts[kind] += 1
+            # Words only one run has (e.g. a partial eval) are only counted
+            if not kind in [ADDED, REMOVED]:
+                print(f'{kind}\t{word}:\t{show(old_result)} -> {show(new_result)}')
+            if f is not None:
+                row = [word, kind]
+                for result in [old_result, new_result]:
+                    row += ['', ''] if result is None else ['1' if result[0] else '0', '-'.join(result[1])]
+                f.write(','.join(row) + '\n')
+    finally:
+        if f is not None:
+            f.close()
+    same = len(set(old) & set(new)) - sum(counts[k] for k in [REGRESSED, IMPROVED, CHANGED])
+    print(f'Same: {same}\t' + '\t'.join(f'{kind.capitalize()}: {counts[kind]}' for kind in DIFF_KINDS))
+    if out_file:
+        print(f'Wrote diff to file [{out_file}]')
+
+# Searches for the optimal solution tree for objective (see game/solver/optimal.py) and writes it to out_file
+def optimal(solver_settings: Dict[str, str], objective: str, out_file: str, workers: int=1, checkpoint: Optional[str]=None, debug: int=0):
+    guesses = solver_settings['guess_set'] or solver_settings['candidate_set']
+    candidates = solver_settings['candidate_set']
+    search = OptimalSearch(guesses, candidates, feedback_matrix=solver_settings.get('feedback_matrix'), mode=solver_settings['feedback'])
+    if not checkpoint:
+        checkpoint = checkpoint_path(guesses, candidates, mode=solver_settings['feedback'])
+    print(f'Searching for the optimal tree ({objective}), checkpointing to [{checkpoint}]')
+    start = time()
+    solution_tree, total, worst = optimal_tree(search, int(solver_settings['max_guesses']), objective=objective, start_word=solver_settings.get('start_word'),
+                                               workers=workers, checkpoint=checkpoint, debug=debug)
+    if out_file.endswith('.pickle'):
+        dump_tree(solution_tree, out_file, mode=solver_settings['feedback'])
+    else:
+        write_tree(solution_tree, out_file, mode=solver_settings['feedback'])
+    first, = solution_tree
+    print(f'[{first}] solves all {len(search.candidates)} candidates in {total} guesses, Avg Attempts: {total / len(search.candidates):.4f}, at most {worst}, in {time() - start:.02f}s')
+    print(f'Wrote [{out_file}]')
+
+# argparse type for counts that must be at least 1
+def positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {n}')
+    return n
 
 def main():
     parser = argparse.ArgumentParser(description='Play Wordle')
     parser.add_argument('-m',
                         '--mode',
                         help='Run mode. Default none',
-                        choices=[PLAY, SAVE, SHOW, SOLVE, EVAL, GEN_TREE],
+                        choices=[PLAY, SAVE, SHOW, SOLVE, EVAL, GEN_TREE, SERVE, SWEEP, DIFF, OPTIMAL],
                         default=None,
                         required=True)
     parser.add_argument('-w',
@@ -181,8 +326,13 @@ def main():
                         required=False)
     parser.add_argument('--guesses',
                         type=int,
-                        help='Value of MAX_GUESSES',
-                        default=DEFAULT_MAX_GUESSES,
+                        help=f'Value of MAX_GUESSES. Defaults to {DEFAULT_MAX_GUESSES}, plus one for every board after the first with --boards.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--boards',
+                        type=int,
+                        help='Number of boards each game is played on at once (4 for Quordle, 8 for Octordle) in -m eval. Every eval word is then that many random words.',
+                        default=1,
                         required=False)
     parser.add_argument('-hard',
                         '--hard_mode',
@@ -202,16 +352,172 @@ def main():
                         required=False)
     parser.add_argument('--eval_out_file',
                         type=str,
-                        help='A file to write the detailed outputs for the eval to.',
+                        help='A file to write the detailed outputs for the eval to, one row per word as it is solved. CSV, or JSON lines if it ends in .jsonl.',
                         default=None,
                         required=False)
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='Skip the words already in --eval_out_file and add to it, e.g. after an interrupted eval. Use the same --seed to eval the same random words.',
+                        default=False,
+                        required=False)
     parser.add_argument('--tree_file',
                         type=str,
-                        help='A file that contains the pickled vesion of the solution tree for the official wordle configuration.',
+                        help='A file that contains the solution tree for the official wordle configuration, either pickled or in the binary format (see game/solver/tree_file.py).',
+                        default=None,
+                        required=False)
+    parser.add_argument('--strategy',
+                        type=str,
+                        help='How the solver picks guesses: by letter frequency, or by the partition of the remaining candidates a guess makes.',
+                        choices=STRATEGIES,
+                        default=DEFAULT_SOLVER_SETTINGS['strategy'],
+                        required=False)
+    parser.add_argument('--top_k',
+                        type=positive_int,
+                        help='Number of guesses (by letter frequency) the partition strategies score exactly.',
+                        default=DEFAULT_STRATEGY_TOP_K,
+                        required=False)
+    parser.add_argument('--workers',
+                        type=int,
+                        help='Number of processes to solve words across in eval mode, to build subtrees across in gen_tree mode, or to search first guesses across in optimal mode.',
+                        default=1,
+                        required=False)
+    parser.add_argument('--seed',
+                        type=int,
+                        help='Seed for picking random words, so runs can be reproduced.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--host',
+                        type=str,
+                        help='Address to listen on in serve mode.',
+                        default='127.0.0.1',
+                        required=False)
+    parser.add_argument('--port',
+                        type=int,
+                        help='Port to listen on in serve mode.',
+                        default=8080,
+                        required=False)
+    parser.add_argument('--guess_cache_size',
+                        type=int,
+                        help='Max number of game states to remember the chosen guess for, so games sharing clues don\'t pick the same guess again. 0 turns it off.',
+                        default=DEFAULT_GUESS_CACHE_SIZE,
+                        required=False)
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='Time each phase of the solver and print percentiles per turn and per game after an eval.',
+                        default=False,
+                        required=False)
+    parser.add_argument('--legacy_feedback',
+                        action='store_true',
+                        help='Score guesses the way this solver used to, with every copy of a letter that is in the word but in the wrong spot 🟨, to reproduce older results and trees.',
+                        default=False,
+                        required=False)
+    parser.add_argument('--evil',
+                        type=str,
+                        help='Play -m show/-m eval against an adversarial host that picks the feedback keeping the most (or the hardest to split) candidates alive, instead of a hidden word. Each word then only seeds how the host breaks ties.',
+                        choices=EVIL_POLICIES,
                         default=None,
                         required=False)
+    parser.add_argument('--no_opening_book',
+                        action='store_true',
+                        help='Don\'t build or load the cached first and second guesses for these dictionaries and settings.',
+                        default=False,
+                        required=False)
+    parser.add_argument('--max_matrix_mb',
+                        type=int,
+                        help='Don\'t build or load a feedback matrix bigger than this many megabytes (e.g. for large dictionaries or N), compute feedback on the fly instead.',
+                        default=MAX_FEEDBACK_MATRIX_BYTES // (1024 * 1024),
+                        required=False)
+    parser.add_argument('--sweep_space',
+                        type=str,
+                        help='JSON file with the solver settings to sweep over in -m sweep and the values to try for each, see game/sweep.py.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--sweep_samples',
+                        type=int,
+                        help='Eval this many random configurations of --sweep_space instead of all of them.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--sweep_out_file',
+                        type=str,
+                        help='A file to write the -m sweep leaderboard to, rewritten as each configuration finishes. CSV, or JSON lines if it ends in .jsonl.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--start_word',
+                        type=str,
+                        help='Always open with this word instead of the one the strategy picks.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--result_store',
+                        type=str,
+                        help=f'Keep -m eval results per word in this SQLite file (default {DEFAULT_RESULT_STORE}) and only solve the words this solver code, configuration and dictionaries haven\'t solved yet.',
+                        default=None,
+                        nargs='?',
+                        const=DEFAULT_RESULT_STORE,
+                        required=False)
+    parser.add_argument('--diff_from',
+                        type=str,
+                        help='Results file (e.g. results/official_wordle_all.csv) or result store run to diff from in -m diff.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--diff_to',
+                        type=str,
+                        help='Results file or result store run to diff to in -m diff. Defaults to the result store run of the current configuration.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--deadline_ms',
+                        type=int,
+                        help='Time budget for picking each guess. The partition strategies then return the best guess found by the deadline, starting from the letter frequency one.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--objective',
+                        type=str,
+                        help='What -m optimal minimizes: the total (so average) number of guesses within --guesses, or the worst case number of guesses and then the total.',
+                        choices=OBJECTIVES,
+                        default=AVERAGE,
+                        required=False)
+    parser.add_argument('--optimal_out_file',
+                        type=str,
+                        help='Where -m optimal writes the optimal solution tree, for --tree_file: in the binary format, or pickled if it ends in .pickle.',
+                        default='optimal_tree.bin',
+                        required=False)
+    parser.add_argument('--optimal_checkpoint',
+                        type=str,
+                        help='JSON lines file -m optimal records each first guess it searched in, and picks up from when run again. Defaults to one per word lists in cache/.',
+                        default=None,
+                        required=False)
+    parser.add_argument('--no_feedback_matrix',
+                        action='store_true',
+                        help='Don\'t build or load the cached guess x candidate feedback matrix.',
+                        default=False,
+                        required=False)
     args = parser.parse_args()
     N = args.N
+    if args.guesses is None:
+        args.guesses = DEFAULT_MAX_GUESSES + args.boards - 1
+    if args.boards > 1 and args.evil:
+        print(f'Error: --evil only plays a single board')
+        sys.exit()
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.mode == SERVE:
+        defaults = dict(CONFIG_DEFAULTS, N=N, dict_file=args.dict_file, cand_file=args.cand_file, guesses=args.guesses,
+                        hard_mode=args.hard_mode, strategy=args.strategy, top_k=args.top_k, tree_file=args.tree_file,
+                        feedback=FEEDBACK_LEGACY if args.legacy_feedback else FEEDBACK_WORDLE, deadline_ms=args.deadline_ms)
+        try:
+            asyncio.run(serve(args.host, args.port, workers=args.workers, defaults=defaults))
+        except KeyboardInterrupt:
+            pass
+        return
+    if args.mode == SWEEP:
+        if not args.sweep_space:
+            print(f'Error: Must provide the settings to sweep over with --sweep_space.')
+            sys.exit()
+        sweep(args.sweep_space, args.sweep_out_file, N, (args.dict_file, args.cand_file, FEEDBACK_LEGACY if args.legacy_feedback else FEEDBACK_WORDLE),
+              k=args.k, samples=args.sweep_samples, seed=args.seed, workers=args.workers, guess_cache_size=args.guess_cache_size,
+              opening_book=not args.no_opening_book, max_guesses=args.guesses, hard_mode=args.hard_mode, strategy=args.strategy,
+              top_k=args.top_k, feedback_matrix=not args.no_feedback_matrix, max_matrix_bytes=args.max_matrix_mb * 1024 * 1024,
+              evil=args.evil, start_word=args.start_word, deadline_ms=args.deadline_ms)
+        return
     # if args.dict_file != DEFAULT_DICT:
     #     print(f'Using the same candidates as dict_file: [{args.dict_file}]')
     #     args.cand_file = args.dict_file
@@ -234,18 +540,33 @@ def main():
         if args.debug >= 1:
             print(f'Using the same candidate_set as word_set')
         candidate_set = word_set
-    game_config = DEFAULT_GAME_CONFIG
-    game_config['max_guesses'] = str(args.guesses)
-    game_config['candidate_set'] = candidate_set
-    game_config['guess_set'] = word_set
-    solver_settings = DEFAULT_SOLVER_SETTINGS
-    solver_settings['max_guesses'] = str(args.guesses)
-    solver_settings['non_strict'] = not args.hard_mode
-    solver_settings['candidate_set'] = candidate_set
-    solver_settings['guess_set'] = word_set
-    if args.tree_file:
-        import pickle
-        solver_settings['solution_tree'] = pickle.load(open(args.tree_file, 'rb'))
+    try:
+        game_config, solver_settings = make_configs(
+            word_set,
+            candidate_set,
+            max_guesses=args.guesses,
+            hard_mode=args.hard_mode,
+            strategy=args.strategy,
+            top_k=args.top_k,
+            feedback=FEEDBACK_LEGACY if args.legacy_feedback else FEEDBACK_WORDLE,
+            feedback_matrix=not args.no_feedback_matrix,
+            max_matrix_bytes=args.max_matrix_mb * 1024 * 1024,
+            tree_file=args.tree_file,
+            guess_cache_size=args.guess_cache_size,
+            profile=args.profile,
+            opening_book=not args.no_opening_book and args.boards == 1,
+            evil=args.evil,
+            start_word=args.start_word,
+            deadline_ms=args.deadline_ms)
+    except Exception as e:
+        print(f'Error: {str(e)}')
+        sys.exit()
+    if args.debug >= 1 and not args.no_feedback_matrix:
+        feedback_matrix = solver_settings['feedback_matrix']
+        if feedback_matrix is None:
+            print(f'Feedback matrix is too large for these dictionaries, computing feedback on the fly')
+        else:
+            print(f'Loaded {len(word_set)}x{len(candidate_set)} feedback matrix ({feedback_matrix.nbytes()} bytes)')
     if args.mode == PLAY:
         play(game_config=game_config)
     elif args.mode == SAVE:
@@ -267,70 +588,48 @@ def main():
             K = args.k
             if not args.k:
                 K = len(solver_settings['candidate_set'])
-            words = random.sample(solver_settings['candidate_set'], K)
-        eval(words, args.eval_out_file, game_config=game_config, solver_settings=solver_settings)
+            if args.boards > 1:
+                words = [join_boards(random.sample(solver_settings['candidate_set'], args.boards)) for i in range(K)]
+            else:
+                words = random.sample(solver_settings['candidate_set'], K)
+        store, run = None, None
+        if args.result_store:
+            store = ResultStore(args.result_store)
+            run = store.open_run(game_config, solver_settings, tree=file_hash(args.tree_file) if args.tree_file else None)
+        eval(words, args.eval_out_file, game_config=game_config, solver_settings=solver_settings, workers=args.workers, resume=args.resume, store=store, run=run)
+        if store is not None:
+            store.close()
+    elif args.mode == DIFF:
+        store = ResultStore(args.result_store or DEFAULT_RESULT_STORE)
+        if not args.diff_from:
+            print(f'Error: Must provide a results file or run to diff from with --diff_from. Runs in [{store.path}]:')
+            for name, settings, created, count in store.runs():
+                print(f'{name}\t{count} words\t{settings}')
+            sys.exit()
+        diff_to = args.diff_to
+        if not diff_to:
+            diff_to = run_name(store.open_run(game_config, solver_settings, tree=file_hash(args.tree_file) if args.tree_file else None))
+        diff(args.diff_from, diff_to, store=store, out_file=args.eval_out_file)
+        store.close()
+    elif args.mode == OPTIMAL:
+        if args.hard_mode:
+            print(f'Error: -m optimal doesn\'t support hard mode')
+            sys.exit()
+        optimal(solver_settings, args.objective, args.optimal_out_file, workers=args.workers, checkpoint=args.optimal_checkpoint, debug=args.debug)
     elif args.mode == GEN_TREE:
-        import itertools
         import pickle
 
-        debug = args.debug
-        choose = ['0' for i in range(N)] + ['1' for i in range(N)] + ['2' for i in range(N)]
-        poss =  sorted(list(set([''.join(x) for x in itertools.permutations(choose, r=N)])))
-        initclues = [[]]
-        solves = []
-        count, solved, unsolved = 0, 0, 0
-        while initclues: 
-            clues = initclues.pop(0)
-            count += 1
-            if count % 10 == 0: 
-                print(f'Count {count} Solved {solved} Unsolved: {unsolved} Clue Num {len(clues)}')
-            if len(clues) > int(game_config['max_guesses']):
-                print(f'Unsolved! {len(clues)}')
-                unsolved += 1
-                continue
-            try:
-                chosen, cands, lencands = guess_next_word(clues, solver_settings=solver_settings, debug=debug)
-            except Exception as e:
-                # There are no candidates left to guess from
-                continue
-            if lencands == 1 and cands[0] in candidate_set:
-                newclue = [c for c in clues]
-                newclue.append((cands[0], [2] * N))
-                print(f'Solved! = {newclue[-1][0]}')
-                solves.append(newclue)
-                solved += 1
-                continue
-            if not chosen and len(clues) and clues[-1][0] in candidate_set:
-                solves.append(clues)
-                solved += 1
-                print(f'Solved! = {clues[-1][0]}')
-                continue
-
-
-            for p in poss:
-                newclue = [c for c in clues]
-                newclue.append((chosen, [ord(f) - ord('0') for f in p]))
-                initclues.append(newclue)
-
+        start = time()
+        solves, stats = build_solves(solver_settings=solver_settings, workers=args.workers, debug=args.debug)
+        print(f'Count {stats.get("count", 0)} Solved {stats.get("solved", 0)} Unsolved: {stats.get("unsolved", 0)} in {time() - start:.02f}s')
         pickle.dump(solves, file=open('tree/solves.pickle', 'wb'))
         with open('solves.txt', 'w') as f:
             for s in solves:
                 f.write(f'{s}\n')
 
-        solution_tree = {}
-        solved_clue = ''.join(['2'] * N)
-        for solution in solves:
-            currdict = solution_tree
-            for word, clue in solution:
-                if not word in currdict:
-                    currdict[word] = {}
-                strclue = ''.join(map(str, clue))
-                if strclue == solved_clue:
-                    continue
-                if not strclue in currdict[word]:
-                    currdict[word][strclue] = {}
-                currdict = currdict[word][strclue]
-        pickle.dump(solution_tree, file=open('solution_tree.pickle', 'wb'))
+        solution_tree = solves_to_tree(solves, N)
+        dump_tree(solution_tree, 'solution_tree.pickle', mode=solver_settings['feedback'])
+        write_tree(solution_tree, 'solution_tree.bin', mode=solver_settings['feedback'])
 
 if __name__ == '__main__':
     main()
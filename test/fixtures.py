@@ -0,0 +1,39 @@
+from typing import Dict, List, Optional, Tuple
+from game.config import make_configs
+from game.constants import DEFAULT_SOLVER_SETTINGS
+
+# Word lists and settings shared by the tests. The lists are small enough to solve every word in a test, and the
+# -inks family needs a few guesses however it is played.
+
+WORDS = ['binks', 'cinks', 'dinks', 'einks', 'finks', 'ginks', 'hinks', 'abcde', 'steal', 'tesla', 'teals', 'unlit', 'swims', 'swabs', 'brain']
+# The -inks family and abcde, which splits it
+INKS = WORDS[:8]
+# Candidates, and their guesses with chdfg, which is not a candidate
+TREE_WORDS = ['binks', 'cinks', 'dinks', 'finks', 'ginks', 'hinks', 'tesla', 'steal', 'teals', 'unlit', 'swims', 'swabs', 'brain']
+TREE_GUESSES = TREE_WORDS + ['chdfg']
+# Anagrams and words with repeated letters, for filtering and scoring
+REPEATS = ['gorge', 'tesla', 'steal', 'teals', 'unlit', 'swims', 'swabs', 'brain', 'geese']
+# chdfg splits the candidates into single words, abcde doesn't split them at all
+CANDS = ['binks', 'cinks', 'dinks', 'finks', 'ginks', 'hinks']
+GUESSES = CANDS + ['chdfg', 'abcde']
+
+# The default solver settings for candidates and guesses (the candidates if not given), and kwargs on top
+def solver_settings(candidates: List[str]=WORDS, guesses: Optional[List[str]]=None, **kwargs) -> Dict:
+	settings = dict(DEFAULT_SOLVER_SETTINGS)
+	settings['candidate_set'] = candidates
+	settings['guess_set'] = guesses if guesses is not None else candidates
+	settings.update(kwargs)
+	return settings
+
+# A game config for candidates, with kwargs on top
+def game_config(candidates: List[str]=WORDS, max_guesses: int=6, **kwargs) -> Dict:
+	config = {'candidate_set': candidates, 'max_guesses': str(max_guesses)}
+	config.update(kwargs)
+	return config
+
+# make_configs for candidates and guesses (the candidates if not given), without the feedback matrix, guess cache or
+# opening book unless kwargs ask for them, so nothing is written to the cache
+def configs(candidates: List[str]=WORDS, guesses: Optional[List[str]]=None, **kwargs) -> Tuple[Dict, Dict]:
+	settings = {'feedback_matrix': False, 'guess_cache_size': 0, 'opening_book': False}
+	settings.update(kwargs)
+	return make_configs(guesses if guesses is not None else candidates, candidates, **settings)
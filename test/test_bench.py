@@ -0,0 +1,18 @@
+import unittest
+from bench.run import compare_results
+
+def results(seconds):
+	return {'results': {'official': {bench: {'seconds': s, 'ops': 1} for bench, s in seconds.items()}}}
+
+class TestBench(unittest.TestCase):
+
+	def test_compare_results(self):
+		baseline = results({'solve_wordle': 1.0, 'gen_tree': 1.0, 'filter_index': 1.0})
+		current = results({'solve_wordle': 1.3, 'gen_tree': 1.3, 'eval': 5.0})
+		rows = compare_results(baseline, current, threshold=0.25, thresholds={'gen_tree': 0.5})
+		# Benchmarks missing from either run are skipped
+		self.assertEqual(rows, [('official', 'solve_wordle', 1.0, 1.3, True), ('official', 'gen_tree', 1.0, 1.3, False)])
+
+
+if __name__ == '__main__':
+	unittest.main()
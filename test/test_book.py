@@ -0,0 +1,54 @@
+import os
+import pickle
+import tempfile
+import unittest
+from game.solver.book import OpeningBook
+from game.solver.session import SolverSession
+from game.solver.solver import guess_next_word
+from test.fixtures import WORDS, solver_settings
+
+class TestBook(unittest.TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self.dir.cleanup()
+
+	def test_matches_solver(self):
+		book = OpeningBook(cache_dir=self.dir.name)
+		booked, plain = solver_settings(opening_book=book), solver_settings()
+		first = guess_next_word([], solver_settings=plain)
+		self.assertEqual(guess_next_word([], solver_settings=booked), first)
+		self.assertTrue(os.path.exists(book.cache_path(booked)))
+		clues = [(first[0], [0, 2, 2, 2, 2]), ('abcde', [0, 0, 0, 0, 0])]
+		for i in range(len(clues) + 1):
+			self.assertEqual(guess_next_word(clues[:i], solver_settings=booked), guess_next_word(clues[:i], solver_settings=plain))
+			session = SolverSession(solver_settings=booked)
+			for word, clue in clues[:i]:
+				session.add_clue(word, clue)
+			self.assertEqual(session.next_guess(), guess_next_word(clues[:i], solver_settings=plain))
+		# Past the book, or off it
+		self.assertIsNone(book.get(clues, booked))
+		self.assertIsNone(book.get([('abcde', [0, 0, 0, 0, 0])], booked))
+
+	def test_persisted(self):
+		book = OpeningBook(cache_dir=self.dir.name)
+		entries = book.prepare(solver_settings(opening_book=book))
+		# A new book (e.g. in a worker process) loads the same entries from disk
+		loaded = pickle.loads(pickle.dumps(book))
+		self.assertEqual(loaded._books, {})
+		self.assertEqual(loaded._load(book.cache_path(solver_settings())), entries)
+		self.assertEqual(loaded.prepare(solver_settings(opening_book=loaded)), entries)
+
+	def test_keyed_by_config(self):
+		key = OpeningBook.cache_key(solver_settings())
+		self.assertNotEqual(key, OpeningBook.cache_key(solver_settings(non_strict=False)))
+		self.assertNotEqual(key, OpeningBook.cache_key(solver_settings(candidate_set=WORDS[:-1])))
+		self.assertNotEqual(key, OpeningBook.cache_key(solver_settings(guess_set=list(reversed(WORDS)))))
+		# Components that don't change the guesses don't change the key
+		self.assertEqual(key, OpeningBook.cache_key(solver_settings(opening_book=OpeningBook(), guess_cache=None)))
+
+
+if __name__ == '__main__':
+	unittest.main()
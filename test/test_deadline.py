@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+from game.solver.book import OpeningBook
+from game.solver.deadline import Deadline
+from game.solver.memo import GuessCache
+from game.solver.session import SolverSession
+from game.solver.solver import guess_next_word, is_finished
+from game.solver.strategy import ENTROPY, best_by_partition
+from test.fixtures import CANDS, GUESSES, configs
+
+class TestDeadline(unittest.TestCase):
+
+	def settings(self, deadline_ms=None, strategy=ENTROPY):
+		_, settings = configs(strategy=strategy, deadline_ms=deadline_ms)
+		return settings
+
+	def test_deadline(self):
+		deadline = Deadline(0)
+		self.assertFalse(deadline.expired())
+		deadline.start()
+		self.assertTrue(deadline.expired())
+		self.assertTrue(deadline.finished)
+		deadline.cut()
+		self.assertFalse(deadline.finished)
+		deadline = Deadline(60)
+		deadline.start()
+		self.assertFalse(deadline.expired())
+		self.assertGreater(deadline.remaining(), 0)
+
+	def test_best_by_partition(self):
+		# The best by key is scored first, and is all there is time for
+		deadline = Deadline(0)
+		deadline.start()
+		keys = [0] * 6 + [1, 1]
+		self.assertEqual(best_by_partition(GUESSES, keys, CANDS, ENTROPY, top_k=len(GUESSES), deadline=deadline), ['binks'])
+		self.assertFalse(deadline.finished)
+		deadline = Deadline(60)
+		deadline.start()
+		self.assertEqual(best_by_partition(GUESSES, keys, CANDS, ENTROPY, top_k=len(GUESSES), deadline=deadline), ['chdfg'])
+		self.assertTrue(deadline.finished)
+
+	def test_guess(self):
+		full = guess_next_word([], solver_settings=self.settings(), debug=0)
+		self.assertEqual(guess_next_word([], solver_settings=self.settings(deadline_ms=60000), debug=0), full)
+		settings = self.settings(deadline_ms=0)
+		rushed = guess_next_word([], solver_settings=settings, debug=0)
+		self.assertFalse(is_finished(settings))
+		# Out of time, the guess is the letter frequency one
+		self.assertEqual(rushed, guess_next_word([], solver_settings=self.settings(strategy='frequency'), debug=0))
+		session = SolverSession(solver_settings=settings)
+		self.assertEqual(session.next_guess(), rushed)
+		self.assertFalse(is_finished(settings))
+
+	def test_not_cached(self):
+		settings = self.settings(deadline_ms=0)
+		settings['guess_cache'] = GuessCache()
+		guess_next_word([], solver_settings=settings, debug=0)
+		self.assertEqual(len(settings['guess_cache']), 0)
+		settings['deadline'] = Deadline(60)
+		guess_next_word([], solver_settings=settings, debug=0)
+		self.assertEqual(len(settings['guess_cache']), 1)
+
+	def test_book_prepared(self):
+		# The book is ready before the first turn starts its clock
+		with mock.patch.object(OpeningBook, 'prepare') as prepare:
+			_, settings = configs(opening_book=True, deadline_ms=50)
+			prepare.assert_called_once_with(settings)
+			configs(opening_book=True)
+			prepare.assert_called_once()
@@ -0,0 +1,45 @@
+import unittest
+from collections import Counter
+from game.evil import EvilWordle, HARDEST, make_game
+from game.feedback import encode_clue, feedback_code
+from game.solver.solver import solve_wordle
+from game.wordle import Wordle
+from test.fixtures import WORDS, game_config, solver_settings
+
+class TestEvil(unittest.TestCase):
+
+	def test_keeps_most_alive(self):
+		w = EvilWordle(config=game_config(), verbose=False)
+		clue, state = w.guess('binks')
+		buckets = Counter(feedback_code('binks', c) for c in WORDS)
+		self.assertEqual(len(w.alive), max(buckets.values()))
+		self.assertEqual(Wordle.emojify(clue), '⬛🟩🟩🟩🟩')
+		self.assertEqual(state, Wordle.PLAYING)
+		self.assertNotIn('binks', w.alive)
+
+	def test_consistent(self):
+		for policy in ['most', HARDEST]:
+			for seed in [None, 'a', 'b']:
+				w = EvilWordle(config=game_config(), policy=policy, seed=seed, verbose=False)
+				solved, attempts, _ = solve_wordle(w, solver_settings=solver_settings(), debug=0)
+				# Every clue the host gave holds for the answer it ended on
+				self.assertEqual([encode_clue(c) for c in w.clues], [feedback_code(g, w.answer()) for g in w.guesses])
+				self.assertEqual(solved, w.guesses[-1] == w.answer())
+
+	def test_seeded(self):
+		games = [EvilWordle(config=game_config(), seed='abc', verbose=False) for i in range(2)]
+		for w in games:
+			w.guess('abcde')
+			w.guess('swims')
+		self.assertEqual(games[0].alive, games[1].alive)
+
+	def test_make_game(self):
+		self.assertIsInstance(make_game('tesla', config=game_config(), verbose=False), Wordle)
+		self.assertNotIsInstance(make_game('tesla', config=game_config(), verbose=False), EvilWordle)
+		self.assertIsInstance(make_game('tesla', config=game_config(evil=HARDEST), verbose=False), EvilWordle)
+		with self.assertRaises(Exception):
+			EvilWordle(config=game_config(), policy='nice')
+
+
+if __name__ == '__main__':
+	unittest.main()
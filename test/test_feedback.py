@@ -0,0 +1,94 @@
+import os
+import pickle
+import tempfile
+import unittest
+from game.feedback import AnswerLanes, Clue, FeedbackMatrix, as_clue, decode_clue, encode_clue, feedback_code, feedback_rows, load_feedback_matrix
+from game.wordle import Wordle
+
+WORDS = ['gorge', 'tesla', 'steal', 'teals', 'unlit', 'swims', 'swabs', 'brain']
+REPEATED = ['speed', 'abide', 'eerie', 'geese', 'sassy', 'esses', 'llama', 'mamma', 'erase', 'rarer']
+
+class TestFeedback(unittest.TestCase):
+
+	def test_encode_decode(self):
+		self.assertEqual(encode_clue([0, 1, 2, 0, 2]), int('01202', 3))
+		self.assertEqual(decode_clue(int('01202', 3), 5), [0, 1, 2, 0, 2])
+		self.assertEqual(decode_clue(0, 5), [0, 0, 0, 0, 0])
+
+	def test_clue(self):
+		clue = Clue.parse('01202')
+		self.assertEqual(clue, int('01202', 3))
+		self.assertEqual(clue, [0, 1, 2, 0, 2])
+		self.assertEqual(list(clue), [0, 1, 2, 0, 2])
+		self.assertEqual((len(clue), clue[2], str(clue), clue.emoji()), (5, 2, '01202', '⬛🟨🟩⬛🟩'))
+		self.assertEqual(Clue.parse('⬛🟨🟩⬛🟩'), clue)
+		self.assertEqual(Clue.from_tiles([0, 1, 2, 0, 2]), clue)
+		self.assertEqual({int('01202', 3): 'found'}[clue], 'found')
+		self.assertEqual(pickle.loads(pickle.dumps(clue)).n, 5)
+		self.assertTrue(Clue.parse('22222').is_solved())
+		self.assertFalse(clue.is_solved())
+		self.assertEqual(encode_clue(clue), int('01202', 3))
+		self.assertEqual(as_clue([0, 0, 0]), Clue(0, 3))
+		with self.assertRaises(Exception):
+			Clue.parse('0123')
+
+	def test_feedback_code_matches_wordle(self):
+		for answer in WORDS:
+			for guess in WORDS:
+				w = Wordle(answer, config={'candidate_set': WORDS, 'max_guesses': '6'}, verbose=False)
+				clue, _ = w.guess(guess)
+				self.assertEqual(feedback_code(guess, answer), encode_clue(clue), f'{guess} vs {answer}')
+
+	def test_repeated_letters(self):
+		# Only as many 🟨 as the answer has copies left over from the 🟩
+		self.assertEqual(decode_clue(feedback_code('speed', 'abide'), 5), [0, 0, 1, 0, 1])
+		self.assertEqual(decode_clue(feedback_code('eerie', 'geese'), 5), [1, 2, 0, 0, 2])
+		self.assertEqual(decode_clue(feedback_code('esses', 'sassy'), 5), [0, 1, 2, 0, 1])
+		self.assertEqual(decode_clue(feedback_code('speed', 'abide', mode='legacy'), 5), [0, 0, 1, 1, 1])
+
+	def test_lanes_match_feedback_code(self):
+		words = WORDS + REPEATED
+		for mode in ['wordle', 'legacy']:
+			lanes = AnswerLanes(words, mode=mode)
+			for guess in words:
+				self.assertEqual(lanes.row_codes(guess), [feedback_code(guess, a, mode=mode) for a in words], f'{guess} {mode}')
+		self.assertEqual(feedback_rows(['speed'], ['abide', 'geese']), [[feedback_code('speed', 'abide'), feedback_code('speed', 'geese')]])
+
+	def test_matrix(self):
+		matrix = FeedbackMatrix.build(WORDS, WORDS[:4])
+		for guess in WORDS:
+			for answer in WORDS[:4]:
+				self.assertEqual(matrix.code(guess, answer), feedback_code(guess, answer))
+		self.assertEqual(list(matrix.row('tesla')), [feedback_code('tesla', a) for a in sorted(WORDS[:4])])
+		self.assertFalse(matrix.covers('tesla', 'unlit'))
+
+	def test_matrix_cache(self):
+		with tempfile.TemporaryDirectory() as cache_dir:
+			matrix = load_feedback_matrix(WORDS, WORDS, cache_dir=cache_dir)
+			self.assertTrue(os.path.exists(FeedbackMatrix.cache_path(WORDS, WORDS, cache_dir=cache_dir)))
+			cached = load_feedback_matrix(WORDS, WORDS, cache_dir=cache_dir)
+			self.assertEqual(bytes(cached.row('gorge')), bytes(matrix.row('gorge')))
+			self.assertIsNone(load_feedback_matrix(WORDS, WORDS, cache_dir=cache_dir, max_bytes=10))
+			# Each feedback mode has its own matrix
+			legacy = load_feedback_matrix(REPEATED, REPEATED, cache_dir=cache_dir, mode='legacy')
+			self.assertEqual(legacy.code('speed', 'abide'), feedback_code('speed', 'abide', mode='legacy'))
+			self.assertEqual(load_feedback_matrix(REPEATED, REPEATED, cache_dir=cache_dir).code('speed', 'abide'), feedback_code('speed', 'abide'))
+
+	def test_matrix_write(self):
+		with tempfile.TemporaryDirectory() as cache_dir:
+			built, streamed = os.path.join(cache_dir, 'built.bin'), os.path.join(cache_dir, 'streamed.bin')
+			for mode in ['wordle', 'legacy']:
+				FeedbackMatrix.build(REPEATED, WORDS + REPEATED, mode=mode).save(built)
+				FeedbackMatrix.write(streamed, REPEATED, WORDS + REPEATED, mode=mode)
+				with open(built, 'rb') as a, open(streamed, 'rb') as b:
+					self.assertEqual(a.read(), b.read())
+
+	def test_wordle_uses_matrix(self):
+		matrix = FeedbackMatrix.build(WORDS, WORDS)
+		w = Wordle('tesla', config={'candidate_set': WORDS, 'max_guesses': '6', 'feedback_matrix': matrix}, verbose=False)
+		clue, _ = w.guess('teals')
+		self.assertEqual(Wordle.emojify(clue), '🟩🟩🟨🟩🟨')
+
+
+if __name__ == '__main__':
+	unittest.main()
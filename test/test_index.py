@@ -0,0 +1,34 @@
+import unittest
+from game.solver.index import WordIndex, bitset_ids, ids_bitset
+from game.solver.util import is_guessable_word, parse_clues
+from test.fixtures import REPEATS
+
+class TestIndex(unittest.TestCase):
+
+	def test_bitset_ids(self):
+		self.assertEqual(bitset_ids(0), [])
+		self.assertEqual(bitset_ids(ids_bitset([0, 3, 70])), [0, 3, 70])
+
+	def test_count_thresholds(self):
+		index = WordIndex(REPEATS)
+		self.assertEqual(index.words_of(index.with_at_least('e', 2)), ['geese'])
+		self.assertEqual(index.words_of(index.with_at_least('g', 2)), ['gorge'])
+		self.assertEqual(index.words_of(index.with_at_least('s', 1)), ['tesla', 'steal', 'teals', 'swims', 'swabs', 'geese'])
+		self.assertEqual(index.with_at_least('z', 1), 0)
+
+	def test_filter_matches_is_guessable_word(self):
+		index = WordIndex(REPEATS)
+		for clues in [
+			[],
+			[('steal', [1, 1, 1, 1, 1])],
+			[('steal', [1, 1, 1, 1, 1]), ('swabs', [1, 0, 1, 0, 1])],
+			[('unlit', [0, 0, 0, 0, 0])],
+			[('gorge', [2, 0, 0, 0, 2])],
+		]:
+			word_right_place, in_word_wrong_place, not_in_word = parse_clues(clues)
+			expected = [w for w in REPEATS if is_guessable_word(w, word_right_place, in_word_wrong_place, not_in_word)]
+			self.assertEqual(index.words_of(index.filter(word_right_place, in_word_wrong_place, not_in_word)), expected, clues)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from game.solver.memo import GuessCache
+from game.solver.session import SolverSession
+from game.solver.solver import guess_next_word
+from test.fixtures import INKS, solver_settings
+
+class TestMemo(unittest.TestCase):
+
+	def settings(self, guess_cache=None):
+		return solver_settings(INKS, [], guess_cache=guess_cache)
+
+	def test_matches_uncached(self):
+		cache = GuessCache()
+		cached, uncached = self.settings(cache), self.settings()
+		clues = [('binks', [0, 2, 2, 2, 2]), ('abcde', [0, 0, 0, 0, 0])]
+		for i in range(len(clues) + 1):
+			self.assertEqual(guess_next_word(clues[:i], solver_settings=cached), guess_next_word(clues[:i], solver_settings=uncached))
+		self.assertEqual(cache.stats(), {'size': 3, 'hits': 0, 'misses': 3, 'evictions': 0})
+		# Sessions share the states, in any clue order
+		session = SolverSession(solver_settings=cached)
+		for word, clue in reversed(clues):
+			session.add_clue(word, clue)
+		self.assertEqual(session.next_guess(), guess_next_word(clues, solver_settings=uncached))
+		self.assertEqual(cache.hits, 1)
+
+	def test_settings_keyed(self):
+		cache = GuessCache()
+		settings = self.settings(cache)
+		guess_next_word([], solver_settings=settings)
+		settings['non_strict'] = False
+		guess_next_word([], solver_settings=settings)
+		self.assertEqual(cache.misses, 2)
+
+	def test_lru(self):
+		cache = GuessCache(max_size=2)
+		for i in range(3):
+			cache.put(i, ('binks', ['binks'], 1))
+		self.assertIsNone(cache.get(0))
+		self.assertEqual(cache.get(2), ('binks', ['binks'], 1))
+		self.assertEqual(cache.stats(), {'size': 2, 'hits': 1, 'misses': 1, 'evictions': 1})
+
+
+if __name__ == '__main__':
+	unittest.main()
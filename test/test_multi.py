@@ -0,0 +1,70 @@
+import unittest
+from game.feedback import feedback_code
+from game.multi import MultiWordle, join_boards, split_boards
+from game.solver.multi import MultiSolver, solve_multi
+from game.solver.solver import solve_wordle
+from game.wordle import Wordle
+from test.fixtures import WORDS, game_config, solver_settings
+
+class TestMulti(unittest.TestCase):
+
+	# Enough guesses for two boards
+	def config(self, max_guesses=9):
+		return game_config(max_guesses=max_guesses)
+
+	def settings(self, max_guesses=9, **kwargs):
+		return solver_settings(max_guesses=str(max_guesses), **kwargs)
+
+	def test_labels(self):
+		self.assertEqual(split_boards(join_boards(['tesla', 'brain'])), ['tesla', 'brain'])
+
+	def test_host(self):
+		w = MultiWordle(['tesla', 'brain'], config=self.config(max_guesses=3), verbose=False)
+		clues, state = w.guess('tesla')
+		self.assertEqual(clues[0], feedback_code('tesla', 'tesla'))
+		self.assertEqual(clues[1], feedback_code('tesla', 'brain'))
+		self.assertEqual(state, Wordle.PLAYING)
+		# Solved boards don't score guesses any more
+		clues, state = w.guess('swims')
+		self.assertIsNone(clues[0])
+		self.assertEqual(clues[1], feedback_code('swims', 'brain'))
+		clues, state = w.guess('binks')
+		self.assertEqual(state, Wordle.UNSOLVED)
+		w = MultiWordle(['tesla', 'brain'], config=self.config(), verbose=False)
+		w.guess('brain')
+		_, state = w.guess('tesla')
+		self.assertEqual(state, Wordle.SOLVED)
+		self.assertEqual(w.solved(), [True, True])
+
+	def test_solve(self):
+		for strategy in ['frequency', 'entropy']:
+			for non_strict in [True, False]:
+				for words in [['tesla', 'brain', 'hinks', 'swims'], ['binks', 'cinks', 'dinks', 'finks'], ['unlit']]:
+					w = MultiWordle(words, config=self.config(), verbose=False)
+					solved, attempts, _ = solve_multi(w, solver_settings=self.settings(strategy=strategy, non_strict=non_strict), debug=0)
+					self.assertTrue(solved)
+					self.assertEqual(attempts, len(w.guesses))
+					self.assertTrue(set(words) <= set(w.guesses))
+
+	def test_single_board(self):
+		# One board plays the way a single Wordle would be solved
+		for word in WORDS:
+			w = MultiWordle([word], config=self.config(max_guesses=6), verbose=False)
+			solved, attempts, _ = solve_multi(w, solver_settings=self.settings(max_guesses=6), debug=0)
+			single = Wordle(word, config=self.config(max_guesses=6), verbose=False)
+			self.assertEqual((solved, attempts), solve_wordle(single, solver_settings=self.settings(max_guesses=6), debug=0)[:2])
+
+	def test_drops_solved(self):
+		solver = MultiSolver(2, solver_settings=self.settings())
+		solver.add_clues('tesla', [feedback_code('tesla', 'tesla'), feedback_code('tesla', 'brain')])
+		self.assertEqual(solver.active, [1])
+		chosen, cands = solver.next_guess()
+		self.assertEqual(len(cands), 1)
+		self.assertNotIn('tesla', cands[0])
+
+	def test_last_guesses(self):
+		# With as many guesses left as boards, every guess is a candidate
+		solver = MultiSolver(2, solver_settings=self.settings(max_guesses=3))
+		solver.add_clues('abcde', [feedback_code('abcde', 'binks'), feedback_code('abcde', 'swims')])
+		chosen, cands = solver.next_guess()
+		self.assertIn(chosen, cands[0] + cands[1])
@@ -0,0 +1,119 @@
+import itertools
+import os
+import tempfile
+import unittest
+from game.feedback import feedback_code, solved_code
+from game.solver.optimal import AVERAGE, WORST_CASE, OptimalSearch, optimal_tree, read_checkpoint
+from game.solver.solver import solve_wordle
+from game.wordle import Wordle
+from test.fixtures import TREE_GUESSES, TREE_WORDS, configs
+
+# The least total guesses to solve cands with depth guesses left, trying every guess at every turn
+def brute_force(cands, guesses, depth):
+	if len(cands) == 1:
+		return 1 if depth >= 1 else None
+	if depth <= 1:
+		return None
+	best = None
+	for guess in guesses:
+		classes = {}
+		for c in cands:
+			classes.setdefault(feedback_code(guess, c), []).append(c)
+		if len(classes) == 1 and not guess in cands:
+			continue
+		total = len(cands)
+		for code, c in classes.items():
+			cost = brute_force(c, guesses, depth - 1) if code != solved_code(5) else 0
+			if cost is None:
+				total = None
+				break
+			total += cost
+		if total is not None and (best is None or total < best):
+			best = total
+	return best
+
+class TestOptimal(unittest.TestCase):
+
+	def test_matches_brute_force(self):
+		for depth in [2, 3, 6]:
+			expected = brute_force(TREE_WORDS, TREE_GUESSES, depth)
+			search = OptimalSearch(TREE_GUESSES, TREE_WORDS)
+			if expected is None:
+				with self.assertRaises(Exception):
+					optimal_tree(search, depth)
+				continue
+			solution_tree, total, worst = optimal_tree(search, depth)
+			self.assertEqual(total, expected)
+			attempts = search.attempts(solution_tree)
+			self.assertEqual(sum(attempts), total)
+			self.assertEqual(max(attempts), worst)
+			self.assertLessEqual(worst, depth)
+
+	def test_worst_case(self):
+		_, total, worst = optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, objective=AVERAGE)
+		_, worst_case_total, worst_case = optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, objective=WORST_CASE)
+		self.assertLessEqual(worst_case, worst)
+		self.assertGreaterEqual(worst_case_total, total)
+		self.assertIsNone(brute_force(TREE_WORDS, TREE_GUESSES, worst_case - 1))
+
+	def test_tree_plays(self):
+		solution_tree, total, _ = optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6)
+		game_config, solver_settings = configs(TREE_WORDS, TREE_GUESSES, feedback_matrix=True)
+		solver_settings['solution_tree'] = solution_tree
+		attempts = 0
+		for word in TREE_WORDS:
+			w = Wordle(word, config=game_config, verbose=False)
+			got_ans, _, _ = solve_wordle(w, solver_settings=solver_settings, debug=0)
+			self.assertTrue(got_ans)
+			attempts += len(w.guesses)
+		self.assertEqual(attempts, total)
+
+	def test_start_word(self):
+		solution_tree, total, _ = optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, start_word='chdfg')
+		self.assertEqual(list(solution_tree), ['chdfg'])
+		self.assertGreaterEqual(total, optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6)[1])
+
+	def test_parallel_matches_serial(self):
+		self.assertEqual(optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6), optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, workers=2))
+
+	def test_checkpoint_resumes(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			checkpoint = os.path.join(tmpdir, 'optimal.jsonl')
+			result = optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, checkpoint=checkpoint)
+			searched = read_checkpoint(checkpoint)[6]
+			self.assertIn(list(result[0])[0], searched)
+			# A search cut short leaves some first guesses to do
+			with open(checkpoint, 'r') as f:
+				lines = f.readlines()
+			with open(checkpoint, 'w') as f:
+				f.writelines(lines[:len(lines) // 2] + ['{"depth": 6, "guess": "bi'])
+			self.assertEqual(optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, checkpoint=checkpoint), result)
+			search = OptimalSearch(TREE_GUESSES, TREE_WORDS)
+			self.assertEqual(optimal_tree(search, 6, checkpoint=checkpoint), result)
+			self.assertEqual(search.nodes, 0)
+
+	def test_checkpoint_start_word(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			checkpoint = os.path.join(tmpdir, 'optimal.jsonl')
+			optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, checkpoint=checkpoint)
+			# binks was pruned against a better first guess, which a search that starts with binks doesn't have
+			self.assertFalse(read_checkpoint(checkpoint)[6]['binks'][1])
+			result = optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, start_word='binks')
+			self.assertEqual(optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, start_word='binks', checkpoint=checkpoint), result)
+			self.assertTrue(read_checkpoint(checkpoint)[6]['binks'][1])
+			# The full search still finds the same best tree
+			self.assertEqual(optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6, checkpoint=checkpoint), optimal_tree(OptimalSearch(TREE_GUESSES, TREE_WORDS), 6))
+
+	def test_perfect_split(self):
+		search = OptimalSearch(TREE_GUESSES, TREE_WORDS)
+		for ids in itertools.chain.from_iterable(itertools.combinations(search.root(), n) for n in [2, 3, 4, 6]):
+			perfect = [g for g in range(len(search.guesses)) if len(set(search.feedback(g, ids))) == len(ids)]
+			self.assertEqual(search.perfect_split(ids), perfect[0] if perfect else None)
+
+	def test_candidates_must_be_guesses(self):
+		with self.assertRaises(Exception):
+			OptimalSearch(['chdfg'], TREE_WORDS)
+
+
+if __name__ == '__main__':
+	unittest.main()
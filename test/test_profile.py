@@ -0,0 +1,60 @@
+import unittest
+from game.constants import DEFAULT_GAME_CONFIG
+from game.solver.memo import GuessCache
+from game.solver.profile import FILTER, LOOKUP, PARSE_CLUES, SCORING, Profiler, percentile
+from game.solver.solver import guess_next_word, solve_wordle
+from game.wordle import Wordle
+from test.fixtures import INKS, solver_settings
+
+class TestProfile(unittest.TestCase):
+
+	def settings(self):
+		return solver_settings(INKS, [], profiler=Profiler())
+
+	def test_turn(self):
+		settings = self.settings()
+		guess_next_word([('binks', [0, 2, 2, 2, 2])], solver_settings=settings, debug=0)
+		profiler = settings['profiler']
+		self.assertEqual(len(profiler.turns), 1)
+		turn = profiler.turns[0]
+		self.assertEqual(turn[PARSE_CLUES][1:], [1, 1])
+		self.assertEqual(turn[FILTER][1:], [1, len(INKS)])
+		self.assertIn(SCORING, turn)
+
+	def test_lookup(self):
+		settings = self.settings()
+		settings['guess_cache'] = GuessCache(10)
+		for _ in range(2):
+			guess_next_word([('binks', [0, 2, 2, 2, 2])], solver_settings=settings, debug=0)
+		first, cached = settings['profiler'].turns
+		self.assertEqual(first[LOOKUP][1:], [1, 1])
+		self.assertIn(PARSE_CLUES, first)
+		# A cached guess is all lookup, none of it is charged to parsing the clues
+		self.assertEqual(list(cached), [LOOKUP])
+
+	def test_game(self):
+		settings = self.settings()
+		config = dict(DEFAULT_GAME_CONFIG)
+		config['candidate_set'] = INKS
+		config['guess_set'] = INKS
+		w = Wordle('finks', config=config, verbose=False)
+		solve_wordle(w, solver_settings=settings, debug=0)
+		profiler = settings['profiler']
+		self.assertEqual(len(profiler.games), 1)
+		self.assertEqual(len(profiler.turns), len(w.guesses))
+		# Every clue is parsed once, including the solving one
+		self.assertEqual(profiler.games[0][PARSE_CLUES][1], len(w.guesses))
+		summary = profiler.summary()
+		self.assertEqual(summary['game'][PARSE_CLUES]['count'], 1)
+		self.assertEqual(summary['turn'][FILTER]['calls'], profiler.games[0][FILTER][1])
+
+	def test_percentile(self):
+		values = list(range(1, 101))
+		self.assertEqual(percentile(values, 50), 50)
+		self.assertEqual(percentile(values, 99), 99)
+		self.assertEqual(percentile([3.0], 90), 3.0)
+		self.assertEqual(percentile([], 50), 0.0)
+
+
+if __name__ == '__main__':
+	unittest.main()
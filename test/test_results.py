@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from game.constants import DEFAULT_GUESS_CACHE_SIZE
+from game.feedback import Clue
+from game.results import EvalStats, ResultWriter, eval_results, read_results
+from test.fixtures import TREE_GUESSES, TREE_WORDS, configs
+ROWS = [('abide', True, ['soare', 'abide']), ('zesty', False, ['soare', 'unlit', 'zesty', 'testy', 'jesty', 'pesty']), ('hello', True, ['hello'])]
+
+class TestResults(unittest.TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self.dir.cleanup()
+
+	def roundtrip(self, name):
+		path = os.path.join(self.dir.name, name)
+		with ResultWriter(path) as writer:
+			for row in ROWS[:2]:
+				writer.write(*row)
+		# Appending adds rows, without a second header
+		with ResultWriter(path, append=True) as writer:
+			writer.write(*ROWS[2])
+		self.assertEqual(list(read_results(path)), ROWS)
+		return path
+
+	def test_csv(self):
+		path = self.roundtrip('out.csv')
+		with open(path) as f:
+			self.assertEqual(f.readline(), 'word,solved,guesses,attempts,clues\n')
+			self.assertEqual(f.readline(), 'abide,1,soare-abide,2,\n')
+
+	def test_clues(self):
+		path = os.path.join(self.dir.name, 'out.csv')
+		with ResultWriter(path) as writer:
+			writer.write('abide', True, ['soare', 'abide'], clues=[Clue.parse('01001'), Clue.parse('22222')])
+		with open(path) as f:
+			self.assertEqual(f.readlines()[1], f'abide,1,soare-abide,2,{int("01001", 3)}-242\n')
+		self.assertEqual(list(read_results(path)), [ROWS[0]])
+		# Files from before clues were recorded still read
+		with open(path, 'w') as f:
+			f.write('word,solved,guesses,attempts\nabide,1,soare-abide,2\n')
+		self.assertEqual(list(read_results(path)), [ROWS[0]])
+
+	def test_jsonl(self):
+		self.roundtrip('out.jsonl')
+
+	def test_partial_line(self):
+		path = self.roundtrip('out.jsonl')
+		with open(path, 'a') as f:
+			f.write('{"word": "tru')
+		self.assertEqual(list(read_results(path)), ROWS)
+		# Resuming drops the cut off row before adding to the file
+		with ResultWriter(path, append=True) as writer:
+			writer.write('truss', True, ['truss'])
+		self.assertEqual(list(read_results(path)), ROWS + [('truss', True, ['truss'])])
+
+	def test_stats(self):
+		stats = EvalStats()
+		for row in ROWS:
+			stats.add(*row)
+		self.assertEqual(stats.count, 3)
+		self.assertEqual(stats.failed, ['zesty'])
+		self.assertEqual(stats.failed_lengths, {6: 1})
+		self.assertEqual(stats.attempts, {2: 1, 1: 1})
+		self.assertAlmostEqual(stats.accuracy(), 2 / 3)
+		self.assertAlmostEqual(stats.avg_attempts(), 1.0)
+
+	def test_parallel_matches_serial(self):
+		game_config, solver_settings = configs(TREE_WORDS, TREE_GUESSES, feedback_matrix=True, guess_cache_size=DEFAULT_GUESS_CACHE_SIZE)
+		words = TREE_WORDS + ['tesla+brain']
+		# Everything but the seconds each word took
+		serial = [row[:4] for row in eval_results(words, game_config, solver_settings)]
+		parallel = [row[:4] for row in eval_results(words, game_config, solver_settings, workers=2)]
+		self.assertEqual(parallel, serial)
+		self.assertEqual([row[0] for row in serial], words)
+		self.assertTrue(all(row[1] for row in serial))
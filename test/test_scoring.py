@@ -0,0 +1,58 @@
+import unittest
+from collections import Counter
+from game.solver.scoring import GuessScorer
+from test.fixtures import REPEATS
+
+def reference_key(word, pos_freq, unknown_freq, non_pos_weight):
+	visited = set()
+	score, nonpos_score = 0, 0
+	for i, c in enumerate(word):
+		if c in visited:
+			continue
+		visited.add(c)
+		score += pos_freq[i].get(c, 0)
+		nonpos_score += unknown_freq.get(c, 0) - pos_freq[i].get(c, 0)
+	return -(score + non_pos_weight * nonpos_score)
+
+class TestScoring(unittest.TestCase):
+
+	def frequencies(self, cands):
+		pos_freq = [Counter(c[i] for c in cands) for i in range(5)]
+		unknown_freq = Counter(l for c in cands for l in c)
+		return pos_freq, unknown_freq
+
+	def test_sort_keys(self):
+		scorer = GuessScorer(REPEATS)
+		pos_freq, unknown_freq = self.frequencies(REPEATS[:6])
+		expected = [reference_key(w, pos_freq, unknown_freq, 0.5) for w in REPEATS]
+		self.assertEqual(scorer.sort_keys(REPEATS, pos_freq, unknown_freq, 0.5), expected)
+		# Few words are scored one by one, and words outside the scorer still work
+		self.assertEqual(scorer.sort_keys(['geese'], pos_freq, unknown_freq, 0.5), [expected[-1]])
+		self.assertEqual(scorer.sort_keys(['eerie'], pos_freq, unknown_freq, 0.5), [reference_key('eerie', pos_freq, unknown_freq, 0.5)])
+
+	def test_sort_keys_nonpos(self):
+		scorer = GuessScorer(REPEATS)
+		pos_freq, unknown_freq = self.frequencies(REPEATS)
+		expected = [-sum(unknown_freq[c] for c in set(w)) for w in REPEATS]
+		self.assertEqual(scorer.sort_keys(REPEATS, pos_freq, unknown_freq, 0.5, use_pos=False), expected)
+
+	def test_classes(self):
+		scorer = GuessScorer(REPEATS)
+		# tesla, steal and teals share their letters but not where they are
+		self.assertEqual(len(scorer.letter_classes), len(REPEATS) - 2)
+		self.assertEqual(len(scorer.place_classes), len(REPEATS))
+		self.assertEqual(scorer.letter_class[1], scorer.letter_class[3])
+
+	def test_best_words(self):
+		scorer = GuessScorer(REPEATS + ['least'])
+		pos_freq, unknown_freq = self.frequencies(REPEATS[:6])
+		for use_pos in [True, False]:
+			for exclude in [set(), {'tesla', 'steal'}, set(REPEATS) - {'brain'}]:
+				words = [w for w in scorer.words if not w in exclude]
+				keys = scorer.sort_keys(words, pos_freq, unknown_freq, 0.5, use_pos=use_pos)
+				expected = [w for w, key in zip(words, keys) if key == min(keys)]
+				self.assertEqual(scorer.best_words(pos_freq, unknown_freq, 0.5, use_pos=use_pos, exclude=exclude)[0], expected)
+
+
+if __name__ == '__main__':
+	unittest.main()
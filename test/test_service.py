@@ -0,0 +1,143 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from game import service
+from game.service import CONFIG_DEFAULTS, MAX_BODY_BYTES, RequestError, SolverService, config_key, endpoint_name, parse_clue
+from test.fixtures import INKS
+
+# Collects what handle_connection writes back
+class FakeWriter:
+	def __init__(self):
+		self.data = b''
+
+	def write(self, data):
+		self.data += data
+
+	async def drain(self):
+		pass
+
+	def close(self):
+		pass
+
+class TestService(unittest.TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.TemporaryDirectory()
+		self.dict_file = os.path.join(self.dir.name, 'words.txt')
+		with open(self.dict_file, 'w') as f:
+			f.write('\n'.join(INKS) + '\n')
+		defaults = dict(CONFIG_DEFAULTS, dict_file=self.dict_file, cand_file=None)
+		self.service = SolverService(ThreadPoolExecutor(1), defaults=defaults)
+
+	def tearDown(self):
+		self.service.executor.shutdown()
+		self.dir.cleanup()
+
+	def request(self, method, path, body=None):
+		return asyncio.run(self.service.handle(method, path, body or {}))
+
+	def test_guess(self):
+		status, body = self.request('POST', '/guess', {'clues': [['binks', '02222'], ['abcde', [0, 0, 0, 0, 0]]]})
+		self.assertEqual(status, 200)
+		self.assertEqual(body['guess'], 'finks')
+		self.assertEqual(body['num_candidates'], 3)
+		self.assertTrue(body['finished'])
+		status, body = self.request('POST', '/candidates', {'clues': [['binks', '02222']]})
+		self.assertEqual(body['candidates'], ['cinks', 'dinks', 'einks', 'finks', 'ginks', 'hinks'])
+
+	def test_session(self):
+		status, body = self.request('POST', '/sessions')
+		self.assertEqual(status, 201)
+		session_id = body['session_id']
+		status, body = self.request('POST', f'/sessions/{session_id}/clues', {'word': 'binks', 'clue': '02222'})
+		self.assertEqual(body['num_candidates'], 6)
+		# A word that isn't in the dictionary is rejected and not kept
+		with self.assertRaises(RequestError):
+			self.request('POST', f'/sessions/{session_id}/clues', {'word': 'zzzzz', 'clue': '00000'})
+		status, body = self.request('GET', f'/sessions/{session_id}')
+		self.assertEqual(body['clues'], [('binks', [0, 2, 2, 2, 2])])
+		self.request('DELETE', f'/sessions/{session_id}')
+		with self.assertRaises(RequestError):
+			self.request('GET', f'/sessions/{session_id}')
+
+	def test_configs(self):
+		hard = config_key({'hard_mode': True}, self.service.defaults)
+		self.assertNotEqual(hard, config_key(None, self.service.defaults))
+		self.assertTrue(dict(hard)['hard_mode'])
+		with self.assertRaises(RequestError):
+			config_key({'colour': 'green'})
+		with self.assertRaises(RequestError):
+			config_key({'N': '5'})
+		for top_k in [0, -1]:
+			with self.assertRaises(RequestError):
+				config_key({'top_k': top_k}, self.service.defaults)
+		with self.assertRaises(RequestError):
+			parse_clue('binks', '0123', 5)
+		self.assertEqual(endpoint_name('POST', '/sessions/abc/clues'), 'POST /sessions/<id>/clues')
+
+	def test_files(self):
+		# Only the server's own files and the ones in data/ and tree/ can be named
+		self.assertEqual(dict(config_key({'dict_file': self.dict_file}, self.service.defaults, self.service.allowed))['dict_file'], self.dict_file)
+		config_key({'cand_file': 'data/official_wordle_common.txt'}, self.service.defaults, self.service.allowed)
+		for path in ['/etc/passwd', 'data/../main.py', 'main.py']:
+			with self.assertRaises(RequestError):
+				config_key({'dict_file': path}, self.service.defaults, self.service.allowed)
+			with self.assertRaises(RequestError):
+				config_key({'tree_file': path}, self.service.defaults, self.service.allowed)
+
+	def test_worker_configs(self):
+		service._worker_configs.clear()
+		keys = [config_key({'top_k': k}, self.service.defaults) for k in range(1, 4)]
+		with mock.patch.object(service, 'MAX_WORKER_CONFIGS', 2):
+			service._configs(keys[0])
+			service._configs(keys[1])
+			service._configs(keys[0])
+			service._configs(keys[2])
+		# The least recently used config is dropped
+		self.assertEqual(list(service._worker_configs), [keys[0], keys[2]])
+		service._worker_configs.clear()
+
+	def test_session_limits(self):
+		self.service.max_sessions = 2
+		ids = [self.request('POST', '/sessions')[1]['session_id'] for i in range(3)]
+		self.assertEqual(list(self.service.sessions), ids[1:])
+		with self.assertRaises(RequestError):
+			self.request('GET', f'/sessions/{ids[0]}')
+		self.service.session_ttl = -1
+		with self.assertRaises(RequestError):
+			self.request('GET', f'/sessions/{ids[2]}')
+		self.assertEqual(len(self.service.sessions), 0)
+
+	def connection(self, request):
+		writer = FakeWriter()
+		async def handle():
+			reader = asyncio.StreamReader()
+			reader.feed_data(request)
+			reader.feed_eof()
+			await self.service.handle_connection(reader, writer)
+		asyncio.run(handle())
+		return writer.data.decode()
+
+	def test_content_length(self):
+		self.assertTrue(self.connection(b'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n').startswith('HTTP/1.1 200'))
+		for length in [b'abc', b'-5']:
+			response = self.connection(b'POST /guess HTTP/1.1\r\nContent-Length: ' + length + b'\r\n\r\n{}')
+			self.assertTrue(response.startswith('HTTP/1.1 400'))
+			self.assertIn('Connection: close', response)
+			self.assertIn('Content-Length must be', response)
+
+	def test_body_too_large(self):
+		size = MAX_BODY_BYTES + 1
+		request = b'POST /guess HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % size + b'a' * size
+		response = self.connection(request + b'GET /health HTTP/1.1\r\n\r\n')
+		self.assertTrue(response.startswith('HTTP/1.1 413'))
+		self.assertIn('Connection: close', response)
+		# The connection is closed rather than reading the body as the next request
+		self.assertEqual(response.count('HTTP/1.1'), 1)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from game.solver.session import SolverSession
+from game.solver.solver import guess_next_word
+from test.fixtures import INKS, solver_settings
+
+class TestSession(unittest.TestCase):
+
+	def settings(self):
+		return solver_settings(INKS, [])
+
+	def test_matches_guess_next_word(self):
+		settings = self.settings()
+		session = SolverSession(solver_settings=settings)
+		clues = [('binks', [0, 2, 2, 2, 2]), ('abcde', [0, 0, 0, 0, 0])]
+		self.assertEqual(session.next_guess(), guess_next_word([], solver_settings=settings))
+		for word, clue in clues:
+			session.add_clue(word, clue)
+		self.assertEqual(session.clues, clues)
+		self.assertEqual(session.candidates(), ['finks', 'ginks', 'hinks'])
+		self.assertEqual(session.next_guess(), guess_next_word(clues, solver_settings=settings))
+
+	def test_undo_and_fork(self):
+		session = SolverSession(solver_settings=self.settings())
+		session.add_clue('binks', [0, 2, 2, 2, 2])
+		fork = session.fork()
+		fork.add_clue('abcde', [0, 0, 0, 0, 0])
+		self.assertEqual(len(fork.candidates()), 3)
+		self.assertEqual(len(session.candidates()), 6)
+		self.assertEqual(fork.undo(), ('abcde', [0, 0, 0, 0, 0]))
+		self.assertEqual(fork.candidates(), session.candidates())
+		self.assertEqual(fork.constraints(), session.constraints())
+		fork.undo()
+		self.assertEqual(fork.candidates(), [w for w in INKS])
+		self.assertIsNone(fork.undo())
+
+	def test_repeated_letter_counts(self):
+		settings = solver_settings(['abide', 'eddie', 'speed'], [])
+		# speed against abide: the ⬛ on the second e means there is exactly one e
+		clues = [('speed', [0, 0, 1, 0, 1])]
+		session = SolverSession(solver_settings=settings)
+		session.add_clue(*clues[0])
+		self.assertEqual(session.candidates(), ['abide'])
+		self.assertEqual(guess_next_word(clues, solver_settings=settings)[1], ['abide'])
+
+	def test_solved(self):
+		session = SolverSession(solver_settings=self.settings())
+		session.add_clue('finks', [2, 2, 2, 2, 2])
+		self.assertTrue(session.is_solved())
+		self.assertEqual(session.next_guess(), (None, [], 0))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from game.results import ResultWriter
+from game.solver.deadline import Deadline
+from game.store import ADDED, CHANGED, IMPROVED, REGRESSED, REMOVED, ResultStore, config_hash, diff_results, load_run, run_name
+from test.fixtures import WORDS, configs
+
+class TestStore(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.store = ResultStore(os.path.join(self.tmp.name, 'results.sqlite'))
+		self.game_config, self.solver_settings = configs()
+
+	def tearDown(self):
+		self.store.close()
+		self.tmp.cleanup()
+
+	def test_config_hash(self):
+		key = config_hash(self.game_config, self.solver_settings, code='a')
+		self.assertEqual(key, config_hash(dict(self.game_config), dict(self.solver_settings), code='a'))
+		self.assertNotEqual(key, config_hash(self.game_config, self.solver_settings, code='b'))
+		self.assertNotEqual(key, config_hash(self.game_config, dict(self.solver_settings, non_pos_weight='0.7'), code='a'))
+		self.assertNotEqual(key, config_hash(dict(self.game_config, max_guesses='7'), self.solver_settings, code='a'))
+		self.assertNotEqual(key, config_hash(self.game_config, self.solver_settings, tree='abc', code='a'))
+		# Guesses cut short by a deadline aren't the ones picked without one
+		deadline = config_hash(self.game_config, dict(self.solver_settings, deadline=Deadline(0)), code='a')
+		self.assertNotEqual(key, deadline)
+		self.assertNotEqual(deadline, config_hash(self.game_config, dict(self.solver_settings, deadline=Deadline(0.05)), code='a'))
+
+	def test_put_get(self):
+		run = self.store.open_run(self.game_config, self.solver_settings)
+		self.assertEqual(self.store.get(run), {})
+		self.store.put(run, 'tesla', True, ['steal', 'tesla'], clues=[100, 242], seconds=0.5)
+		self.store.put(run, 'brain', False, ['steal', 'binks'])
+		self.assertEqual(self.store.get(run, ['tesla', 'unlit']), {'tesla': ('tesla', True, ['steal', 'tesla'], [100, 242], 0.5)})
+		self.assertEqual(self.store.get(run)['brain'][1:4], (False, ['steal', 'binks'], []))
+		# Other dictionaries are another run
+		_, settings = configs(WORDS[::-1], WORDS)
+		other = self.store.open_run(self.game_config, settings)
+		self.assertNotEqual(run, other)
+		self.assertEqual(self.store.get(other), {})
+		self.assertEqual(self.store.find_run(run_name(run)), run)
+		self.assertEqual(self.store.find_run(run[0][:6] + ':' + run[1]), run)
+		self.assertEqual(dict((name, count) for name, _, _, count in self.store.runs()), {run_name(run): 2, run_name(other): 0})
+
+	def test_diff(self):
+		old = {'a': (True, ['x', 'a']), 'b': (True, ['x', 'y', 'b']), 'c': (True, ['x', 'c']), 'd': (True, ['x', 'd']), 'e': (True, ['e'])}
+		new = {'a': (True, ['x', 'y', 'a']), 'b': (True, ['x', 'b']), 'c': (True, ['z', 'c']), 'd': (True, ['x', 'd']), 'f': (False, ['x'])}
+		kinds = {word: kind for word, kind, _, _ in diff_results(old, new)}
+		self.assertEqual(kinds, {'a': REGRESSED, 'b': IMPROVED, 'c': CHANGED, 'e': REMOVED, 'f': ADDED})
+		kinds = {word: kind for word, kind, _, _ in diff_results({'a': (True, ['a'] * 6)}, {'a': (False, ['a'] * 6)})}
+		self.assertEqual(kinds, {'a': REGRESSED})
+
+	def test_load_run(self):
+		path = os.path.join(self.tmp.name, 'results.csv')
+		with ResultWriter(path) as writer:
+			writer.write('tesla', True, ['steal', 'tesla'])
+		run = self.store.open_run(self.game_config, self.solver_settings)
+		self.store.put(run, 'tesla', True, ['steal', 'teals', 'tesla'])
+		from_file = load_run(path, store=self.store)
+		from_store = load_run(run_name(run), store=self.store)
+		self.assertEqual([kind for _, kind, _, _ in diff_results(from_file, from_store)], [REGRESSED])
+		with self.assertRaises(Exception):
+			load_run('nothing', store=self.store)
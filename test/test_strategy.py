@@ -0,0 +1,43 @@
+import unittest
+from game.feedback import FeedbackMatrix
+from game.solver.solver import guess_next_word
+from game.solver.strategy import ENTROPY, EXPECTED_SIZE, MINIMAX, best_by_partition, partition_cost, partition_sizes
+from test.fixtures import CANDS, GUESSES, configs, solver_settings
+
+class TestStrategy(unittest.TestCase):
+
+	def test_partition_sizes(self):
+		self.assertEqual(sorted(partition_sizes('binks', CANDS)), [1, 5])
+		self.assertEqual(sorted(partition_sizes('chdfg', CANDS)), [1, 1, 1, 1, 1, 1])
+		matrix = FeedbackMatrix.build(GUESSES, CANDS)
+		self.assertEqual(sorted(partition_sizes('chdfg', CANDS, feedback_matrix=matrix)), [1, 1, 1, 1, 1, 1])
+
+	def test_partition_cost(self):
+		self.assertAlmostEqual(partition_cost([1, 1, 1, 1], ENTROPY), -2)
+		self.assertEqual(partition_cost([1, 3], EXPECTED_SIZE), 2.5)
+		self.assertEqual(partition_cost([1, 3], MINIMAX), 3)
+
+	def test_best_by_partition(self):
+		keys = [0] * len(GUESSES)
+		for strategy in [ENTROPY, EXPECTED_SIZE, MINIMAX]:
+			self.assertEqual(best_by_partition(GUESSES, keys, CANDS, strategy, top_k=len(GUESSES)), ['chdfg'])
+		# Pruned to the top guess by key, plus the candidates
+		self.assertEqual(best_by_partition(GUESSES, [1] * 7 + [0], CANDS, ENTROPY, top_k=1), ['abcde'])
+		self.assertEqual(best_by_partition(GUESSES[:7], [0] * 7, CANDS[:2], MINIMAX, top_k=2), ['binks', 'cinks'])
+
+	def test_guess_next_word_strategy(self):
+		settings = solver_settings(CANDS, GUESSES)
+		settings['strategy'] = MINIMAX
+		settings['strategy_top_k'] = '8'
+		guess, cands, lencands = guess_next_word([], solver_settings=settings)
+		self.assertEqual(guess, 'chdfg')
+		self.assertEqual(lencands, len(CANDS))
+
+	def test_top_k(self):
+		for top_k in [0, -1]:
+			with self.assertRaises(Exception):
+				configs(CANDS, GUESSES, strategy=MINIMAX, top_k=top_k)
+
+
+if __name__ == '__main__':
+	unittest.main()
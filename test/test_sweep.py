@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from game.sweep import DICTS, configure, rank, run_sweep, sweep_configs, write_leaderboard
+from game.solver.solver import solve_wordle
+from game.wordle import Wordle
+from test.fixtures import WORDS, configs
+
+DEFAULTS = ('words.txt', None, 'wordle')
+
+class TestSweep(unittest.TestCase):
+
+	def tables(self):
+		return {DEFAULTS: configs()}
+
+	def test_grid(self):
+		configs = sweep_configs({'non_pos_weight': [0.3, 0.5], 'use_pos': [True, False], 'start_word': [None]})
+		self.assertEqual(len(configs), 4)
+		self.assertIn({'non_pos_weight': 0.5, 'use_pos': False, 'start_word': None}, configs)
+
+	def test_random(self):
+		space = {'non_pos_weight': {'min': 0.1, 'max': 0.9}, 'use_pos': [True, False]}
+		configs = sweep_configs(space, samples=5, seed=1)
+		self.assertEqual(len(configs), 5)
+		self.assertEqual(configs, sweep_configs(space, samples=5, seed=1))
+		self.assertTrue(all(0.1 <= c['non_pos_weight'] <= 0.9 for c in configs))
+		# No more samples than the grid has
+		self.assertEqual(len(sweep_configs({'use_pos': [True, False]}, samples=10, seed=1)), 2)
+		with self.assertRaises(Exception):
+			sweep_configs(space)
+
+	def test_bad_space(self):
+		for space in [{}, {'candidate_set': [['a']]}, {'use_pos': []}, {DICTS: [['a', 'b', 'c']]}]:
+			with self.assertRaises(Exception):
+				sweep_configs(space)
+
+	def test_configure(self):
+		tables = self.tables()
+		game_config, solver_settings = configure({'non_pos_weight': 0.7, 'max_guesses': 5, 'start_word': 'swims'}, tables, DEFAULTS, opening_book=False)
+		self.assertEqual(solver_settings['non_pos_weight'], '0.7')
+		self.assertEqual(game_config['max_guesses'], '5')
+		# The shared tables are left alone
+		self.assertEqual(tables[DEFAULTS][1]['non_pos_weight'], '0.5')
+		self.assertIs(solver_settings['guess_scorer'], tables[DEFAULTS][1]['guess_scorer'])
+		w = Wordle('tesla', config=game_config, verbose=False)
+		solve_wordle(w, solver_settings=solver_settings, debug=0)
+		self.assertEqual(w.guesses[0], 'swims')
+		with self.assertRaises(Exception):
+			configure({'start_word': 'zzzzz'}, tables, DEFAULTS)
+		with self.assertRaises(Exception):
+			configure({'strategy_top_k': 0}, tables, DEFAULTS)
+
+	def test_run(self):
+		configs = sweep_configs({'use_pos': [True, False], 'non_strict': [True, False]})
+		results = list(run_sweep(configs, self.tables(), {DEFAULTS[:2]: WORDS}, DEFAULTS, opening_book=False))
+		self.assertEqual(sorted(ix for ix, _, _ in results), list(range(4)))
+		for ix, params, result in results:
+			self.assertEqual(params, configs[ix])
+			self.assertEqual(result['games'], len(WORDS))
+			self.assertGreater(result['avg_attempts'], 0)
+		ranked = rank([(params, result) for _, params, result in results])
+		self.assertEqual(ranked[0][1]['accuracy'], max(result['accuracy'] for _, _, result in results))
+		with tempfile.TemporaryDirectory() as tmp:
+			path = os.path.join(tmp, 'leaderboard.csv')
+			write_leaderboard(path, ranked, ['use_pos', 'non_strict'])
+			with open(path) as f:
+				lines = f.read().splitlines()
+			self.assertEqual(len(lines), 5)
+			self.assertTrue(lines[0].startswith('rank,use_pos,non_strict,games'))
+			self.assertTrue(lines[1].startswith('1,'))
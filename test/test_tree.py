@@ -0,0 +1,35 @@
+import unittest
+from game.solver.solver import solve_wordle
+from game.solver.tree import build_solves, solves_to_tree
+from game.wordle import Wordle
+from test.fixtures import TREE_GUESSES, TREE_WORDS, solver_settings
+
+class TestTree(unittest.TestCase):
+
+	def settings(self):
+		return solver_settings(TREE_WORDS, TREE_GUESSES)
+
+	def test_solves_match_solver(self):
+		settings = self.settings()
+		solves, stats = build_solves(solver_settings=settings)
+		self.assertEqual(sorted(s[-1][0] for s in solves), sorted(TREE_WORDS))
+		self.assertEqual(stats['solved'], len(TREE_WORDS))
+		for solve in solves:
+			answer = solve[-1][0]
+			self.assertEqual(solve[-1][1], [2] * 5)
+			w = Wordle(answer, config={'candidate_set': TREE_WORDS, 'guess_set': settings['guess_set'], 'max_guesses': '6'}, verbose=False)
+			solve_wordle(w, solver_settings=settings, debug=0)
+			self.assertEqual(w.guesses, [word for word, _ in solve])
+
+	def test_parallel_matches_serial(self):
+		solves, _ = build_solves(solver_settings=self.settings())
+		parallel_solves, _ = build_solves(solver_settings=self.settings(), workers=2)
+		self.assertEqual(solves, parallel_solves)
+
+	def test_solves_to_tree(self):
+		solves = [[('soare', [0, 1, 1, 2, 1]), ('opera', [2, 2, 2, 2, 2])], [('soare', [2, 2, 2, 2, 2])]]
+		self.assertEqual(solves_to_tree(solves, 5), {'soare': {int('01121', 3): {'opera': {}}}})
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,80 @@
+import os
+import pickle
+import tempfile
+import unittest
+from game.config import make_configs
+from game.constants import DEFAULT_SOLVER_SETTINGS, FEEDBACK_LEGACY, FEEDBACK_WORDLE, TREE_DIR
+from game.solver.solver import guess_next_word
+from game.solver.tree_file import BinaryTree, dump_tree, load_tree, prune_solved_edges, read_pickled_tree, tree_to_bytes, tree_with_codes, verify_tree, write_tree
+
+TREE = {'soare': {
+	'01121': {'opera': {'22222': {}}},
+	'00000': {'linty': {'22222': {}, '00000': {'chuck': {}}}},
+}}
+
+class TestTreeFile(unittest.TestCase):
+
+	def test_round_trip(self):
+		tree = BinaryTree(tree_to_bytes(TREE))
+		self.assertEqual(tree.num_nodes, 4)
+		self.assertEqual(tree.to_dict(), {'soare': {0: {'linty': {0: {'chuck': {}}}}, int('01121', 3): {'opera': {}}}})
+		self.assertEqual(verify_tree(tree, TREE), [])
+		self.assertEqual(tree_with_codes(prune_solved_edges(TREE)), tree.to_dict())
+		self.assertEqual(BinaryTree(tree_to_bytes(tree.to_dict())).to_dict(), tree.to_dict())
+		self.assertNotEqual(verify_tree(tree, {'soare': {}}), [])
+
+	def test_find(self):
+		tree = BinaryTree(tree_to_bytes(TREE))
+		self.assertEqual(tree.word(tree.find([])), 'soare')
+		self.assertEqual(tree.word(tree.find([('soare', [0, 0, 0, 0, 0]), ('linty', [0, 0, 0, 0, 0])])), 'chuck')
+		self.assertIsNone(tree.find([('soare', [2, 2, 2, 2, 0])]))
+		self.assertIsNone(tree.find([('arose', [0, 0, 0, 0, 0])]))
+
+	def test_load_and_solve(self):
+		with tempfile.TemporaryDirectory() as d:
+			bin_path, pickle_path = os.path.join(d, 'tree.bin'), os.path.join(d, 'tree.pickle')
+			write_tree(TREE, bin_path)
+			with open(pickle_path, 'wb') as f:
+				pickle.dump(TREE, f)
+			for path in [bin_path, pickle_path]:
+				settings = dict(DEFAULT_SOLVER_SETTINGS)
+				settings['candidate_set'] = ['opera', 'chuck', 'linty']
+				settings['solution_tree'], mode = load_tree(path)
+				self.assertEqual(mode, FEEDBACK_LEGACY if path == pickle_path else FEEDBACK_WORDLE)
+				guess, _, _ = guess_next_word([('soare', [0, 0, 0, 0, 0])], solver_settings=settings)
+				self.assertEqual(guess, 'linty')
+				guess, cands, lencands = guess_next_word([('soare', [0, 1, 1, 2, 1]), ('opera', [2, 2, 2, 2, 2])], solver_settings=settings)
+				self.assertEqual((guess, cands, lencands), (None, [], 0))
+			pickle.loads(pickle.dumps(load_tree(bin_path)[0]))
+
+	def test_feedback_mode(self):
+		self.assertEqual(BinaryTree(tree_to_bytes(TREE)).feedback, FEEDBACK_WORDLE)
+		data = tree_to_bytes(TREE, mode=FEEDBACK_LEGACY)
+		self.assertEqual(BinaryTree(data).feedback, FEEDBACK_LEGACY)
+		# Version 1 trees have no mode, and were scored with legacy feedback
+		self.assertEqual(BinaryTree(data[:4] + bytes([1]) + data[5:6] + bytes(2) + data[8:]).feedback, FEEDBACK_LEGACY)
+		with self.assertRaises(Exception):
+			BinaryTree(data[:6] + bytes([9]) + data[7:])
+		tree = BinaryTree(data)
+		self.assertEqual(verify_tree(tree, TREE, mode=FEEDBACK_LEGACY), [])
+		self.assertNotEqual(verify_tree(tree, TREE, mode=FEEDBACK_WORDLE), [])
+		with tempfile.TemporaryDirectory() as d:
+			path = os.path.join(d, 'tree.pickle')
+			dump_tree(TREE, path, mode=FEEDBACK_LEGACY)
+			self.assertEqual(read_pickled_tree(path), (TREE, FEEDBACK_LEGACY))
+			dump_tree(TREE, path)
+			self.assertEqual(read_pickled_tree(path), (TREE, FEEDBACK_WORDLE))
+			# The tree's edges only make sense under the feedback it was built with
+			words = ['soare', 'opera', 'linty', 'chuck']
+			with self.assertRaises(Exception):
+				make_configs(words, words, feedback=FEEDBACK_LEGACY, feedback_matrix=False, tree_file=path)
+			_, settings = make_configs(words, words, feedback_matrix=False, tree_file=path)
+			self.assertEqual(settings['solution_tree'], tree_with_codes(TREE))
+
+	def test_shipped_trees(self):
+		for name in ['solution_tree.pickle', 'solution_tree_compact.pickle', 'solution_tree.bin']:
+			self.assertEqual(load_tree(os.path.join(TREE_DIR, name))[1], FEEDBACK_LEGACY)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+from game.util import read_words_of_length
+from game.word_cache import read_word_cache, word_cache_path
+
+class TestWordCache(unittest.TestCase):
+
+	def write(self, fname, words):
+		with open(fname, 'w') as f:
+			f.write('\n'.join(words) + '\n')
+
+	def test_cache(self):
+		with tempfile.TemporaryDirectory() as d:
+			fname = os.path.join(d, 'words.txt')
+			self.write(fname, ['tesla', 'steal', 'Gorge', 'tesla', 'cafés', 'unlit', 'at'])
+			words = read_words_of_length(5, fname)
+			# File order, deduped, lower case only
+			self.assertEqual(words, ['tesla', 'steal', 'cafés', 'unlit'])
+			self.assertTrue(os.path.exists(word_cache_path(fname, 5)))
+			self.assertEqual(read_word_cache(fname, 5), words)
+			self.assertIsNone(read_word_cache(fname, 2))
+			self.assertEqual(read_words_of_length(2, fname), ['at'])
+
+	def test_invalidation(self):
+		with tempfile.TemporaryDirectory() as d:
+			fname = os.path.join(d, 'words.txt')
+			self.write(fname, ['tesla', 'steal'])
+			read_words_of_length(5, fname)
+			# Touching the file keeps the cache, changing it doesn't
+			stat = os.stat(fname)
+			os.utime(fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+			self.assertEqual(read_word_cache(fname, 5), ['tesla', 'steal'])
+			self.write(fname, ['tesla', 'swims'])
+			os.utime(fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+			self.assertIsNone(read_word_cache(fname, 5))
+			self.assertEqual(read_words_of_length(5, fname), ['tesla', 'swims'])
+
+
+if __name__ == '__main__':
+	unittest.main()
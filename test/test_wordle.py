@@ -34,9 +34,9 @@ class TestWordle(unittest.TestCase):
 		clue, state = w.guess('steal')
 		self.assertEqual(Wordle.emojify(clue), '🟨🟨🟨🟨🟨', "Should be wrong place!")
 		clue, state = w.guess('swabs')
-		self.assertEqual(Wordle.emojify(clue), '🟨⬛🟨⬛🟨', "Should be wrong place!")
+		self.assertEqual(Wordle.emojify(clue), '🟨⬛🟨⬛⬛', "Should be wrong place!")
 		clue, state = w.guess('swims')
-		self.assertEqual(Wordle.emojify(clue), '🟨⬛⬛⬛🟨', "Should be wrong place!")
+		self.assertEqual(Wordle.emojify(clue), '🟨⬛⬛⬛⬛', "Should be wrong place!")
 		clue, state = w.guess('unlit')
 		self.assertEqual(Wordle.emojify(clue), '⬛⬛🟨⬛🟨', "Should be wrong place!")
 		clue, state = w.guess('teals')
@@ -54,9 +54,9 @@ class TestWordle(unittest.TestCase):
 		clue, state = w.guess('steal')
 		self.assertEqual(Wordle.emojify(clue), '🟨🟨🟨🟨🟨', "Should be wrong place!")
 		clue, state = w.guess('swabs')
-		self.assertEqual(Wordle.emojify(clue), '🟨⬛🟨⬛🟨', "Should be wrong place!")
+		self.assertEqual(Wordle.emojify(clue), '🟨⬛🟨⬛⬛', "Should be wrong place!")
 		clue, state = w.guess('swims')
-		self.assertEqual(Wordle.emojify(clue), '🟨⬛⬛⬛🟨', "Should be wrong place!")
+		self.assertEqual(Wordle.emojify(clue), '🟨⬛⬛⬛⬛', "Should be wrong place!")
 		clue, state = w.guess('unlit')
 		self.assertEqual(Wordle.emojify(clue), '⬛⬛🟨⬛🟨', "Should be wrong place!")
 		clue, state = w.guess('teals')
@@ -69,6 +69,21 @@ class TestWordle(unittest.TestCase):
 		self.assertEqual(clue, None, "Clue is None!")
 		self.assertEqual(state, Wordle.UNSOLVED, "Should be solved!")
 
+	def test_repeated_letters(self):
+		w = Wordle('abide', config={'candidate_set': ['abide', 'speed', 'eerie'], 'max_guesses': '6'})
+		clue, state = w.guess('speed')
+		# Only one of the two e's is 🟨, since abide has one
+		self.assertEqual(Wordle.emojify(clue), '⬛⬛🟨⬛🟨')
+		clue, state = w.guess('eerie')
+		self.assertEqual(Wordle.emojify(clue), '⬛⬛⬛🟨🟩')
+
+	def test_legacy_feedback(self):
+		w = Wordle('tesla', config={'candidate_set': ['tesla', 'swabs', 'swims'], 'max_guesses': '6', 'feedback': 'legacy'})
+		clue, state = w.guess('swabs')
+		self.assertEqual(Wordle.emojify(clue), '🟨⬛🟨⬛🟨', "Every s is 🟨")
+		clue, state = w.guess('swims')
+		self.assertEqual(Wordle.emojify(clue), '🟨⬛⬛⬛🟨', "Every s is 🟨")
+
 
 if __name__ == '__main__':
 	unittest.main()
\ No newline at end of file